@@ -0,0 +1,122 @@
+"""
+Measures the memory and time it takes to hold query results as dicts, plain objects or slotted entities.
+
+Run from the repository root:
+
+    python -m benchmarks.entity_memory --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from itertools import starmap
+
+from entities.book import Book
+from frameworks_and_drivers.database.drivers import SQLiteDriver
+from interface_adapters.repositories.hydration import hydrate
+
+
+class UnslottedBook:
+    """
+    Book as it was before it declared __slots__, for comparison.
+    """
+
+    def __init__(self, book_id, title, author, isbn, publication_year, genre):
+        self.book_id = book_id
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.publication_year = publication_year
+        self.genre = genre
+
+
+def create_books(path, rows):
+    """
+    Creates a SQLite database at path holding the given number of books.
+
+    Returns:
+        SQLiteConnection: A connection to the database.
+    """
+    driver = SQLiteDriver()
+    conn = driver.connect({'database': path})
+    cursor = conn.cursor()
+    for create_table_query in driver.create_table_queries:
+        cursor.execute(create_table_query)
+    for start in range(0, rows, 10000):
+        cursor.executemany(
+            "INSERT INTO books (title, author, isbn, publication_year, genre) VALUES (%s, %s, %s, %s, %s)",
+            [(f"Title {number}", f"Author {number % 5000}", f"{number:013d}", 1900 + number % 125,
+              ('Fiction', 'History', 'Science', 'Poetry')[number % 4])
+             for number in range(start, min(start + 10000, rows))],
+        )
+    conn.commit()
+    return conn
+
+
+def measure(build, rows, headers):
+    """
+    Builds one representation of the rows and reports what holding it costs.
+
+    Only the objects built from the rows are counted; the column values are shared with the rows. The time
+    is taken while tracemalloc runs, so it is only comparable with the other representations'.
+
+    Returns:
+        tuple: Bytes per row, and seconds taken.
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build(rows, headers)
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size / len(rows), elapsed
+
+
+# Each representation, as (label, builder taking the fetched rows and their headers)
+REPRESENTATIONS = [
+    ('dicts', lambda rows, headers: [dict(zip(headers, row)) for row in rows]),
+    ('unslotted entities', lambda rows, headers: list(starmap(UnslottedBook, rows))),
+    ('slotted entities', lambda rows, headers: hydrate(Book, headers, rows)),
+]
+
+
+def run(rows):
+    """
+    Fetches the given number of books from a temporary SQLite database and measures each representation.
+
+    Returns:
+        dict: (bytes per row, seconds) keyed by representation label, plus 'tuples' for the rows as fetched.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        conn = create_books(os.path.join(directory, 'books.db'), rows)
+        cursor = conn.cursor()
+        tracemalloc.start()
+        started = time.perf_counter()
+        cursor.execute("SELECT * FROM books")
+        fetched = cursor.fetchall()
+        results = {'tuples': (tracemalloc.get_traced_memory()[0] / rows, time.perf_counter() - started)}
+        tracemalloc.stop()
+        headers = [column[0] for column in cursor.description]
+        conn.close()
+    for label, build in REPRESENTATIONS:
+        results[label] = measure(build, fetched, headers)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000, help="Number of book rows (default: 1000000)")
+    args = parser.parse_args()
+
+    results = run(args.rows)
+    print(f"{args.rows} book rows")
+    print(f"{'representation':<20} {'bytes/row':>10} {'seconds':>8}")
+    for label, (bytes_per_row, seconds) in results.items():
+        note = " (values included)" if label == 'tuples' else ""
+        print(f"{label:<20} {bytes_per_row:>10.0f} {seconds:>8.2f}{note}")
+
+
+if __name__ == "__main__":
+    main()
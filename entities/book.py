@@ -11,6 +11,9 @@ class Book:
         genre (str): The genre of the book.
     """
 
+    # Slots keep instances small, as repositories can build one per row; their order is the column order
+    __slots__ = ('book_id', 'title', 'author', 'isbn', 'publication_year', 'genre')
+
     def __init__(self, book_id, title, author, isbn, publication_year, genre):
         """
         The constructor for the Book class.
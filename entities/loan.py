@@ -12,9 +12,13 @@ class Loan:
         loan_date (datetime): The date when the book was loaned out.
         due_date (datetime): The date by which the book should be returned.
         return_date (datetime, optional): The date when the book was actually returned.
+        copy_id (int, optional): The unique identifier of the physical copy lent out.
     """
 
-    def __init__(self, loan_id, book_id, user_id, loan_date, due_date, return_date=None):
+    # Slots keep instances small, as repositories can build one per row; their order is the column order
+    __slots__ = ('loan_id', 'book_id', 'user_id', 'loan_date', 'due_date', 'return_date', 'copy_id')
+
+    def __init__(self, loan_id, book_id, user_id, loan_date, due_date, return_date=None, copy_id=None):
         """
         The constructor for the Loan class.
 
@@ -25,6 +29,7 @@ class Loan:
             loan_date (datetime): The date when the book was loaned out.
             due_date (datetime): The date by which the book should be returned.
             return_date (datetime, optional): The date when the book was actually returned.
+            copy_id (int, optional): The unique identifier of the physical copy lent out.
         """
         self.loan_id = loan_id
         self.book_id = book_id
@@ -32,15 +37,22 @@ class Loan:
         self.loan_date = loan_date
         self.due_date = due_date
         self.return_date = return_date
+        self.copy_id = copy_id
 
-    def is_overdue(self):
+    def is_overdue(self, now=None):
         """
         Determines whether the book loan is overdue.
 
+        Parameters:
+            now (datetime, optional): The moment to judge the loan at; the current time if omitted.
+                Pass the same value when checking many loans, so the clock is read only once.
+
         Returns:
             bool: True if the book is overdue and not yet returned, False otherwise.
         """
-        return datetime.now() > self.due_date if self.return_date is None else False
+        if self.return_date is not None:
+            return False
+        return (now or datetime.now()) > self.due_date
 
     def __str__(self):
         """
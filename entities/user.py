@@ -9,6 +9,9 @@ class User:
         role (str): The role of the user (e.g., 'student', 'teacher', 'admin').
     """
 
+    # Slots keep instances small, as repositories can build one per row; their order is the column order
+    __slots__ = ('user_id', 'name', 'email', 'role')
+
     def __init__(self, user_id, name, email, role):
         """
         The constructor for the User class.
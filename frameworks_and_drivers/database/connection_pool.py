@@ -0,0 +1,342 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when no pooled connection becomes available within the checkout timeout.
+    """
+
+
+class TransactionRolledBack(Exception):
+    """
+    Raised when a unit of work ends after one of its statements failed, so nothing was committed.
+    """
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of database connections.
+
+    Connections are opened lazily up to the configured size, health checked on checkout and
+    returned to the pool on checkin. Callers normally use lease(), which hands out one connection
+    per thread for the duration of a request, so nested repository calls share it, and
+    transaction() turns such a lease into a unit of work with a single commit.
+
+    Attributes:
+        size (int): The maximum number of open connections.
+        timeout (float): How long, in seconds, checkout() waits for a free connection.
+        driver: The driver the connections are opened with, if known.
+    """
+
+    def __init__(self, connection_factory, size=5, timeout=10.0, health_check=None, begin=None, driver=None):
+        """
+        Initializes the ConnectionPool.
+
+        Parameters:
+            connection_factory (callable): Returns a new database connection, or None on failure.
+            size (int): The maximum number of open connections.
+            timeout (float): How long, in seconds, checkout() waits for a free connection.
+            health_check (callable, optional): Returns True if the given connection is still usable.
+            begin (callable, optional): Starts a transaction on the given connection; by default the
+                driver's implicit transaction is used.
+            driver (optional): The driver the connections are opened with, for repositories that need
+                SQL specific to its dialect.
+        """
+        if size < 1:
+            raise ValueError("Connection pool size must be at least 1.")
+        self.connection_factory = connection_factory
+        self.size = size
+        self.timeout = timeout
+        self.health_check = health_check
+        self.begin = begin
+        self.driver = driver
+        self._idle = []
+        self._open_count = 0
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        # Counters exposed through stats()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._health_check_failures = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._busy_time = 0.0
+        self._busy_since = {}
+        self._created_at = time.monotonic()
+
+    def checkout(self):
+        """
+        Takes a healthy connection out of the pool, opening a new one if the pool is not full.
+
+        Returns:
+            A database connection that must be handed back with checkin().
+
+        Raises:
+            PoolTimeoutError: If no connection became available within the timeout.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._condition:
+            while not self._idle and self._open_count >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a database connection."
+                    )
+                self._condition.wait(remaining)
+            if self._idle:
+                connection = self._idle.pop()
+            else:
+                connection = None
+                self._open_count += 1
+
+        if connection is None:
+            connection = self._open_connection()
+        elif not self._is_healthy(connection):
+            # Replace the broken connection in the slot it already occupies
+            with self._condition:
+                self._health_check_failures += 1
+            self._close_quietly(connection)
+            connection = self._open_connection()
+
+        waited = time.monotonic() - started
+        with self._condition:
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            self._busy_since[id(connection)] = time.monotonic()
+        return connection
+
+    def checkin(self, connection):
+        """
+        Returns a connection to the pool.
+
+        Any transaction left open by the borrower is rolled back so the next borrower does not
+        inherit a stale read snapshot or half-finished writes.
+
+        Parameters:
+            connection: A connection previously obtained from checkout().
+        """
+        try:
+            connection.rollback()
+        except Exception:
+            self._discard(connection)
+            return
+        with self._condition:
+            self._record_busy_time(connection)
+            self._idle.append(connection)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, shared=True):
+        """
+        Leases a connection for the current thread.
+
+        The first lease on a thread checks a connection out; nested leases on the same thread
+        reuse it, and the connection is checked back in when the outermost lease ends.
+
+        Parameters:
+            shared (bool): Set to False to check out a separate connection that no other lease on the
+                thread will reuse, e.g. to keep a streaming result set open while other queries run.
+
+        Yields:
+            A database connection.
+        """
+        if not shared:
+            connection = self.checkout()
+            try:
+                yield connection
+            finally:
+                self.checkin(connection)
+            return
+
+        if getattr(self._local, 'connection', None) is not None:
+            self._local.depth += 1
+            try:
+                yield self._local.connection
+            finally:
+                self._local.depth -= 1
+            return
+
+        connection = self.checkout()
+        self._local.connection = connection
+        self._local.depth = 1
+        try:
+            yield connection
+        finally:
+            self._local.connection = None
+            self._local.depth = 0
+            self.checkin(connection)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Opens a unit of work on the current thread.
+
+        Repository calls made inside it share one leased connection and one transaction: commit() and
+        rollback() calls are deferred, and the work is committed once when the outermost transaction
+        ends. If the block raises, or a repository reported a failed statement, everything is rolled
+        back. Nested transaction() blocks join the outer one.
+
+        Yields:
+            A database connection.
+
+        Raises:
+            TransactionRolledBack: If a repository call failed inside the block without raising.
+        """
+        with self.lease() as connection:
+            if getattr(self._local, 'in_transaction', False):
+                yield connection
+                return
+
+            if self.begin is not None:
+                self.begin(connection)
+            self._local.in_transaction = True
+            self._local.rollback_only = False
+            self._local.on_commit = []
+            try:
+                yield connection
+                if self._local.rollback_only:
+                    raise TransactionRolledBack("A statement failed, so the whole operation was rolled back.")
+                connection.commit()
+                callbacks = self._local.on_commit
+            except BaseException:
+                connection.rollback()
+                raise
+            finally:
+                self._local.in_transaction = False
+                self._local.on_commit = []
+            for callback in callbacks:
+                callback()
+
+    def commit(self, connection):
+        """
+        Commits the connection's work, unless it belongs to a unit of work that commits it later.
+
+        Parameters:
+            connection: A connection obtained from lease().
+        """
+        if not getattr(self._local, 'in_transaction', False):
+            connection.commit()
+
+    def rollback(self, connection):
+        """
+        Rolls the connection's work back; inside a unit of work, marks the whole unit for rollback.
+
+        Parameters:
+            connection: A connection obtained from lease().
+        """
+        if getattr(self._local, 'in_transaction', False):
+            self._local.rollback_only = True
+        else:
+            connection.rollback()
+
+    def on_commit(self, callback):
+        """
+        Runs a callback once the current work is durable.
+
+        Inside a unit of work the callback runs after its commit and is dropped on rollback; outside
+        one it runs immediately. Used to keep in-process caches from seeing uncommitted data.
+
+        Parameters:
+            callback (callable): Called with no arguments.
+        """
+        if getattr(self._local, 'in_transaction', False):
+            self._local.on_commit.append(callback)
+        else:
+            callback()
+
+    def stats(self):
+        """
+        Reports pool usage.
+
+        Returns:
+            dict: Pool size, open/idle/in-use connection counts, checkout and wait-time figures and
+            utilisation (the share of the pool in use now and on average since creation).
+        """
+        with self._condition:
+            now = time.monotonic()
+            in_use = self._open_count - len(self._idle)
+            busy_time = self._busy_time + sum(now - since for since in self._busy_since.values())
+            elapsed = max(now - self._created_at, 1e-9)
+            return {
+                'size': self.size,
+                'open': self._open_count,
+                'idle': len(self._idle),
+                'in_use': in_use,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'health_check_failures': self._health_check_failures,
+                'total_wait_seconds': self._total_wait,
+                'average_wait_seconds': self._total_wait / self._checkouts if self._checkouts else 0.0,
+                'max_wait_seconds': self._max_wait,
+                'utilisation': in_use / self.size,
+                'average_utilisation': busy_time / (elapsed * self.size),
+            }
+
+    def close(self):
+        """
+        Closes every idle connection, for example when the application shuts down.
+        """
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._open_count -= len(idle)
+        for connection in idle:
+            self._close_quietly(connection)
+
+    def _open_connection(self):
+        """
+        Opens a new connection for a slot that has already been reserved in _open_count.
+        """
+        try:
+            connection = self.connection_factory()
+        except Exception:
+            connection = None
+        if connection is None:
+            with self._condition:
+                self._open_count -= 1
+                self._condition.notify()
+            raise ConnectionError("Could not open a database connection.")
+        return connection
+
+    def _is_healthy(self, connection):
+        """
+        Runs the configured health check, treating any exception as an unhealthy connection.
+        """
+        if self.health_check is None:
+            return True
+        try:
+            return bool(self.health_check(connection))
+        except Exception:
+            return False
+
+    def _discard(self, connection):
+        """
+        Closes a broken connection and frees its slot in the pool.
+        """
+        self._close_quietly(connection)
+        with self._condition:
+            self._record_busy_time(connection)
+            self._open_count -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def _close_quietly(connection):
+        """
+        Closes a connection, ignoring errors from connections that are already broken.
+        """
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _record_busy_time(self, connection):
+        """
+        Adds the time a connection spent checked out to the busy-time total. Caller holds the lock.
+        """
+        since = self._busy_since.pop(id(connection), None)
+        if since is not None:
+            self._busy_time += time.monotonic() - since
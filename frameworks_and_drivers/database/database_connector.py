@@ -1,23 +1,23 @@
-import mysql.connector
-from mysql.connector import Error
+import sys
 import config
+from frameworks_and_drivers.database.connection_pool import ConnectionPool
+from frameworks_and_drivers.database.drivers import Error, get_driver
+from frameworks_and_drivers.database.migrations import find_missing_indexes, migrate
+from frameworks_and_drivers.database.partitioning import maintain_loan_partitions
 
 
 def create_db_connection():
     """
     Creates and returns a connection to the specified database using the configuration from config.py.
 
+    The driver is chosen by DB_CONFIG['driver'] ('mysql' or 'sqlite'); MySQL is used when it is not set.
+
     Returns:
-        conn: A connection object to the MySQL database.
+        conn: A connection object to the database.
     """
     dbinfo = config.DB_CONFIG  # Accessing configuration from config.py
     try:
-        conn = mysql.connector.connect(
-            host=dbinfo['host'],
-            user=dbinfo['username'],
-            passwd=dbinfo['password'],
-            database=dbinfo['database'],
-        )
+        conn = get_driver(dbinfo).connect(dbinfo)
         print("Database connection successful")
         return conn
     except Error as err:
@@ -25,21 +25,41 @@ def create_db_connection():
         return None
 
 
+def create_connection_pool():
+    """
+    Creates a pool of database connections using the configuration from config.py.
+
+    The pool size and checkout timeout are read from the optional POOL_CONFIG dictionary
+    in config.py and default to 5 connections and 10 seconds.
+
+    Returns:
+        ConnectionPool: A pool that opens connections with create_db_connection().
+    """
+    pool_info = getattr(config, 'POOL_CONFIG', {})  # Older config.py files have no POOL_CONFIG
+    driver = get_driver(config.DB_CONFIG)
+    return ConnectionPool(
+        create_db_connection,
+        size=pool_info.get('size', 5),
+        timeout=pool_info.get('timeout', 10.0),
+        health_check=driver.is_healthy,
+        begin=driver.begin,
+        driver=driver,
+    )
+
+
 def create_server_connection():
     """
-    Creates a connection to the MySQL server without specifying a particular database.
+    Creates a connection to the database server without specifying a particular database.
+
+    For the embedded SQLite driver this opens the database file itself.
 
     Returns:
-        conn: A connection object to the MySQL server.
+        conn: A connection object to the database server.
     """
     dbinfo = config.DB_CONFIG  # Accessing configuration from config.py
     try:
-        conn = mysql.connector.connect(
-            host=dbinfo['host'],
-            user=dbinfo['username'],
-            passwd=dbinfo['password'],
-        )
-        print("MySQL Server connection successful")
+        conn = get_driver(dbinfo).connect(dbinfo, use_database=False)
+        print("Database server connection successful")
         return conn
     except Error as err:
         print(f"Error: '{err}'")
@@ -94,61 +114,103 @@ def create_table(conn, query):
         print(f"Error: '{err}'")
 
 
-def main():
+def check_indexes():
     """
-    Main function to establish server connection, create the database and tables.
+    Reports any secondary indexes missing from an existing deployment.
+
+    Returns:
+        list: The (table, index name, columns) entries of INDEXES that are missing.
+    """
+    driver = get_driver(config.DB_CONFIG)
+    connection = create_db_connection()
+    missing = find_missing_indexes(connection, driver)
+    for table_name, index_name, columns in missing:
+        print(f"Missing index {index_name} on {table_name} ({', '.join(columns)})")
+    if not missing:
+        print("All indexes are present")
+    connection.close()
+    return missing
+
+
+def partition_loans(connection, driver):
+    """
+    Partitions the loans table by loan_date year, or adds the partitions of the coming years, when the
+    optional PARTITION_CONFIG dictionary in config.py enables it.
+
+    MySQL partitions the table itself; the embedded SQLite driver splits it into one table per year
+    behind a loans view. Either way, date-range reports only read the partitions of their range.
+
+    Parameters:
+        connection: The database connection object.
+        driver: The driver the connection was opened with.
+
+    Returns:
+        list: The partitions created, as (partition name, exclusive upper bound).
+    """
+    partition_info = getattr(config, 'PARTITION_CONFIG', {})  # Older config.py files have no PARTITION_CONFIG
+    if not partition_info.get('enabled', False):
+        return []
+    return maintain_loan_partitions(connection, driver, partition_info.get('future_partitions', 2))
+
+
+def run_migrations(dry_run=False):
+    """
+    Brings the schema of the configured database up to date, in process, and creates any loan partitions
+    due.
+
+    This is cheap when the schema is already current, so it is safe to call on every start.
+
+    Parameters:
+        dry_run (bool): Only report the pending migrations and the rows they would touch.
+
+    Returns:
+        list: (Migration, estimated rows) for each migration that was pending.
+    """
+    connection = create_db_connection()
+    if connection is None:
+        print("Skipping schema migrations: the database is not reachable.")
+        return []
+    driver = get_driver(config.DB_CONFIG)
+    try:
+        plan = migrate(connection, driver, dry_run)
+        if not dry_run:
+            partition_loans(connection, driver)
+        return plan
+    finally:
+        connection.close()
+
+
+def main(dry_run=False):
+    """
+    Main function to establish server connection, create the database and migrate its schema.
+
+    Parameters:
+        dry_run (bool): Only report the pending migrations and the rows they would touch.
     """
     db_info = config.DB_CONFIG
     database = db_info['database']  # LibrarySystem
+    driver = get_driver(db_info)
 
     # Establishing a server connection
     connection = create_server_connection()
 
-    # Creating a database and using it
-    create_database_query = f"CREATE DATABASE IF NOT EXISTS {database}"
-    create_database(connection, create_database_query)
-    use_database_query = f"USE {database}"
-    use_database(connection, use_database_query)
-
-    # Defining SQL queries to create tables
-    create_books_table_query = """
-    CREATE TABLE IF NOT EXISTS books (
-        book_id INT AUTO_INCREMENT PRIMARY KEY,
-        title VARCHAR(255) NOT NULL,
-        author VARCHAR(255) NOT NULL,
-        isbn VARCHAR(13),
-        publication_year INT,
-        genre VARCHAR(100)
-    );
-    """
-
-    create_users_table_query = """
-    CREATE TABLE IF NOT EXISTS users (
-        user_id INT AUTO_INCREMENT PRIMARY KEY,
-        name VARCHAR(255) NOT NULL,
-        email VARCHAR(255) UNIQUE NOT NULL,
-        role VARCHAR(50) NOT NULL
-    );
-    """
-
-    create_loans_table_query = """
-    CREATE TABLE IF NOT EXISTS loans (
-        loan_id INT AUTO_INCREMENT PRIMARY KEY,
-        book_id INT,
-        user_id INT,
-        loan_date DATETIME,
-        due_date DATETIME,
-        return_date DATETIME NULL,
-        FOREIGN KEY (book_id) REFERENCES books(book_id),
-        FOREIGN KEY (user_id) REFERENCES users(user_id)
-    );
-    """
-
-    # Creating tables
-    create_table(connection, create_books_table_query)
-    create_table(connection, create_users_table_query)
-    create_table(connection, create_loans_table_query)
+    # Creating a database and using it; a SQLite file is created when it is first opened
+    if driver.name == 'mysql':
+        create_database_query = f"CREATE DATABASE IF NOT EXISTS {database}"
+        create_database(connection, create_database_query)
+        use_database_query = f"USE {database}"
+        use_database(connection, use_database_query)
+
+    # Applying the schema migrations that are not yet recorded in schema_version
+    if not migrate(connection, driver, dry_run) and not dry_run:
+        print("Database schema is up to date")
+    if not dry_run:
+        partition_loans(connection, driver)
+    connection.close()
 
 
 if __name__ == "__main__":
-    main()
+    if "--check-indexes" in sys.argv:
+        # Only report missing indexes, without changing the schema
+        sys.exit(1 if check_indexes() else 0)
+    main(dry_run="--dry-run" in sys.argv)
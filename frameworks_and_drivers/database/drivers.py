@@ -0,0 +1,853 @@
+import re
+import sqlite3
+
+try:
+    import mysql.connector
+except ImportError:  # SQLite-only installations do not need the MySQL connector
+    mysql = None
+
+
+class MySQLDriver:
+    """
+    Database driver for a MySQL server, using mysql-connector-python.
+    """
+
+    name = 'mysql'
+
+    # Column definition of an integer surrogate key, for tables created by later migrations
+    auto_increment_key = "INT AUTO_INCREMENT PRIMARY KEY"
+
+    create_table_queries = [
+        """
+        CREATE TABLE IF NOT EXISTS books (
+            book_id INT AUTO_INCREMENT PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            author VARCHAR(255) NOT NULL,
+            isbn VARCHAR(13),
+            publication_year INT,
+            genre VARCHAR(100)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            email VARCHAR(255) UNIQUE NOT NULL,
+            role VARCHAR(50) NOT NULL
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS loans (
+            loan_id INT AUTO_INCREMENT PRIMARY KEY,
+            book_id INT,
+            user_id INT,
+            loan_date DATETIME,
+            due_date DATETIME,
+            return_date DATETIME NULL,
+            FOREIGN KEY (book_id) REFERENCES books(book_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        );
+        """,
+    ]
+
+    def connect(self, dbinfo, use_database=True):
+        """
+        Opens a connection to the MySQL server.
+
+        Parameters:
+            dbinfo (dict): The DB_CONFIG dictionary from config.py.
+            use_database (bool): Whether to select the configured database on connect.
+
+        Returns:
+            conn: A MySQL connection object.
+        """
+        if mysql is None:
+            raise ImportError("mysql-connector-python is required for the 'mysql' driver.")
+        kwargs = {
+            'host': dbinfo['host'],
+            'user': dbinfo['username'],
+            'passwd': dbinfo['password'],
+            # Pooled connections are reused, so drop any rows a caller left unread
+            'consume_results': True,
+        }
+        if use_database:
+            kwargs['database'] = dbinfo['database']
+        return mysql.connector.connect(**kwargs)
+
+    def index_columns(self, conn, table_name):
+        """
+        Lists the indexes that exist on a table.
+
+        Parameters:
+            conn: A connection opened by this driver.
+            table_name (str): The table to inspect.
+
+        Returns:
+            dict: Index name mapped to the tuple of its columns, in index order.
+        """
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            ORDER BY INDEX_NAME, SEQ_IN_INDEX
+            """,
+            (table_name,),
+        )
+        indexes = {}
+        for index_name, column_name in cursor.fetchall():
+            indexes[index_name] = indexes.get(index_name, ()) + (column_name,)
+        return indexes
+
+    def table_columns(self, conn, table_name):
+        """
+        Lists the columns of a table.
+
+        Parameters:
+            conn: A connection opened by this driver.
+            table_name (str): The table to inspect.
+
+        Returns:
+            list: The column names, in table order; empty if the table does not exist.
+        """
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            ORDER BY ORDINAL_POSITION
+            """,
+            (table_name,),
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def create_index_query(self, table_name, index_name, columns):
+        """
+        Builds the statement that adds an index without blocking reads and writes on the table.
+
+        Parameters:
+            table_name (str): The table to index.
+            index_name (str): The name of the new index.
+            columns (tuple): The indexed columns, in order.
+
+        Returns:
+            str: The SQL statement.
+        """
+        return (f"ALTER TABLE {table_name} ADD INDEX {index_name} ({', '.join(columns)}), "
+                f"ALGORITHM=INPLACE, LOCK=NONE")
+
+    def create_fulltext_index_queries(self):
+        """
+        Builds the statements that index the text of books for full-text search.
+
+        Returns:
+            list: The SQL statements, in order.
+        """
+        return ["ALTER TABLE books ADD FULLTEXT INDEX ft_books_text (title, author, genre)"]
+
+    def fulltext_search_query(self, terms, limit):
+        """
+        Builds a ranked full-text search over the title, author and genre of books.
+
+        Every term also matches words it is a prefix of, and books matching more of the terms rank
+        higher.
+
+        Parameters:
+            terms (list of str): The words searched for, containing only letters, digits and '_'.
+            limit (int): The maximum number of books returned.
+
+        Returns:
+            tuple: The SQL statement, which selects every book column followed by a relevance score,
+            and its parameters.
+        """
+        against = ' '.join(f"{term}*" for term in terms)
+        match = "MATCH (title, author, genre) AGAINST (%s IN BOOLEAN MODE)"
+        query = (f"SELECT books.*, {match} AS relevance FROM books WHERE {match} "
+                 f"ORDER BY relevance DESC, book_id LIMIT %s")
+        return query, (against, against, limit)
+
+    def loan_partitions(self, conn):
+        """
+        Lists the range partitions of the loans table.
+
+        Parameters:
+            conn: A connection opened by this driver.
+
+        Returns:
+            list: (partition name, exclusive upper bound of loan_date as 'YYYY-MM-DD', or None for the
+            last partition, which has no bound) in order, or an empty list if loans is not partitioned.
+        """
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'loans' AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+            """
+        )
+        return [(name, None if bound == 'MAXVALUE' else bound.strip("'")) for name, bound in cursor.fetchall()]
+
+    def partition_loans_queries(self, conn, partitions):
+        """
+        Builds the statements that partition the loans table by loan_date range.
+
+        MySQL cannot partition a table with foreign keys, and every unique key of a partitioned table
+        must contain the partitioning column, so the foreign keys of loans are dropped and loan_date
+        joins loan_id in the primary key.
+
+        Parameters:
+            conn: A connection opened by this driver.
+            partitions (list): (partition name, exclusive upper bound or None) for every partition.
+
+        Returns:
+            list: The SQL statements, in order.
+        """
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS
+            WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = 'loans'
+            """
+        )
+        queries = [f"ALTER TABLE loans DROP FOREIGN KEY {row[0]}" for row in cursor.fetchall()]
+        queries.append("ALTER TABLE loans MODIFY loan_date DATETIME NOT NULL, "
+                       "DROP PRIMARY KEY, ADD PRIMARY KEY (loan_id, loan_date)")
+        queries.append(f"ALTER TABLE loans PARTITION BY RANGE COLUMNS (loan_date) ({self._partition_list(partitions)})")
+        return queries
+
+    def add_loan_partitions_queries(self, conn, partitions, new_partitions):
+        """
+        Builds the statements that split new partitions off the unbounded last partition of loans.
+
+        Parameters:
+            conn: A connection opened by this driver.
+            partitions (list): The current partitions, as returned by loan_partitions().
+            new_partitions (list): (partition name, exclusive upper bound) for each partition to add,
+                in order, all above the current bounds.
+
+        Returns:
+            list: The SQL statements, in order.
+        """
+        last_name = partitions[-1][0]
+        split = self._partition_list(list(new_partitions) + [partitions[-1]])
+        return [f"ALTER TABLE loans REORGANIZE PARTITION {last_name} INTO ({split})"]
+
+    def loans_source(self, partitions):
+        """
+        Builds the FROM clause reading only the given partitions of loans.
+
+        Parameters:
+            partitions (list): The partitions to read, as returned by loan_partitions(); all of loans
+                when empty.
+
+        Returns:
+            str: The table reference, usable as 'loans' in the rest of the query.
+        """
+        if not partitions:
+            return "loans"
+        return f"loans PARTITION ({', '.join(name for name, _ in partitions)})"
+
+    def index_targets(self, conn, table_name, index_name):
+        """
+        Lists the tables an index on a table has to be created on; partitions share their table's indexes.
+
+        Returns:
+            list: (table name, index name) pairs.
+        """
+        return [(table_name, index_name)]
+
+    @staticmethod
+    def _partition_list(partitions):
+        return ', '.join(
+            f"PARTITION {name} VALUES LESS THAN ({'MAXVALUE' if bound is None else repr(bound)})"
+            for name, bound in partitions
+        )
+
+    def estimate_row_count(self, conn, table_name):
+        """
+        Estimates the number of rows in a table from InnoDB statistics, without scanning it.
+
+        Parameters:
+            conn: A connection opened by this driver.
+            table_name (str): The table to measure.
+
+        Returns:
+            int: The approximate row count.
+        """
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (table_name,),
+        )
+        row = cursor.fetchone()
+        return int(row[0] or 0) if row else 0
+
+    def begin(self, conn):
+        """
+        Starts a transaction for a unit of work, unless one is already open on the connection.
+
+        Parameters:
+            conn: A connection opened by this driver.
+        """
+        if not conn.in_transaction:
+            conn.start_transaction()
+
+    def is_healthy(self, conn):
+        """
+        Checks whether the connection is still usable.
+
+        Parameters:
+            conn: A connection opened by this driver.
+
+        Returns:
+            bool: True if the server answered a ping.
+        """
+        return conn.is_connected()
+
+
+class SQLiteConnection:
+    """
+    Wraps a sqlite3 connection so repositories can keep using the MySQL '%s' parameter style.
+
+    Attribute access that is not overridden here is delegated to the wrapped connection.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return SQLiteCursor(self._connection.cursor())
+
+    def is_connected(self):
+        try:
+            self._connection.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class SQLiteCursor:
+    """
+    Wraps a sqlite3 cursor, translating MySQL-style queries to the dialect sqlite3 expects.
+
+    '%s' placeholders become '?', except inside quoted string literals, and a trailing FOR UPDATE is
+    dropped: SQLite has no row locks, and a unit of work already holds the database write lock from its
+    BEGIN IMMEDIATE.
+
+    Writes to a view, such as the sharded loans view, are carried out by its INSTEAD OF triggers, which
+    sqlite3 leaves out of rowcount; for those, rowcount reports the rows the triggers changed instead.
+    On the loans view that is one per loan deleted or updated within its shard, but two per loan
+    inserted (the loan_sequence update) or moved to another shard (the delete and the insert).
+    """
+
+    # A quoted string literal or identifier, with quotes inside it doubled as SQL escapes them
+    _quoted = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._changes = 0
+
+    @classmethod
+    def _translate(cls, query):
+        # Splitting on the quoted segments leaves them at the odd positions, untouched
+        query = ''.join(part if index % 2 else part.replace('%s', '?')
+                        for index, part in enumerate(cls._quoted.split(query))).rstrip()
+        if query.upper().endswith(' FOR UPDATE'):
+            query = query[:-len(' FOR UPDATE')]
+        return query
+
+    def execute(self, query, args=()):
+        before = self._cursor.connection.total_changes
+        self._cursor.execute(self._translate(query), args)
+        self._changes = self._cursor.connection.total_changes - before
+        return self
+
+    def executemany(self, query, seq_of_args):
+        before = self._cursor.connection.total_changes
+        self._cursor.executemany(self._translate(query), seq_of_args)
+        self._changes = self._cursor.connection.total_changes - before
+        return self
+
+    @property
+    def rowcount(self):
+        rowcount = self._cursor.rowcount
+        return self._changes if rowcount == 0 else rowcount
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SQLiteDriver:
+    """
+    Embedded database driver backed by a local SQLite file, for installations without a MySQL server.
+
+    DB_CONFIG['database'] is the path of the database file. Connections run in WAL mode so readers
+    do not block the single writer.
+    """
+
+    name = 'sqlite'
+
+    auto_increment_key = "INTEGER PRIMARY KEY AUTOINCREMENT"
+
+    # Same tables as the MySQL schema, in SQLite's dialect
+    create_table_queries = [
+        """
+        CREATE TABLE IF NOT EXISTS books (
+            book_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title VARCHAR(255) NOT NULL,
+            author VARCHAR(255) NOT NULL,
+            isbn VARCHAR(13),
+            publication_year INT,
+            genre VARCHAR(100)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(255) NOT NULL,
+            email VARCHAR(255) UNIQUE NOT NULL,
+            role VARCHAR(50) NOT NULL
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS loans (
+            loan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            book_id INT,
+            user_id INT,
+            loan_date DATETIME,
+            due_date DATETIME,
+            return_date DATETIME NULL,
+            FOREIGN KEY (book_id) REFERENCES books(book_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        );
+        """,
+    ]
+
+    pragmas = [
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA foreign_keys = ON",
+        "PRAGMA busy_timeout = 5000",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -65536",
+        "PRAGMA mmap_size = 268435456",
+    ]
+
+    def connect(self, dbinfo, use_database=True):
+        """
+        Opens the SQLite database file, creating it if needed, and applies the tuning pragmas.
+
+        Parameters:
+            dbinfo (dict): The DB_CONFIG dictionary from config.py.
+            use_database (bool): Ignored; a SQLite file is always its own database.
+
+        Returns:
+            SQLiteConnection: A connection that accepts '%s' placeholders.
+        """
+        # Connections are handed between threads by the pool, but only ever used by one at a time
+        conn = sqlite3.connect(dbinfo['database'], check_same_thread=False)
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        return SQLiteConnection(conn)
+
+    def index_columns(self, conn, table_name):
+        """
+        Lists the indexes that exist on a table.
+
+        The indexes of the sharded loans view are those every shard has, named without the shard suffix.
+
+        Parameters:
+            conn: A connection opened by this driver.
+            table_name (str): The table to inspect.
+
+        Returns:
+            dict: Index name mapped to the tuple of its columns, in index order.
+        """
+        partitions = self.loan_partitions(conn) if table_name == 'loans' else []
+        if partitions:
+            shared = None
+            for name, _ in partitions:
+                shard_indexes = {
+                    index_name[:-len(name) - 1] if index_name.endswith(f"_{name}") else index_name: columns
+                    for index_name, columns in self.index_columns(conn, f"loans_{name}").items()
+                }
+                shared = shard_indexes if shared is None else {
+                    index_name: columns for index_name, columns in shared.items()
+                    if shard_indexes.get(index_name) == columns
+                }
+            return shared
+
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA index_list({table_name})")
+        index_names = [row[1] for row in cursor.fetchall()]
+        indexes = {}
+        for index_name in index_names:
+            cursor.execute(f"PRAGMA index_info({index_name})")
+            indexes[index_name] = tuple(row[2] for row in sorted(cursor.fetchall()))
+        # The INTEGER PRIMARY KEY is the rowid itself and never appears in index_list
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        primary_key = tuple(row[1] for row in sorted(cursor.fetchall(), key=lambda row: row[5]) if row[5])
+        if primary_key:
+            indexes['PRIMARY'] = primary_key
+        return indexes
+
+    def table_columns(self, conn, table_name):
+        """
+        Lists the columns of a table, or of the sharded loans view.
+
+        Parameters:
+            conn: A connection opened by this driver.
+            table_name (str): The table to inspect.
+
+        Returns:
+            list: The column names, in table order; empty if the table does not exist.
+        """
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        return [row[1] for row in cursor.fetchall()]
+
+    def create_index_query(self, table_name, index_name, columns):
+        """
+        Builds the statement that adds an index.
+
+        Parameters:
+            table_name (str): The table to index.
+            index_name (str): The name of the new index.
+            columns (tuple): The indexed columns, in order.
+
+        Returns:
+            str: The SQL statement.
+        """
+        return f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)})"
+
+    def create_fulltext_index_queries(self):
+        """
+        Builds the statements that index the text of books for full-text search.
+
+        The index is an FTS5 inverted index over the books table, kept in step with it by triggers.
+
+        Returns:
+            list: The SQL statements, in order.
+        """
+        columns = "title, author, genre"
+        new_row = "new.book_id, new.title, new.author, new.genre"
+        old_row = "'delete', old.book_id, old.title, old.author, old.genre"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5({columns}, content='books', content_rowid='book_id')",
+            f"""
+            CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+                INSERT INTO books_fts (rowid, {columns}) VALUES ({new_row});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+                INSERT INTO books_fts (books_fts, rowid, {columns}) VALUES ({old_row});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE ON books BEGIN
+                INSERT INTO books_fts (books_fts, rowid, {columns}) VALUES ({old_row});
+                INSERT INTO books_fts (rowid, {columns}) VALUES ({new_row});
+            END
+            """,
+            # Index the books that already exist
+            "INSERT INTO books_fts (books_fts) VALUES ('rebuild')",
+        ]
+
+    def fulltext_search_query(self, terms, limit):
+        """
+        Builds a ranked full-text search over the title, author and genre of books.
+
+        Every term also matches words it is a prefix of, and results are ordered by BM25 relevance.
+
+        Parameters:
+            terms (list of str): The words searched for, containing only letters, digits and '_'.
+            limit (int): The maximum number of books returned.
+
+        Returns:
+            tuple: The SQL statement, which selects every book column followed by a relevance score,
+            and its parameters.
+        """
+        match = ' OR '.join(f'"{term}"*' for term in terms)
+        query = ("SELECT books.*, -books_fts.rank AS relevance FROM books_fts "
+                 "JOIN books ON books.book_id = books_fts.rowid "
+                 "WHERE books_fts MATCH %s ORDER BY books_fts.rank, books.book_id LIMIT %s")
+        return query, (match, limit)
+
+    def loan_partitions(self, conn):
+        """
+        Lists the shards of the loans table, recorded in loan_partitions when the table was sharded.
+
+        Parameters:
+            conn: A connection opened by this driver.
+
+        Returns:
+            list: (partition name, exclusive upper bound of loan_date as 'YYYY-MM-DD', or None for the
+            last partition, which has no bound) in order, or an empty list if loans is not sharded.
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'loan_partitions'")
+        if not cursor.fetchone()[0]:
+            return []
+        cursor.execute("SELECT partition_name, less_than FROM loan_partitions ORDER BY position")
+        return [tuple(row) for row in cursor.fetchall()]
+
+    def partition_loans_queries(self, conn, partitions):
+        """
+        Builds the statements that shard the loans table by loan_date range.
+
+        SQLite has no table partitioning, so each partition becomes its own table, loans_<partition>,
+        with the columns, foreign keys and indexes of loans. loans itself becomes a UNION ALL view over
+        the shards, whose INSTEAD OF triggers route each insert, update and delete to the right shard,
+        so code reading and writing loans is unchanged. Loan IDs are drawn from loan_sequence, as the
+        shards no longer share an AUTOINCREMENT counter.
+
+        Parameters:
+            conn: A connection opened by this driver.
+            partitions (list): (partition name, exclusive upper bound or None) for every partition.
+
+        Returns:
+            list: The SQL statements, in order.
+        """
+        columns = self.table_columns(conn, 'loans')
+        indexes = {name: cols for name, cols in self.index_columns(conn, 'loans').items()
+                   if name != 'PRIMARY' and not name.startswith('sqlite_')}
+        column_list = ', '.join(columns)
+
+        queries = [
+            "CREATE TABLE loan_partitions (partition_name VARCHAR(64) PRIMARY KEY, less_than DATETIME NULL, "
+            "position INT NOT NULL)",
+            "CREATE TABLE loan_sequence (last_id INTEGER NOT NULL)",
+            "INSERT INTO loan_sequence (last_id) SELECT MAX("
+            "COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'loans'), 0), "
+            "COALESCE((SELECT MAX(loan_id) FROM loans), 0))",
+        ]
+        lower = None
+        for name, bound in partitions:
+            queries.append(self._shard_table_query(conn, 'loans', f"loans_{name}"))
+            queries.append(f"INSERT INTO loans_{name} ({column_list}) SELECT {column_list} FROM loans "
+                           f"WHERE {self._partition_condition('loan_date', lower, bound)}")
+            queries.extend(self.create_index_query(f"loans_{name}", f"{index_name}_{name}", index_columns)
+                           for index_name, index_columns in indexes.items())
+            lower = bound
+        queries.append("DROP TABLE loans")
+        queries.append("DELETE FROM sqlite_sequence WHERE name = 'loans'")
+        return queries + self._loans_view_queries(columns, partitions)
+
+    def add_loan_partitions_queries(self, conn, partitions, new_partitions):
+        """
+        Builds the statements that add shards below the unbounded last shard of loans, moving into them
+        the loans of their range it already holds.
+
+        Parameters:
+            conn: A connection opened by this driver.
+            partitions (list): The current partitions, as returned by loan_partitions().
+            new_partitions (list): (partition name, exclusive upper bound) for each partition to add,
+                in order, all above the current bounds.
+
+        Returns:
+            list: The SQL statements, in order.
+        """
+        columns = self.table_columns(conn, 'loans')
+        indexes = {name: cols for name, cols in self.index_columns(conn, 'loans').items() if name != 'PRIMARY'}
+        column_list = ', '.join(columns)
+        last_name = partitions[-1][0]
+
+        queries = []
+        lower = partitions[-2][1] if len(partitions) > 1 else None
+        for name, bound in new_partitions:
+            condition = self._partition_condition('loan_date', lower, bound)
+            queries.append(self._shard_table_query(conn, f"loans_{last_name}", f"loans_{name}"))
+            queries.append(f"INSERT INTO loans_{name} ({column_list}) SELECT {column_list} "
+                           f"FROM loans_{last_name} WHERE {condition}")
+            queries.append(f"DELETE FROM loans_{last_name} WHERE {condition}")
+            queries.extend(self.create_index_query(f"loans_{name}", f"{index_name}_{name}", index_columns)
+                           for index_name, index_columns in indexes.items())
+            lower = bound
+        # Dropping the view drops its triggers too; both are rebuilt over the new set of shards
+        queries.append("DROP VIEW loans")
+        queries.append("DELETE FROM loan_partitions")
+        return queries + self._loans_view_queries(columns, partitions[:-1] + list(new_partitions) + partitions[-1:])
+
+    def loans_source(self, partitions):
+        """
+        Builds the FROM clause reading only the given shards of loans.
+
+        Parameters:
+            partitions (list): The partitions to read, as returned by loan_partitions(); all of loans
+                when empty.
+
+        Returns:
+            str: The table reference, usable as 'loans' in the rest of the query.
+        """
+        if not partitions:
+            return "loans"
+        if len(partitions) == 1:
+            return f"loans_{partitions[0][0]} AS loans"
+        return f"({' UNION ALL '.join(f'SELECT * FROM loans_{name}' for name, _ in partitions)}) AS loans"
+
+    def index_targets(self, conn, table_name, index_name):
+        """
+        Lists the tables an index on a table has to be created on: every shard of sharded loans.
+
+        Returns:
+            list: (table name, index name) pairs.
+        """
+        partitions = self.loan_partitions(conn) if table_name == 'loans' else []
+        if not partitions:
+            return [(table_name, index_name)]
+        return [(f"loans_{name}", f"{index_name}_{name}") for name, _ in partitions]
+
+    @staticmethod
+    def _shard_table_query(conn, source_table, shard_table):
+        """
+        Builds the CREATE TABLE of a shard with the columns and foreign keys of source_table.
+        """
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA table_info({source_table})")
+        definitions = [
+            "loan_id INTEGER PRIMARY KEY" if name == 'loan_id' else f"{name} {column_type}{' NOT NULL' if notnull else ''}"
+            for _, name, column_type, notnull, _, _ in cursor.fetchall()
+        ]
+        cursor.execute(f"PRAGMA foreign_key_list({source_table})")
+        definitions += [f"FOREIGN KEY ({row[3]}) REFERENCES {row[2]}({row[4]})" for row in cursor.fetchall()]
+        return f"CREATE TABLE {shard_table} ({', '.join(definitions)})"
+
+    @staticmethod
+    def _partition_condition(column, lower, upper):
+        """
+        Builds the condition a loan_date expression meets in the partition [lower, upper); never NULL,
+        and true for a NULL loan_date in the first partition only.
+        """
+        if lower is None:
+            return f"({column} IS NULL OR {column} < '{upper}')" if upper is not None else "1 = 1"
+        if upper is None:
+            return f"({column} IS NOT NULL AND {column} >= '{lower}')"
+        return f"({column} IS NOT NULL AND {column} >= '{lower}' AND {column} < '{upper}')"
+
+    def _loans_view_queries(self, columns, partitions):
+        """
+        Builds the loans view over the shards, the triggers routing writes to them and the
+        loan_partitions rows describing them.
+        """
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f"NEW.{column}" for column in columns)
+        inserts, updates, deletes = [], [], []
+        lower = None
+        for name, bound in partitions:
+            in_new = self._partition_condition('NEW.loan_date', lower, bound)
+            in_old = self._partition_condition('OLD.loan_date', lower, bound)
+            inserts.append(
+                f"INSERT INTO loans_{name} ({column_list}) SELECT "
+                f"{new_values.replace('NEW.loan_id', 'COALESCE(NEW.loan_id, (SELECT last_id FROM loan_sequence))')} "
+                f"WHERE {in_new};"
+            )
+            # A loan stays in its shard unless its loan_date moves it to another one
+            assignments = ', '.join(f"{column} = NEW.{column}" for column in columns)
+            updates.append(f"UPDATE loans_{name} SET {assignments} WHERE loan_id = OLD.loan_id AND {in_old} AND {in_new};")
+            updates.append(f"DELETE FROM loans_{name} WHERE loan_id = OLD.loan_id AND {in_old} AND NOT {in_new};")
+            updates.append(f"INSERT INTO loans_{name} ({column_list}) SELECT {new_values} WHERE {in_new} AND NOT {in_old};")
+            deletes.append(f"DELETE FROM loans_{name} WHERE loan_id = OLD.loan_id;")
+            lower = bound
+
+        shards = ' UNION ALL '.join(f"SELECT {column_list} FROM loans_{name}" for name, _ in partitions)
+        return [
+            f"CREATE VIEW loans AS {shards}",
+            f"""
+            CREATE TRIGGER loans_insert INSTEAD OF INSERT ON loans BEGIN
+                UPDATE loan_sequence SET last_id = COALESCE(MAX(last_id, NEW.loan_id), last_id + 1);
+                {' '.join(inserts)}
+            END
+            """,
+            f"""
+            CREATE TRIGGER loans_update INSTEAD OF UPDATE ON loans BEGIN
+                {' '.join(updates)}
+            END
+            """,
+            f"""
+            CREATE TRIGGER loans_delete INSTEAD OF DELETE ON loans BEGIN
+                {' '.join(deletes)}
+            END
+            """,
+        ] + [
+            f"INSERT INTO loan_partitions (partition_name, less_than, position) "
+            f"VALUES ('{name}', {'NULL' if bound is None else repr(bound)}, {position})"
+            for position, (name, bound) in enumerate(partitions)
+        ]
+
+    def estimate_row_count(self, conn, table_name):
+        """
+        Counts the rows in a table; SQLite keeps no cheaper statistic.
+
+        Parameters:
+            conn: A connection opened by this driver.
+            table_name (str): The table to measure.
+
+        Returns:
+            int: The row count, or 0 if the table does not exist yet.
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type IN ('table', 'view') AND name = %s",
+                       (table_name,))
+        if not cursor.fetchone()[0]:
+            return 0
+        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+        return cursor.fetchone()[0]
+
+    def begin(self, conn):
+        """
+        Starts a transaction for a unit of work, unless one is already open on the connection.
+
+        BEGIN IMMEDIATE takes the database's write lock up front, so the reads a unit of work makes
+        before writing cannot be invalidated by another writer before it commits.
+
+        Parameters:
+            conn: A connection opened by this driver.
+        """
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+
+    def is_healthy(self, conn):
+        """
+        Checks whether the connection is still usable.
+
+        Parameters:
+            conn: A connection opened by this driver.
+
+        Returns:
+            bool: True if a trivial query succeeds.
+        """
+        return conn.is_connected()
+
+
+DRIVERS = {
+    MySQLDriver.name: MySQLDriver,
+    SQLiteDriver.name: SQLiteDriver,
+}
+
+# Base exception class(es) of the installed drivers, usable in 'except Error' clauses
+Error = (sqlite3.Error, mysql.connector.Error) if mysql is not None else (sqlite3.Error,)
+
+
+def get_driver(dbinfo):
+    """
+    Returns the driver selected by DB_CONFIG['driver'].
+
+    Parameters:
+        dbinfo (dict): The DB_CONFIG dictionary from config.py. Configurations without a 'driver'
+            key use MySQL.
+
+    Returns:
+        MySQLDriver or SQLiteDriver: The configured driver.
+    """
+    name = dbinfo.get('driver', MySQLDriver.name)
+    try:
+        return DRIVERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown database driver '{name}'. Choose one of: {', '.join(DRIVERS)}.")
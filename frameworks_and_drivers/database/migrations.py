@@ -0,0 +1,455 @@
+import time
+from datetime import datetime
+from functools import partial
+from frameworks_and_drivers.database.drivers import Error
+
+# Secondary indexes backing the lookups the application performs, as (table, index name, columns).
+# Each tuple belongs to the migration that creates it and, like the migration, is never edited.
+SEARCH_INDEXES = (
+    ('books', 'idx_books_title', ('title',)),  # SearchBookUseCase by title
+    ('books', 'idx_books_isbn', ('isbn',)),
+    ('users', 'idx_users_name', ('name',)),  # SearchUserUseCase by name
+    ('loans', 'idx_loans_book_return', ('book_id', 'return_date')),  # loans of a book, active first
+    ('loans', 'idx_loans_user_return', ('user_id', 'return_date')),  # loans of a user, active first
+    ('loans', 'idx_loans_due_date', ('due_date',)),  # overdue lookups
+)
+OVERDUE_INDEXES = (
+    ('loans', 'idx_loans_return_due', ('return_date', 'due_date')),  # open loans past their due date
+)
+LOAN_DATE_INDEXES = (
+    ('loans', 'idx_loans_loan_date', ('loan_date',)),  # date-range reports
+)
+
+# Every secondary index a current schema has
+INDEXES = SEARCH_INDEXES + OVERDUE_INDEXES + LOAN_DATE_INDEXES
+
+create_schema_version_table_query = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at DATETIME NOT NULL
+);
+"""
+
+
+class Migration:
+    """
+    A single, ordered change to the database schema.
+
+    Attributes:
+        version (int): The schema version the migration brings the database to.
+        description (str): A short summary of the change.
+        apply (callable): Performs the change, given a connection and its driver.
+        estimate (callable, optional): Returns the number of rows the change would touch, given a
+            connection and its driver. Migrations without one are assumed to touch no rows.
+    """
+
+    def __init__(self, version, description, apply, estimate=None):
+        self.version = version
+        self.description = description
+        self.apply = apply
+        self.estimate = estimate
+
+    def estimate_rows(self, conn, driver):
+        """
+        Estimates how many rows applying the migration would touch.
+
+        Returns:
+            int: The estimated row count.
+        """
+        return self.estimate(conn, driver) if self.estimate else 0
+
+    def __str__(self):
+        return f"{self.version:04d} {self.description}"
+
+
+def find_missing_indexes(conn, driver, indexes=INDEXES):
+    """
+    Finds the given secondary indexes that the database lacks.
+
+    An index counts as present when any existing index on the table starts with the same columns,
+    whatever its name, because such an index serves the same lookups.
+
+    Parameters:
+        conn: The database connection object.
+        driver: The driver the connection was opened with.
+        indexes (tuple): (table, index name, columns) for each index; every index by default.
+
+    Returns:
+        list: The (table, index name, columns) entries of indexes that are missing.
+    """
+    missing = []
+    existing = {}
+    for table_name, index_name, columns in indexes:
+        if table_name not in existing:
+            existing[table_name] = driver.index_columns(conn, table_name).values()
+        if not any(index[:len(columns)] == columns for index in existing[table_name]):
+            missing.append((table_name, index_name, columns))
+    return missing
+
+
+def create_indexes(conn, driver, indexes):
+    """
+    Creates each of the given secondary indexes that is not already present.
+
+    An index on a table sharded by the embedded driver is created on every shard.
+
+    Parameters:
+        conn: The database connection object.
+        driver: The driver the connection was opened with.
+        indexes (tuple): (table, index name, columns) for each index.
+    """
+    cursor = conn.cursor()
+    for table_name, index_name, columns in find_missing_indexes(conn, driver, indexes):
+        for target_table, target_index in driver.index_targets(conn, table_name, index_name):
+            cursor.execute(driver.create_index_query(target_table, target_index, columns))
+        print(f"Index {index_name} created successfully")
+
+
+def backfill(conn, table_name, key_column, assignments, condition="1 = 1", args=(), batch_size=10000, pause=0.0):
+    """
+    Updates a large table in primary-key ranges, committing after every batch.
+
+    Each statement only locks the rows of one key range, so the table stays available to the
+    application while the backfill runs.
+
+    Parameters:
+        conn: The database connection object.
+        table_name (str): The table to update.
+        key_column (str): The table's integer primary key.
+        assignments (str): The SET clause, e.g. "status = 'available'".
+        condition (str): An optional WHERE condition limiting which rows are updated.
+        args (tuple): Parameters for the placeholders in assignments and condition.
+        batch_size (int): The width of each key range.
+        pause (float): Seconds to sleep between batches, to leave headroom for other traffic.
+
+    Returns:
+        int: The number of rows updated.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT MIN({key_column}), MAX({key_column}) FROM {table_name}")
+    low, high = cursor.fetchone()
+    if low is None:
+        return 0
+
+    updated = 0
+    for start in range(low, high + 1, batch_size):
+        cursor.execute(
+            f"UPDATE {table_name} SET {assignments} "
+            f"WHERE {key_column} >= %s AND {key_column} < %s AND ({condition})",
+            tuple(args) + (start, start + batch_size),
+        )
+        updated += cursor.rowcount
+        conn.commit()
+        if pause:
+            time.sleep(pause)
+    return updated
+
+
+def estimate_backfill(conn, table_name, condition="1 = 1", args=()):
+    """
+    Counts the rows a backfill() with the same condition would update.
+
+    Returns:
+        int: The number of matching rows.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table_name} WHERE {condition}", tuple(args))
+    return cursor.fetchone()[0]
+
+
+def _create_tables(conn, driver):
+    cursor = conn.cursor()
+    for create_table_query in driver.create_table_queries:
+        cursor.execute(create_table_query)
+
+
+def _estimate_indexes(conn, driver, indexes):
+    # Building an index reads every row of its table once
+    tables = {table_name for table_name, _, _ in find_missing_indexes(conn, driver, indexes)}
+    return sum(driver.estimate_row_count(conn, table_name) for table_name in tables)
+
+
+def _create_import_checkpoints_table(conn, driver):
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source VARCHAR(255) PRIMARY KEY,
+            records_committed INT NOT NULL
+        );
+        """
+    )
+
+
+def _create_book_availability_table(conn, driver):
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS book_availability (
+            book_id INT PRIMARY KEY,
+            total_copies INT NOT NULL DEFAULT 1,
+            copies_out INT NOT NULL DEFAULT 0,
+            FOREIGN KEY (book_id) REFERENCES books(book_id)
+        );
+        """
+    )
+    # One copy per book, unless more loans than that are already open
+    cursor.execute(
+        """
+        INSERT INTO book_availability (book_id, total_copies, copies_out)
+        SELECT books.book_id,
+               CASE WHEN COUNT(loans.loan_id) > 1 THEN COUNT(loans.loan_id) ELSE 1 END,
+               COUNT(loans.loan_id)
+        FROM books
+        LEFT JOIN loans ON loans.book_id = books.book_id AND loans.return_date IS NULL
+        WHERE books.book_id NOT IN (SELECT book_id FROM book_availability)
+        GROUP BY books.book_id
+        """
+    )
+
+
+def _estimate_book_availability(conn, driver):
+    return driver.estimate_row_count(conn, 'books')
+
+
+def default_barcode(book_id, number):
+    """
+    Builds the barcode given to a copy that was created without one.
+
+    Parameters:
+        book_id (int): The book the copy belongs to.
+        number (int): The copy's number within the book, starting at 1.
+
+    Returns:
+        str: A barcode unique to the copy.
+    """
+    return f"B{book_id:08d}-{number:03d}"
+
+
+def _create_copies_table(conn, driver, batch_size=10000, pause=0.01):
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS copies (
+            copy_id {driver.auto_increment_key},
+            book_id INT NOT NULL,
+            barcode VARCHAR(64) UNIQUE NOT NULL,
+            FOREIGN KEY (book_id) REFERENCES books(book_id)
+        );
+        """
+    )
+    # The migration commits as it goes, so each step is skipped or redone if an earlier attempt failed after it
+    if 'copy_id' not in driver.table_columns(conn, 'loans'):
+        cursor.execute("ALTER TABLE loans ADD COLUMN copy_id INT NULL")
+    create_indexes(conn, driver, (('copies', 'idx_copies_book', ('book_id',)),
+                                  ('loans', 'idx_loans_copy_return', ('copy_id', 'return_date'))))
+    conn.commit()
+
+    # As many copies as each book's availability record counts, one range of book IDs at a time; a range
+    # commits at once, so a book either has all its copies or none yet
+    cursor.execute("SELECT MIN(book_id), MAX(book_id) FROM book_availability")
+    low, high = cursor.fetchone()
+    for start in range(low or 0, (high or -1) + 1, batch_size):
+        cursor.execute(
+            "SELECT book_id, total_copies FROM book_availability WHERE book_id >= %s AND book_id < %s "
+            "AND NOT EXISTS (SELECT 1 FROM copies WHERE copies.book_id = book_availability.book_id) "
+            "ORDER BY book_id",
+            (start, start + batch_size),
+        )
+        copies = [(book_id, default_barcode(book_id, number))
+                  for book_id, total_copies in cursor.fetchall() for number in range(1, total_copies + 1)]
+        cursor.executemany("INSERT INTO copies (book_id, barcode) VALUES (%s, %s)", copies)
+        conn.commit()
+        if pause:
+            time.sleep(pause)
+
+    # The n-th open loan of a book, by loan_id, is assigned the book's n-th copy, by copy_id
+    cursor.execute("DROP TABLE IF EXISTS copy_numbers")
+    cursor.execute("DROP TABLE IF EXISTS copy_assignments")
+    cursor.execute("CREATE TABLE copy_numbers (book_id INT, number INT, copy_id INT, PRIMARY KEY (book_id, number))")
+    cursor.execute(
+        """
+        INSERT INTO copy_numbers (book_id, number, copy_id)
+        SELECT book_id, ROW_NUMBER() OVER (PARTITION BY book_id ORDER BY copy_id), copy_id FROM copies
+        """
+    )
+    cursor.execute("CREATE TABLE copy_assignments (loan_id INT PRIMARY KEY, copy_id INT NOT NULL)")
+    cursor.execute(
+        """
+        INSERT INTO copy_assignments (loan_id, copy_id)
+        SELECT open_loans.loan_id, copy_numbers.copy_id
+        FROM (SELECT loan_id, book_id, ROW_NUMBER() OVER (PARTITION BY book_id ORDER BY loan_id) AS number
+              FROM loans WHERE return_date IS NULL) AS open_loans
+        JOIN copy_numbers ON copy_numbers.book_id = open_loans.book_id AND copy_numbers.number = open_loans.number
+        """
+    )
+    cursor.execute("DROP TABLE copy_numbers")
+    conn.commit()
+    backfill(conn, 'loans', 'loan_id',
+             "copy_id = (SELECT copy_id FROM copy_assignments WHERE copy_assignments.loan_id = loans.loan_id)",
+             condition="return_date IS NULL", batch_size=batch_size, pause=pause)
+    cursor.execute("DROP TABLE copy_assignments")
+
+
+def _estimate_copies(conn, driver):
+    return driver.estimate_row_count(conn, 'book_availability')
+
+
+def _create_fulltext_index(conn, driver):
+    cursor = conn.cursor()
+    for query in driver.create_fulltext_index_queries():
+        cursor.execute(query)
+
+
+def _estimate_fulltext_index(conn, driver):
+    # Building the index reads every book once
+    return driver.estimate_row_count(conn, 'books')
+
+
+def _create_fines_tables(conn, driver):
+    cursor = conn.cursor()
+    # Append-only ledger: each fines run adds the change in a loan's fine since the previous run.
+    # No foreign keys, so the fines outlive loans that are later deleted.
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS fines (
+            fine_id {driver.auto_increment_key},
+            loan_id INT NOT NULL,
+            user_id INT NOT NULL,
+            days_late INT NOT NULL,
+            amount_cents INT NOT NULL,
+            assessed_on DATE NOT NULL
+        );
+        """
+    )
+    # The running total of each fined loan, and whether it can still change
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fine_totals (
+            loan_id INT PRIMARY KEY,
+            user_id INT NOT NULL,
+            days_late INT NOT NULL,
+            amount_cents INT NOT NULL,
+            settled INT NOT NULL DEFAULT 0
+        );
+        """
+    )
+    # One row per fines run; the latest as_of date is the watermark of the next run
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS fine_runs (
+            run_id {driver.auto_increment_key},
+            as_of DATE NOT NULL,
+            loans_assessed INT NOT NULL,
+            entries_written INT NOT NULL,
+            ran_at DATETIME NOT NULL
+        );
+        """
+    )
+    cursor.execute(driver.create_index_query('fines', 'idx_fines_user', ('user_id',)))
+    cursor.execute(driver.create_index_query('fines', 'idx_fines_loan', ('loan_id',)))
+    cursor.execute(driver.create_index_query('fine_totals', 'idx_fine_totals_settled', ('settled',)))
+    cursor.execute(driver.create_index_query('fine_totals', 'idx_fine_totals_user', ('user_id',)))
+
+
+def _create_loans_archive_table(conn, driver):
+    cursor = conn.cursor()
+    # The columns of loans, keeping each loan's ID, plus when it was archived; no foreign keys, so
+    # books and users can still be deleted once only archived loans refer to them
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS loans_archive (
+            loan_id INT PRIMARY KEY,
+            book_id INT,
+            user_id INT,
+            loan_date DATETIME,
+            due_date DATETIME,
+            return_date DATETIME NULL,
+            copy_id INT NULL,
+            archived_at DATETIME NOT NULL
+        );
+        """
+    )
+    cursor.execute(driver.create_index_query('loans_archive', 'idx_loans_archive_book', ('book_id',)))
+    cursor.execute(driver.create_index_query('loans_archive', 'idx_loans_archive_user', ('user_id',)))
+
+
+# Every schema change, in the order it is applied. Append new migrations; never edit applied ones.
+MIGRATIONS = [
+    Migration(1, "Create books, users and loans tables", _create_tables),
+    Migration(2, "Create secondary indexes for searches and loan lookups",
+              partial(create_indexes, indexes=SEARCH_INDEXES), partial(_estimate_indexes, indexes=SEARCH_INDEXES)),
+    Migration(3, "Create import_checkpoints table for resumable bulk imports", _create_import_checkpoints_table),
+    Migration(4, "Create book_availability counters seeded from open loans", _create_book_availability_table,
+              _estimate_book_availability),
+    Migration(5, "Create copies table with one barcode per physical copy; loans reference copies",
+              _create_copies_table, _estimate_copies),
+    Migration(6, "Create full-text index over book titles, authors and genres", _create_fulltext_index,
+              _estimate_fulltext_index),
+    Migration(7, "Index open loans by due date for the overdue report",
+              partial(create_indexes, indexes=OVERDUE_INDEXES), partial(_estimate_indexes, indexes=OVERDUE_INDEXES)),
+    Migration(8, "Create fines ledger, per-loan fine totals and fines run watermarks", _create_fines_tables),
+    Migration(9, "Create loans_archive table for returned loans moved out of loans", _create_loans_archive_table),
+    Migration(10, "Index loans by loan date for date-range reports",
+              partial(create_indexes, indexes=LOAN_DATE_INDEXES), partial(_estimate_indexes, indexes=LOAN_DATE_INDEXES)),
+]
+
+
+def current_version(conn):
+    """
+    Reads the schema version of the database, creating the schema_version table if needed.
+
+    Returns:
+        int: The highest applied migration version, or 0 for a new database.
+    """
+    cursor = conn.cursor()
+    cursor.execute(create_schema_version_table_query)
+    cursor.execute("SELECT MAX(version) FROM schema_version")
+    row = cursor.fetchone()
+    conn.commit()
+    return row[0] or 0
+
+
+def migrate(conn, driver, dry_run=False):
+    """
+    Applies all pending migrations, in order.
+
+    Each migration is recorded in schema_version once it succeeds, so running migrate() again only
+    applies what is new and returns immediately when the schema is current.
+
+    Parameters:
+        conn: The database connection object.
+        driver: The driver the connection was opened with.
+        dry_run (bool): Only report the pending migrations and the rows they would touch.
+
+    Returns:
+        list: (Migration, estimated rows) for each pending migration.
+    """
+    version = current_version(conn)
+    pending = [migration for migration in MIGRATIONS if migration.version > version]
+    if not pending:
+        return []
+
+    plan = []
+    for migration in pending:
+        rows = migration.estimate_rows(conn, driver)
+        plan.append((migration, rows))
+        if dry_run:
+            print(f"Pending migration {migration}: about {rows} rows touched")
+            continue
+
+        try:
+            migration.apply(conn, driver)
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (%s, %s, %s)",
+                (migration.version, migration.description, datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+            )
+            conn.commit()
+            print(f"Migration {migration} applied successfully")
+        except Error as err:
+            print(f"Error: '{err}'")
+            conn.rollback()
+            raise
+    return plan
@@ -0,0 +1,91 @@
+from datetime import date
+
+from frameworks_and_drivers.database.drivers import Error
+
+# Name of the last partition of loans, which holds every loan dated after the yearly partitions
+FUTURE_PARTITION = 'p_future'
+
+
+def yearly_partitions(first_year, last_year):
+    """
+    Builds one partition per calendar year of loan_date.
+
+    The first partition also holds every older loan, so no loan_date falls outside the partitions.
+
+    Parameters:
+        first_year (int): The year of the first partition.
+        last_year (int): The year of the last bounded partition.
+
+    Returns:
+        list: (partition name, exclusive upper bound as 'YYYY-MM-DD') for each year, in order.
+    """
+    return [(f"p{year}", f"{year + 1}-01-01") for year in range(first_year, last_year + 1)]
+
+
+def partitions_between(partitions, start, end):
+    """
+    Selects the partitions that can hold loans dated in [start, end).
+
+    Parameters:
+        partitions (list): (partition name, exclusive upper bound or None) for every partition, in order.
+        start (str): The first loan_date of the range, as 'YYYY-MM-DD'.
+        end (str): The loan_date the range stops before, as 'YYYY-MM-DD'.
+
+    Returns:
+        list: The overlapping partitions, in order; empty if partitions is.
+    """
+    selected = []
+    lower = None
+    for name, bound in partitions:
+        if (bound is None or start < bound) and (lower is None or end > lower):
+            selected.append((name, bound))
+        lower = bound
+    return selected
+
+
+def maintain_loan_partitions(conn, driver, future_partitions=2):
+    """
+    Partitions the loans table by loan_date year, or extends an already partitioned one.
+
+    The first run creates a partition for every year from the oldest loan to future_partitions years
+    ahead, plus an unbounded last partition; later runs add the years that have come within
+    future_partitions years since, so new loans never pile up in the unbounded partition. Cheap when
+    nothing is missing, so it is safe to call on every start.
+
+    Parameters:
+        conn: The database connection object.
+        driver: The driver the connection was opened with.
+        future_partitions (int): The number of years ahead of the current one kept partitioned.
+
+    Returns:
+        list: The partitions created, as (partition name, exclusive upper bound).
+    """
+    last_year = date.today().year + future_partitions
+    partitions = driver.loan_partitions(conn)
+    if partitions:
+        bounded = [bound for _, bound in partitions if bound is not None]
+        first_year = int(bounded[-1][:4]) if bounded else date.today().year
+        created = yearly_partitions(first_year, last_year)
+        queries = driver.add_loan_partitions_queries(conn, partitions, created) if created else []
+    else:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(loan_date) FROM loans")
+        oldest = cursor.fetchone()[0]
+        first_year = min(int(str(oldest)[:4]), last_year) if oldest is not None else date.today().year
+        created = yearly_partitions(first_year, last_year) + [(FUTURE_PARTITION, None)]
+        queries = driver.partition_loans_queries(conn, created)
+
+    if not queries:
+        return []
+    try:
+        driver.begin(conn)
+        cursor = conn.cursor()
+        for query in queries:
+            cursor.execute(query)
+        conn.commit()
+    except Error as err:
+        print(f"Error: '{err}'")
+        conn.rollback()
+        raise
+    print(f"Loan partitions {', '.join(name for name, _ in created)} created successfully")
+    return created
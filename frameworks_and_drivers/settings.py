@@ -0,0 +1,48 @@
+import config
+from interface_adapters.repositories.entity_cache import EntityCache
+
+
+def create_entity_cache():
+    """
+    Creates an EntityCache from the optional CACHE_CONFIG dictionary in config.py.
+
+    Returns:
+        EntityCache or None: A cache when CACHE_CONFIG['enabled'] is true, otherwise None.
+    """
+    cache_info = getattr(config, 'CACHE_CONFIG', {})  # Older config.py files have no CACHE_CONFIG
+    if not cache_info.get('enabled', False):
+        return None
+    return EntityCache(
+        max_entries=cache_info.get('max_entries', 10000),
+        ttl_seconds=cache_info.get('ttl_seconds', 60.0),
+    )
+
+
+def load_fine_policy():
+    """
+    Reads the late-fee policy from the optional FINES_CONFIG dictionary in config.py.
+
+    Returns:
+        dict: daily_rate_cents, max_fine_cents and grace_days, with defaults for missing keys.
+    """
+    fines_info = getattr(config, 'FINES_CONFIG', {})  # Older config.py files have no FINES_CONFIG
+    return {
+        'daily_rate_cents': fines_info.get('daily_rate_cents', 25),
+        'max_fine_cents': fines_info.get('max_fine_cents', 2000),
+        'grace_days': fines_info.get('grace_days', 0),
+    }
+
+
+def load_archive_policy():
+    """
+    Reads the loan archival settings from the optional ARCHIVE_CONFIG dictionary in config.py.
+
+    Returns:
+        dict: min_age_days, batch_size and pause_seconds, with defaults for missing keys.
+    """
+    archive_info = getattr(config, 'ARCHIVE_CONFIG', {})  # Older config.py files have no ARCHIVE_CONFIG
+    return {
+        'min_age_days': archive_info.get('min_age_days', 365),
+        'batch_size': archive_info.get('batch_size', 500),
+        'pause_seconds': archive_info.get('pause_seconds', 0.1),
+    }
@@ -4,7 +4,9 @@ class BookController:
     """
 
     def __init__(self, add_book_use_case, update_book_info_use_case, delete_book_use_case, search_book_use_case,
-                 show_database_tables_use_case):
+                 show_database_tables_use_case, bulk_import_books_use_case=None, add_book_copies_use_case=None):
+        self.add_book_copies_use_case = add_book_copies_use_case
+        self.bulk_import_books_use_case = bulk_import_books_use_case
         self.delete_book_use_case = delete_book_use_case
         self.add_book_use_case = add_book_use_case
         self.update_book_info_use_case = update_book_info_use_case
@@ -28,6 +30,37 @@ class BookController:
         except Exception as e:
             return str(e)
 
+    def bulk_import_books(self, file_path, batch_size=1000):
+        """
+        Imports many books from a CSV or JSON Lines file.
+
+        Parameters:
+            file_path (str): The path of the .csv or .jsonl file to import.
+            batch_size (int): The number of books inserted and committed at a time.
+
+        Returns:
+            dict: The import report, or an error message.
+        """
+        try:
+            return self.bulk_import_books_use_case.execute(file_path, batch_size)
+        except Exception as e:
+            return str(e)
+
+    def add_copies(self, book_id, count=1, barcodes=None):
+        """
+        Adds physical copies of a book to the library.
+
+        Parameters:
+            book_id (int): The unique identifier of the book.
+            count (int): The number of copies to add when no barcodes are given.
+            barcodes (list of str, optional): The barcodes of the new copies.
+        """
+        try:
+            copy_ids = self.add_book_copies_use_case.execute(book_id, count, barcodes)
+            return f"{len(copy_ids)} copies added successfully."
+        except Exception as e:
+            return str(e)
+
     def update_book_info(self, book_id, title, author, isbn, publication_year, genre):
         """
         Updates the details of an existing book in the library.
@@ -58,6 +91,24 @@ class BookController:
         except Exception as e:
             return str(e)
 
+    def delete_books(self, book_ids):
+        """
+        Deletes several books, keeping those that loans still refer to.
+
+        Parameters:
+            book_ids (list of int): The unique identifiers of the books to be deleted.
+        """
+        try:
+            result = self.delete_book_use_case.execute_bulk(book_ids)
+        except Exception as e:
+            return str(e)
+        message = f"{len(result['deleted'])} books deleted successfully."
+        if result['active_loans']:
+            message += f" Kept for active loans: {', '.join(map(str, result['active_loans']))}."
+        if result['returned_loans']:
+            message += f" Kept for returned loans not yet archived: {', '.join(map(str, result['returned_loans']))}."
+        return message
+
     def search_book(self, id_field_name, id_value, fetchone=True):
         """
         Searches a book from the library.
@@ -72,6 +123,36 @@ class BookController:
         except Exception as e:
             return str(e)
 
+    def search_books_fulltext(self, text, limit=10):
+        """
+        Searches books by words from their title, author or genre, most relevant first.
+
+        Parameters:
+            text (str): The words to search for.
+            limit (int): The maximum number of books to return.
+        """
+        try:
+            return self.search_book_use_case.execute_fulltext(text, limit)
+        except Exception as e:
+            return str(e)
+
+    def suggest_books(self, field, prefix, limit=10):
+        """
+        Suggests completions of a book field for an autocomplete box.
+
+        Parameters:
+            field (str): The field to complete.
+            prefix (str): What has been typed so far.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list: (value, book_id) pairs, or an empty list if suggestions are unavailable.
+        """
+        try:
+            return self.search_book_use_case.suggest(field, prefix, limit)
+        except Exception:
+            return []
+
     def get_books(self, fetchone=True):
         """
         Retrieves all book record(s) from the database.
@@ -86,3 +167,32 @@ class BookController:
             return self.show_database_tables_use_case.execute('books', fetchone)
         except Exception as e:
             return str(e)
+
+    def get_books_page(self, page_size=50, after=None, columnar=False):
+        """
+        Retrieves one page of book records from the database.
+
+        Parameters:
+            page_size (int): The maximum number of books to return.
+            after (int, optional): The next_cursor of the previous page; None for the first page.
+            columnar (bool): Return the page as one Arrow record batch instead of a list of rows.
+
+        Returns:
+            Book record(s) with their headers and the next_cursor for the following page.
+        """
+        try:
+            return self.show_database_tables_use_case.execute_page('books', page_size, after, columnar)
+        except Exception as e:
+            return str(e)
+
+    def iter_books(self, chunk_size=1000):
+        """
+        Streams every book record from the database without loading the whole table.
+
+        Parameters:
+            chunk_size (int): The number of rows fetched from the database at a time.
+
+        Returns:
+            generator: Yields one book record at a time.
+        """
+        return self.show_database_tables_use_case.iterate('books', chunk_size)
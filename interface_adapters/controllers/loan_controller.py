@@ -4,7 +4,12 @@ class LoanController:
     """
 
     def __init__(self, borrow_book_use_case, return_book_use_case, delete_loan_use_case, search_loan_use_case,
-                 show_database_tables_use_case):
+                 show_database_tables_use_case, list_overdue_loans_use_case=None, assess_fines_use_case=None,
+                 archive_loans_use_case=None, loan_activity_report_use_case=None):
+        self.loan_activity_report_use_case = loan_activity_report_use_case
+        self.archive_loans_use_case = archive_loans_use_case
+        self.assess_fines_use_case = assess_fines_use_case
+        self.list_overdue_loans_use_case = list_overdue_loans_use_case
         self.show_database_tables_use_case = show_database_tables_use_case
         self.delete_loan_use_case = delete_loan_use_case
         self.borrow_book_use_case = borrow_book_use_case
@@ -27,6 +32,22 @@ class LoanController:
         except Exception as e:
             return str(e)
 
+    def borrow_books(self, book_ids, user_id, loan_date, due_date):
+        """
+        Creates loan records for several books borrowed together, in a single transaction.
+
+        Parameters:
+            book_ids (list of int): The unique identifiers of the books being loaned.
+            user_id (int): The unique identifier of the user who is borrowing the books.
+            loan_date (str): The date when the books are loaned out.
+            due_date (str): The due date for returning the books.
+        """
+        try:
+            self.borrow_book_use_case.execute_batch(book_ids, user_id, loan_date, due_date)
+            return f"{len(book_ids)} books borrowed successfully."
+        except Exception as e:
+            return str(e)
+
     def return_book(self, loan_id, return_date):
         """
         Updates a loan record for returning a book in the library.
@@ -41,6 +62,20 @@ class LoanController:
         except Exception as e:
             return str(e)
 
+    def return_books(self, loan_ids, return_date):
+        """
+        Updates several loan records for books returned together, in a single transaction.
+
+        Parameters:
+            loan_ids (list of int): The unique identifiers of the loans.
+            return_date (str): The date when the books are returned.
+        """
+        try:
+            self.return_book_use_case.execute_batch(loan_ids, return_date)
+            return f"{len(loan_ids)} books returned successfully."
+        except Exception as e:
+            return str(e)
+
     def delete_loan(self, loan_id):
         """
         Deletes a loan record from the library system.
@@ -53,7 +88,7 @@ class LoanController:
         except Exception as e:
             return str(e)
 
-    def search_loan(self, id_field_name, id_value, fetchone=True):
+    def search_loan(self, id_field_name, id_value, fetchone=True, include_archive=False):
         """
         Searches loan(s) from the library.
 
@@ -61,9 +96,10 @@ class LoanController:
             id_field_name (str): The column/field name of the id.
             id_value (str or int): The unique identifier of the column/field.
             fetchone (bool): Check if the user needs only one loan.
+            include_archive (bool): Also search the archived loans.
         """
         try:
-            return self.search_loan_use_case.execute(id_field_name, id_value, fetchone)
+            return self.search_loan_use_case.execute(id_field_name, id_value, fetchone, include_archive)
         except Exception as e:
             return str(e)
 
@@ -81,3 +117,115 @@ class LoanController:
             return self.show_database_tables_use_case.execute('loans', fetchone)
         except Exception as e:
             return str(e)
+
+    def get_loans_page(self, page_size=50, after=None, columnar=False):
+        """
+        Retrieves one page of loan records from the database.
+
+        Parameters:
+            page_size (int): The maximum number of loans to return.
+            after (int, optional): The next_cursor of the previous page; None for the first page.
+            columnar (bool): Return the page as one Arrow record batch instead of a list of rows.
+
+        Returns:
+            Loan record(s) with their headers and the next_cursor for the following page.
+        """
+        try:
+            return self.show_database_tables_use_case.execute_page('loans', page_size, after, columnar)
+        except Exception as e:
+            return str(e)
+
+    def iter_loans(self, chunk_size=1000):
+        """
+        Streams every loan record from the database without loading the whole table.
+
+        Parameters:
+            chunk_size (int): The number of rows fetched from the database at a time.
+
+        Returns:
+            generator: Yields one loan record at a time.
+        """
+        return self.show_database_tables_use_case.iterate('loans', chunk_size)
+
+    def get_overdue_loans(self, limit=None):
+        """
+        Lists the loans that are past their due date and not yet returned, most overdue first.
+
+        Parameters:
+            limit (int, optional): The maximum number of loans to return.
+
+        Returns:
+            Overdue loan records with the book title and borrower's name, and their headers.
+        """
+        try:
+            return self.list_overdue_loans_use_case.execute(limit=limit)
+        except Exception as e:
+            return str(e)
+
+    def get_loan_activity(self, start=None, end=None):
+        """
+        Summarizes, month by month, the loans made over a period.
+
+        Parameters:
+            start (date, optional): The first day of the period; January 1 of the current year if omitted.
+            end (date, optional): The day the period stops before; a year after start if omitted.
+
+        Returns:
+            Monthly loan figures with their headers, or an error message.
+        """
+        try:
+            return self.loan_activity_report_use_case.execute(start, end)
+        except Exception as e:
+            return str(e)
+
+    def archive_loans(self):
+        """
+        Moves the loans returned long enough ago into the archive.
+
+        Returns:
+            A message with the number of loans archived, or an error message.
+        """
+        try:
+            archived = self.archive_loans_use_case.execute()
+            return f"{archived} loans archived."
+        except Exception as e:
+            return str(e)
+
+    def assess_fines(self):
+        """
+        Charges late fees on the loans returned late or still out past their due date, up to today.
+
+        Returns:
+            A summary of the run, or an error message.
+        """
+        try:
+            return self.assess_fines_use_case.execute()
+        except Exception as e:
+            return str(e)
+
+    def get_fines_by_user(self, limit=50):
+        """
+        Lists the users with the highest fines.
+
+        Parameters:
+            limit (int): The maximum number of users to return.
+
+        Returns:
+            Per-user totals with their headers, highest first.
+        """
+        try:
+            return self.assess_fines_use_case.totals_by_user(limit)
+        except Exception as e:
+            return str(e)
+
+    def iter_overdue_loans(self, chunk_size=1000):
+        """
+        Streams every overdue loan from the database, e.g. for a nightly report.
+
+        Parameters:
+            chunk_size (int): The number of rows fetched from the database at a time.
+
+        Returns:
+            generator: Yields one overdue loan at a time.
+        """
+        return self.list_overdue_loans_use_case.iterate(chunk_size=chunk_size)
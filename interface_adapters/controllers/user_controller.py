@@ -26,6 +26,22 @@ class UserController:
         except Exception as e:
             return str(e)
 
+    def register_users_bulk(self, users, batch_size=1000):
+        """
+        Registers many users at once, skipping duplicate email addresses.
+
+        Parameters:
+            users (iterable of dict): Records with 'name', 'email' and 'role' keys.
+            batch_size (int): The number of users inserted and committed at a time.
+
+        Returns:
+            list of tuples: (row number, email, outcome) for every input row, or an error message.
+        """
+        try:
+            return self.user_registration_use_case.execute_bulk(users, batch_size)
+        except Exception as e:
+            return str(e)
+
     def update_user_info(self, user_id, name, email, role):
         """
         Updates the details of an existing user in the library.
@@ -54,6 +70,24 @@ class UserController:
         except Exception as e:
             return str(e)
 
+    def delete_users(self, user_ids):
+        """
+        Deletes several users, keeping those that loans still refer to.
+
+        Parameters:
+            user_ids (list of int): The unique identifiers of the users to be deleted.
+        """
+        try:
+            result = self.delete_user_use_case.execute_bulk(user_ids)
+        except Exception as e:
+            return str(e)
+        message = f"{len(result['deleted'])} users deleted successfully."
+        if result['active_loans']:
+            message += f" Kept for active loans: {', '.join(map(str, result['active_loans']))}."
+        if result['returned_loans']:
+            message += f" Kept for returned loans not yet archived: {', '.join(map(str, result['returned_loans']))}."
+        return message
+
     def search_user(self, id_field_name, id_value, fetchone=True):
         """
         Searches a user from the library.
@@ -68,6 +102,36 @@ class UserController:
         except Exception as e:
             return str(e)
 
+    def search_users_fuzzy(self, text, limit=5):
+        """
+        Searches users by a name or email that may contain typos, closest first.
+
+        Parameters:
+            text (str): The name or email address to look for.
+            limit (int): The maximum number of users to return.
+        """
+        try:
+            return self.search_user_use_case.execute_fuzzy(text, limit)
+        except Exception as e:
+            return str(e)
+
+    def suggest_users(self, field, prefix, limit=10):
+        """
+        Suggests completions of a user field for an autocomplete box.
+
+        Parameters:
+            field (str): The field to complete.
+            prefix (str): What has been typed so far.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list: (value, user_id) pairs, or an empty list if suggestions are unavailable.
+        """
+        try:
+            return self.search_user_use_case.suggest(field, prefix, limit)
+        except Exception:
+            return []
+
     def get_users(self, fetchone=True):
         """
         Retrieves all user record(s) from the database.
@@ -82,3 +146,32 @@ class UserController:
             return self.show_database_tables_use_case.execute('users', fetchone)
         except Exception as e:
             return str(e)
+
+    def get_users_page(self, page_size=50, after=None, columnar=False):
+        """
+        Retrieves one page of user records from the database.
+
+        Parameters:
+            page_size (int): The maximum number of users to return.
+            after (int, optional): The next_cursor of the previous page; None for the first page.
+            columnar (bool): Return the page as one Arrow record batch instead of a list of rows.
+
+        Returns:
+            User record(s) with their headers and the next_cursor for the following page.
+        """
+        try:
+            return self.show_database_tables_use_case.execute_page('users', page_size, after, columnar)
+        except Exception as e:
+            return str(e)
+
+    def iter_users(self, chunk_size=1000):
+        """
+        Streams every user record from the database without loading the whole table.
+
+        Parameters:
+            chunk_size (int): The number of rows fetched from the database at a time.
+
+        Returns:
+            generator: Yields one user record at a time.
+        """
+        return self.show_database_tables_use_case.iterate('users', chunk_size)
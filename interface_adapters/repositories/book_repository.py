@@ -1,4 +1,9 @@
-from mysql.connector import Error
+import re
+from entities.book import Book
+from frameworks_and_drivers.database.drivers import Error
+from frameworks_and_drivers.database.migrations import default_barcode
+from interface_adapters.repositories.columnar import to_record_batch
+from interface_adapters.repositories.hydration import hydrate, hydrate_result
 
 
 class BookRepository:
@@ -6,14 +11,34 @@ class BookRepository:
     Repository class for handling the database operations related to books.
     """
 
-    def __init__(self, connection):
+    # Fields that can be autocompleted with suggest()
+    suggestion_fields = ('title', 'author')
+
+    def __init__(self, connection_pool, cache=None, suggestions=None):
         """
-        Initializes the BookRepository with a database connection.
+        Initializes the BookRepository with a database connection pool.
 
         Parameters:
-            connection: A MySQL database connection object.
+            connection_pool (ConnectionPool): The pool that database connections are leased from.
+            cache (EntityCache, optional): Cache for single-record lookups by book_id.
+            suggestions (SuggestionIndex, optional): In-process prefix index over the title and author of every
+                book, kept current by this repository's writes.
+        """
+        self.connection_pool = connection_pool
+        self.cache = cache
+        self.suggestions = suggestions
+
+    def transaction(self):
+        """
+        Opens a unit of work shared by every repository using the same connection pool.
+
+        Repository calls made inside the returned context manager run in one transaction with a single
+        commit at the end, and are rolled back together if any of them fails.
+
+        Returns:
+            A context manager yielding the leased connection.
         """
-        self.connection = connection
+        return self.connection_pool.transaction()
 
     def add_book(self, title, author, isbn, publication_year, genre):
         """
@@ -32,16 +57,170 @@ class BookRepository:
                 """
         args = (title, author, isbn, publication_year, genre)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            self.connection.commit()
-            print("Book added successfully")
-        except Error as e:
-            print(f"Error: '{e}'")
-            self.connection.rollback()
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                book_id = cursor.lastrowid
+                self._add_first_copies(cursor, [book_id])
+                self.connection_pool.commit(connection)
+                if self.suggestions is not None:
+                    self.connection_pool.on_commit(lambda: self.suggestions.put(book_id, (title, author)))
+                print("Book added successfully")
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+
+    def add_books(self, books, checkpoint=None):
+        """
+        Adds many books to the database with a single batched INSERT and one commit.
+
+        Parameters:
+            books (list of tuples): (title, author, isbn, publication_year, genre) for each book.
+            checkpoint (tuple, optional): (source, records_committed) to record in import_checkpoints
+                in the same transaction, so an interrupted import resumes after the last committed batch.
+
+        Returns:
+            int: The number of books added.
+
+        Raises:
+            Error: If the batch could not be written; nothing from the batch is committed.
+        """
+        query = """
+                INSERT INTO books (title, author, isbn, publication_year, genre) 
+                VALUES (%s, %s, %s, %s, %s)
+                """
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute("SELECT COALESCE(MAX(book_id), 0) FROM books")
+                last_book_id = cursor.fetchone()[0]
+                cursor.executemany(query, books)
+                cursor.execute(
+                    """
+                    SELECT book_id, title, author FROM books
+                    WHERE book_id > %s AND book_id NOT IN (SELECT book_id FROM book_availability WHERE book_id > %s)
+                    """,
+                    (last_book_id, last_book_id),
+                )
+                added = cursor.fetchall()
+                self._add_first_copies(cursor, [row[0] for row in added])
+                if checkpoint is not None:
+                    source, records_committed = checkpoint
+                    cursor.execute(
+                        "UPDATE import_checkpoints SET records_committed = %s WHERE source = %s",
+                        (records_committed, source),
+                    )
+                    if cursor.rowcount == 0:
+                        cursor.execute(
+                            "INSERT INTO import_checkpoints (source, records_committed) VALUES (%s, %s)",
+                            (source, records_committed),
+                        )
+                self.connection_pool.commit(connection)
+                if self.suggestions is not None:
+                    self.connection_pool.on_commit(
+                        lambda: [self.suggestions.put(row[0], (row[1], row[2])) for row in added]
+                    )
+                return len(books)
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+                raise
+
+    @staticmethod
+    def _add_first_copies(cursor, book_ids):
+        """
+        Gives each newly added book one physical copy and an availability record counting it.
+        """
+        cursor.executemany(
+            "INSERT INTO book_availability (book_id, total_copies, copies_out) VALUES (%s, 1, 0)",
+            [(book_id,) for book_id in book_ids],
+        )
+        cursor.executemany(
+            "INSERT INTO copies (book_id, barcode) VALUES (%s, %s)",
+            [(book_id, default_barcode(book_id, 1)) for book_id in book_ids],
+        )
+
+    def get_import_checkpoint(self, source):
+        """
+        Retrieves how far a bulk import of the given source has been committed.
 
-    def get_books_by_id(self, id_field_name, id_value, fetchone=True):
+        Parameters:
+            source (str): The identifier of the imported file.
+
+        Returns:
+            int: The number of source records covered by committed batches, 0 if none.
+        """
+        query = "SELECT records_committed FROM import_checkpoints WHERE source = %s"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, (source,))
+                row = cursor.fetchone()
+                return row[0] if row else 0
+            except Error as e:
+                print(f"Error: '{e}'")
+                return 0
+
+    def clear_import_checkpoint(self, source):
+        """
+        Forgets the checkpoint of a finished bulk import, so the source can be imported afresh.
+
+        Parameters:
+            source (str): The identifier of the imported file.
+        """
+        query = "DELETE FROM import_checkpoints WHERE source = %s"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, (source,))
+                self.connection_pool.commit(connection)
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+
+    def load_suggestions(self):
+        """
+        Builds the prefix index from every book in the database, e.g. when the application starts.
+        """
+        if self.suggestions is not None:
+            self.suggestions.load((row[0], (row[1], row[2],)) for row in self.iter_books())
+
+    def suggest(self, field, prefix, limit=10):
+        """
+        Autocompletes a field: finds books whose value of it starts with what has been typed.
+
+        Served from the prefix index when one is configured, otherwise by a LIKE query.
+
+        Parameters:
+            field (str): One of suggestion_fields.
+            prefix (str): What has been typed so far.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list: Up to limit (value, book_id) pairs, in alphabetical order of value.
+        """
+        if field not in self.suggestion_fields:
+            raise ValueError(f"Cannot autocomplete '{field}'. Choose one of: {', '.join(self.suggestion_fields)}.")
+        if self.suggestions is not None:
+            return self.suggestions.suggest(field, prefix, limit)
+
+        pattern = prefix.replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%'
+        query = f"SELECT {field}, book_id FROM books WHERE {field} LIKE %s ESCAPE '!' ORDER BY {field}, book_id LIMIT %s"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, (pattern, limit))
+                return [tuple(row) for row in cursor.fetchall()]
+            except Error as e:
+                print(f"Error: '{e}'")
+                return []
+
+    def get_books_by_id(self, id_field_name, id_value, fetchone=True, as_entities=False):
         """
         Retrieves book record(s) from the database by its ID.
 
@@ -49,24 +228,172 @@ class BookRepository:
             id_field_name (str): The column/field name of the id.
             id_value (str or int): The unique identifier of the column/field.
             fetchone (bool): Check if the user needs only one book.
+            as_entities (bool): Return Book objects instead of tuples.
 
         Returns:
             Book record(s) from the database.
         """
+        # Single-record lookups by primary key are served from the cache when one is configured
+        use_cache = self.cache is not None and fetchone and id_field_name == 'book_id'
+        if use_cache:
+            cached = self.cache.get(id_value)
+            if cached is not None:
+                return hydrate_result(Book, cached, fetchone) if as_entities else cached
+            # Taken before the read, so a write committed while it runs keeps the read out of the cache
+            token = self.cache.reserve(id_value)
+
         query = f"SELECT * FROM books WHERE {id_field_name} = %s"
         args = (id_value,)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            headers = [i[0] for i in cursor.description]
-            if fetchone:
-                book = cursor.fetchone()
-            else:
-                book = cursor.fetchall()
-            return {'content': book, 'headers': headers}
-        except Error as e:
-            print(f"Error: '{e}'")
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                headers = [i[0] for i in cursor.description]
+                if fetchone:
+                    book = cursor.fetchone()
+                else:
+                    book = cursor.fetchall()
+                result = {'content': book, 'headers': headers}
+                if use_cache and book is not None:
+                    # Cached only once committed, so a rolled-back unit of work leaves no trace
+                    self.connection_pool.on_commit(lambda: self.cache.fill(id_value, result, token))
+                return hydrate_result(Book, result, fetchone) if as_entities else result
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def search_books(self, text, limit=10):
+        """
+        Searches the title, author and genre of every book for the words of a free-text query.
+
+        The search uses the database's full-text index, so it never scans the books table. Words
+        also match longer words they are the start of, e.g. 'tolk' matches 'Tolkien'.
+
+        Parameters:
+            text (str): The words to search for.
+            limit (int): The maximum number of books to return.
+
+        Returns:
+            The best matching book records, most relevant first, with their headers; each record ends
+            with its relevance score.
+        """
+        terms = re.findall(r'\w+', text.lower())
+        if not terms:
+            # The headers a search returns, so callers can lay out an empty result the same way
+            return {'content': [], 'headers': list(Book.__slots__) + ['relevance']}
+        query, args = self.connection_pool.driver.fulltext_search_query(terms, limit)
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                headers = [i[0] for i in cursor.description]
+                return {'content': cursor.fetchall(), 'headers': headers}
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def get_existing_book_ids(self, book_ids):
+        """
+        Finds which of the given book IDs exist, with a single query.
+
+        Parameters:
+            book_ids (list of int): The book IDs to check.
+
+        Returns:
+            set: The book IDs that exist in the database.
+        """
+        if not book_ids:
+            return set()
+        placeholders = ', '.join(['%s'] * len(book_ids))
+        query = f"SELECT book_id FROM books WHERE book_id IN ({placeholders})"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, tuple(book_ids))
+                return {row[0] for row in cursor.fetchall()}
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+
+    def get_availability(self, book_ids, lock=False):
+        """
+        Reads the availability records of the given books, one primary-key lookup each.
+
+        Parameters:
+            book_ids (list of int): The book IDs to look up.
+            lock (bool): Lock the records with SELECT ... FOR UPDATE until the surrounding unit of
+                work ends, so concurrent borrowers of the same books wait for each other.
+
+        Returns:
+            dict: (total_copies, copies_out) for each book that exists, keyed by book_id.
+        """
+        if not book_ids:
+            return {}
+        placeholders = ', '.join(['%s'] * len(book_ids))
+        # Rows are locked in book_id order, so two overlapping checkouts cannot deadlock
+        query = (f"SELECT book_id, total_copies, copies_out FROM book_availability "
+                 f"WHERE book_id IN ({placeholders}) ORDER BY book_id")
+        if lock:
+            query += " FOR UPDATE"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, tuple(book_ids))
+                return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+
+    def reserve_copies(self, book_ids):
+        """
+        Marks one more copy of each given book as lent out.
+
+        Parameters:
+            book_ids (list of int): The books being lent, once per copy.
+
+        Raises:
+            Error: If the counters could not be updated.
+            Exception: If a book had no copy left; nothing is committed.
+        """
+        self._adjust_copies_out(book_ids, "copies_out = copies_out + 1", "copies_out < total_copies")
+
+    def release_copies(self, book_ids):
+        """
+        Marks one copy of each given book as back on the shelf.
+
+        Parameters:
+            book_ids (list of int): The books being returned, once per copy.
+
+        Raises:
+            Error: If the counters could not be updated.
+            Exception: If a book had no copy lent out; nothing is committed.
+        """
+        self._adjust_copies_out(book_ids, "copies_out = copies_out - 1", "copies_out > 0")
+
+    def _adjust_copies_out(self, book_ids, assignment, condition):
+        """
+        Applies a guarded change to the copies_out counter of each book, once per occurrence.
+        """
+        if not book_ids:
+            return
+        query = f"UPDATE book_availability SET {assignment} WHERE book_id = %s AND {condition}"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                for book_id in book_ids:
+                    cursor.execute(query, (book_id,))
+                    if cursor.rowcount != 1:
+                        self.connection_pool.rollback(connection)
+                        raise Exception(f"The availability of book {book_id} changed in the meantime. "
+                                        f"Nothing was changed.")
+                self.connection_pool.commit(connection)
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+                raise
 
     def get_books(self, fetchone=True):
         """
@@ -80,17 +407,92 @@ class BookRepository:
         """
         query = f"SELECT * FROM books"
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query)
-            headers = [i[0] for i in cursor.description]
-            if fetchone:
-                books = cursor.fetchone()
-            else:
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query)
+                headers = [i[0] for i in cursor.description]
+                if fetchone:
+                    books = cursor.fetchone()
+                else:
+                    books = cursor.fetchall()
+                return {'content': books, 'headers': headers}
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def get_books_page(self, page_size=50, after=None, as_entities=False, columnar=False):
+        """
+        Retrieves one page of book records, ordered by book_id.
+
+        Pages are found by seeking past the last book_id of the previous page rather than with OFFSET,
+        so every page costs the same however deep into the table it is.
+
+        Parameters:
+            page_size (int): The maximum number of books to return.
+            after (int, optional): The next_cursor of the previous page; None for the first page.
+            as_entities (bool): Return Book objects instead of tuples.
+            columnar (bool): Return the page as one Arrow record batch instead of a list of rows.
+
+        Returns:
+            Book records with their headers, plus the next_cursor to pass as 'after' for the
+            following page (None on the last page).
+        """
+        query = "SELECT * FROM books WHERE book_id > %s ORDER BY book_id LIMIT %s"
+        # One extra row tells whether another page follows
+        args = (after if after is not None else 0, page_size + 1)
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                headers = [i[0] for i in cursor.description]
                 books = cursor.fetchall()
-            return {'content': books, 'headers': headers}
-        except Error as e:
-            print(f"Error: '{e}'")
+                next_cursor = books[page_size - 1][0] if len(books) > page_size else None
+                books = books[:page_size]
+                if columnar:
+                    books = to_record_batch(headers, books)
+                elif as_entities:
+                    books = hydrate(Book, headers, books)
+                return {'content': books, 'headers': headers, 'next_cursor': next_cursor}
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def iter_books(self, chunk_size=1000, as_entities=False):
+        """
+        Streams every book record, ordered by book_id, without loading the table into memory.
+
+        Rows are read from an unbuffered server-side cursor in chunks of chunk_size rows. The cursor
+        and its connection are released as soon as the generator is exhausted or closed, including
+        when the consumer stops early.
+
+        Parameters:
+            chunk_size (int): The number of rows fetched from the database at a time.
+            as_entities (bool): Yield Book objects instead of tuples.
+
+        Yields:
+            tuple or Book: One book record at a time.
+
+        Raises:
+            Error: If the rows could not all be read.
+        """
+        query = "SELECT * FROM books ORDER BY book_id"
+
+        # A dedicated connection, so queries made while consuming the stream cannot reuse it
+        with self.connection_pool.lease(shared=False) as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(query)
+                headers = [i[0] for i in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from hydrate(Book, headers, rows) if as_entities else rows
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+            finally:
+                cursor.close()
 
     def update_book(self, book_id, title, author, isbn, publication_year, genre):
         """
@@ -111,14 +513,26 @@ class BookRepository:
                 """
         args = (title, author, isbn, publication_year, genre, book_id)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            self.connection.commit()
-            print("Book updated successfully")
-        except Error as e:
-            print(f"Error: '{e}'")
-            self.connection.rollback()
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                updated = cursor.rowcount > 0
+                self.connection_pool.commit(connection)
+                if self.cache is not None:
+                    # Write-through: cache the record as stored, so the next lookup is a hit
+                    cursor.execute("SELECT * FROM books WHERE book_id = %s", (book_id,))
+                    book = cursor.fetchone()
+                    if book is not None:
+                        cached = {'content': book, 'headers': [i[0] for i in cursor.description]}
+                        self.connection_pool.on_commit(lambda: self.cache.put(book_id, cached))
+                # An update that matched no book must not add one to the suggestions
+                if self.suggestions is not None and updated:
+                    self.connection_pool.on_commit(lambda: self.suggestions.put(book_id, (title, author)))
+                print("Book updated successfully")
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
 
     def delete_book(self, book_id):
         """
@@ -130,13 +544,20 @@ class BookRepository:
         query = "DELETE FROM books WHERE book_id = %s"
         args = (book_id,)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            self.connection.commit()
-            print("Book deleted successfully")
-        except Error as e:
-            print(f"Error: '{e}'")
-            self.connection.rollback()
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute("DELETE FROM copies WHERE book_id = %s", args)
+                cursor.execute("DELETE FROM book_availability WHERE book_id = %s", args)
+                cursor.execute(query, args)
+                self.connection_pool.commit(connection)
+                if self.cache is not None:
+                    self.connection_pool.on_commit(lambda: self.cache.evict(book_id))
+                if self.suggestions is not None:
+                    self.connection_pool.on_commit(lambda: self.suggestions.remove(book_id))
+                print("Book deleted successfully")
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
 
     # Additional methods can be added here as needed.
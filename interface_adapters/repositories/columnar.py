@@ -0,0 +1,22 @@
+from operator import itemgetter
+
+import pyarrow as pa
+
+
+def to_record_batch(headers, rows):
+    """
+    Builds an Arrow record batch from rows as read from a cursor.
+
+    Each column is gathered from the rows into one list, which is converted to an Arrow array in a
+    single call, so no dict or object is built per row.
+
+    Parameters:
+        headers (list of str): The column names of the rows.
+        rows (list of tuples): The rows as read from the cursor.
+
+    Returns:
+        pyarrow.RecordBatch: The rows, one Arrow column per header.
+    """
+    # Gathering one column at a time is several times faster than transposing with zip(*rows)
+    arrays = [pa.array(list(map(itemgetter(i), rows))) for i in range(len(headers))]
+    return pa.RecordBatch.from_arrays(arrays, names=list(headers))
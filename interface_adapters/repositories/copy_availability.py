@@ -0,0 +1,122 @@
+import threading
+
+
+class CopyAvailability:
+    """
+    A thread-safe, in-process bitmap of the free copies of every book.
+
+    Each book keeps its copy IDs in a list and an integer whose bit i is set while the copy at
+    position i is on the shelf, so counting and finding free copies are bit operations on one integer.
+    The bitmap is a hint for choosing a copy: the database stays the authority on which copies are
+    lent out, and a stale entry is corrected with refresh_book().
+    """
+
+    def __init__(self):
+        self._books = {}  # book_id -> [copy IDs in bit order, {copy_id: bit}, free bits]
+        self._lock = threading.Lock()
+
+    def load(self, copy_states):
+        """
+        Replaces the bitmap with the given copy states, e.g. when the application starts.
+
+        Parameters:
+            copy_states (iterable): (copy_id, book_id, on_loan) for every copy.
+        """
+        books = {}
+        for copy_id, book_id, on_loan in copy_states:
+            self._add(books, book_id, copy_id, not on_loan)
+        with self._lock:
+            self._books = books
+
+    def refresh_book(self, book_id, copy_states):
+        """
+        Replaces the bitmap of one book with its copy states as read from the database.
+
+        Parameters:
+            book_id (int): The book to refresh.
+            copy_states (iterable): (copy_id, book_id, on_loan) for every copy of the book.
+        """
+        books = {}
+        for copy_id, _, on_loan in copy_states:
+            self._add(books, book_id, copy_id, not on_loan)
+        with self._lock:
+            if book_id in books:
+                self._books[book_id] = books[book_id]
+            else:
+                self._books.pop(book_id, None)
+
+    def mark_out(self, book_id, copy_id):
+        """
+        Records that a copy has been lent out.
+        """
+        self._set(book_id, copy_id, False)
+
+    def mark_in(self, book_id, copy_id):
+        """
+        Records that a copy is back on the shelf.
+        """
+        self._set(book_id, copy_id, True)
+
+    def free_count(self, book_id):
+        """
+        Counts the free copies of a book.
+
+        Returns:
+            int: The number of copies on the shelf.
+        """
+        with self._lock:
+            entry = self._books.get(book_id)
+            return bin(entry[2]).count('1') if entry else 0
+
+    def find_free(self, book_id):
+        """
+        Finds a free copy of a book, the first one in bit order.
+
+        Returns:
+            int or None: The copy_id of a copy on the shelf, or None if every copy is lent out.
+        """
+        with self._lock:
+            entry = self._books.get(book_id)
+            if not entry or not entry[2]:
+                return None
+            lowest_bit = (entry[2] & -entry[2]).bit_length() - 1
+            return entry[0][lowest_bit]
+
+    def stats(self):
+        """
+        Reports the size of the bitmap.
+
+        Returns:
+            dict: The number of books and copies tracked, and how many copies are free.
+        """
+        with self._lock:
+            return {
+                'books': len(self._books),
+                'copies': sum(len(entry[0]) for entry in self._books.values()),
+                'free_copies': sum(bin(entry[2]).count('1') for entry in self._books.values()),
+            }
+
+    @staticmethod
+    def _add(books, book_id, copy_id, free):
+        """
+        Adds a copy to a bitmap that is being built and not yet shared.
+        """
+        entry = books.setdefault(book_id, [[], {}, 0])
+        if copy_id in entry[1]:
+            bit = entry[1][copy_id]
+        else:
+            bit = len(entry[0])
+            entry[0].append(copy_id)
+            entry[1][copy_id] = bit
+        entry[2] = entry[2] | (1 << bit) if free else entry[2] & ~(1 << bit)
+
+    def _set(self, book_id, copy_id, free):
+        """
+        Sets or clears the bit of a known copy; unknown copies are ignored.
+        """
+        with self._lock:
+            entry = self._books.get(book_id)
+            if entry is None or copy_id not in entry[1]:
+                return
+            bit = entry[1][copy_id]
+            entry[2] = entry[2] | (1 << bit) if free else entry[2] & ~(1 << bit)
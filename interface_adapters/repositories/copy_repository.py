@@ -0,0 +1,238 @@
+from frameworks_and_drivers.database.drivers import Error
+from frameworks_and_drivers.database.migrations import default_barcode
+
+
+class CopyRepository:
+    """
+    Repository class for handling the database operations related to the physical copies of books.
+    """
+
+    def __init__(self, connection_pool, availability=None):
+        """
+        Initializes the CopyRepository with a database connection pool.
+
+        Parameters:
+            connection_pool (ConnectionPool): The pool that database connections are leased from.
+            availability (CopyAvailability, optional): In-process bitmap of free copies, used to pick a
+                copy to lend without querying for one.
+        """
+        self.connection_pool = connection_pool
+        self.availability = availability
+
+    def transaction(self):
+        """
+        Opens a unit of work shared by every repository using the same connection pool.
+
+        Returns:
+            A context manager yielding the leased connection.
+        """
+        return self.connection_pool.transaction()
+
+    def load_availability(self):
+        """
+        Rebuilds the bitmap of free copies from the database, e.g. when the application starts.
+        """
+        if self.availability is not None:
+            self.availability.load(self.iter_copy_states())
+
+    def add_copies(self, book_id, barcodes=None, count=1):
+        """
+        Adds physical copies of a book and counts them in its availability record.
+
+        Parameters:
+            book_id (int): The book the copies belong to.
+            barcodes (list of str, optional): The barcodes of the new copies; if omitted, count copies
+                are created with generated barcodes.
+            count (int): The number of copies to create when no barcodes are given.
+
+        Returns:
+            list: The copy_id of each new copy.
+
+        Raises:
+            Error: If the copies could not be added; nothing is committed.
+        """
+        query = "INSERT INTO copies (book_id, barcode) VALUES (%s, %s)"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                if barcodes is None:
+                    cursor.execute("SELECT COUNT(*) FROM copies WHERE book_id = %s", (book_id,))
+                    existing = cursor.fetchone()[0]
+                    barcodes = [default_barcode(book_id, existing + number) for number in range(1, count + 1)]
+                copy_ids = []
+                for barcode in barcodes:
+                    cursor.execute(query, (book_id, barcode))
+                    copy_ids.append(cursor.lastrowid)
+                cursor.execute(
+                    "UPDATE book_availability SET total_copies = total_copies + %s WHERE book_id = %s",
+                    (len(copy_ids), book_id),
+                )
+                if cursor.rowcount != 1:
+                    self.connection_pool.rollback(connection)
+                    raise Exception("Book not found.")
+                if self.availability is not None:
+                    # Re-read every copy, so the bitmap also learns of copies added by other processes
+                    copy_states = self.get_copy_states(book_id)
+                    self.connection_pool.on_commit(lambda: self.availability.refresh_book(book_id, copy_states))
+                self.connection_pool.commit(connection)
+                print("Copies added successfully")
+                return copy_ids
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+                raise
+
+    def get_copies(self, book_id):
+        """
+        Retrieves the copies of a book, with the loan each one is currently out on.
+
+        Parameters:
+            book_id (int): The book whose copies are listed.
+
+        Returns:
+            Copy records with their headers from the database.
+        """
+        query = """
+                SELECT copies.copy_id, copies.barcode, loans.loan_id
+                FROM copies
+                LEFT JOIN loans ON loans.copy_id = copies.copy_id AND loans.return_date IS NULL
+                WHERE copies.book_id = %s
+                ORDER BY copies.copy_id
+                """
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, (book_id,))
+                headers = [i[0] for i in cursor.description]
+                return {'content': cursor.fetchall(), 'headers': headers}
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def find_free_copy(self, book_id):
+        """
+        Picks a copy of a book that is on the shelf.
+
+        The bitmap proposes a copy and one indexed lookup confirms it is not on loan; only if the
+        bitmap is stale, e.g. because another process lent the copy, are the book's copies read and
+        its bitmap refreshed. Callers lock the book's availability record first, so the answer holds
+        until their unit of work ends.
+
+        Parameters:
+            book_id (int): The book to lend.
+
+        Returns:
+            int or None: The copy_id of a free copy, or None if every copy is lent out.
+        """
+        if self.availability is not None:
+            copy_id = self.availability.find_free(book_id)
+            if copy_id is not None and self.is_copy_free(copy_id):
+                return copy_id
+
+        copy_states = self.get_copy_states(book_id)
+        if self.availability is not None:
+            self.availability.refresh_book(book_id, copy_states)
+        return next((copy_id for copy_id, _, on_loan in copy_states if not on_loan), None)
+
+    def is_copy_free(self, copy_id):
+        """
+        Checks that a copy has no open loan.
+
+        Parameters:
+            copy_id (int): The copy to check.
+
+        Returns:
+            bool: True if the copy is on the shelf.
+        """
+        query = "SELECT COUNT(*) FROM loans WHERE copy_id = %s AND return_date IS NULL"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, (copy_id,))
+                return cursor.fetchone()[0] == 0
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+
+    def get_copy_states(self, book_id):
+        """
+        Reads whether each copy of a book is on loan.
+
+        Parameters:
+            book_id (int): The book whose copies are read.
+
+        Returns:
+            list: (copy_id, book_id, on_loan) for every copy of the book, in copy_id order.
+        """
+        query = """
+                SELECT copies.copy_id, copies.book_id, COUNT(loans.loan_id)
+                FROM copies
+                LEFT JOIN loans ON loans.copy_id = copies.copy_id AND loans.return_date IS NULL
+                WHERE copies.book_id = %s
+                GROUP BY copies.copy_id, copies.book_id
+                ORDER BY copies.copy_id
+                """
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, (book_id,))
+                return [(copy_id, book_id, on_loan > 0) for copy_id, book_id, on_loan in cursor.fetchall()]
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+
+    def iter_copy_states(self, chunk_size=10000):
+        """
+        Streams whether each copy of every book is on loan, without loading the table into memory.
+
+        Parameters:
+            chunk_size (int): The number of rows fetched from the database at a time.
+
+        Yields:
+            tuple: (copy_id, book_id, on_loan) for one copy at a time.
+
+        Raises:
+            Error: If the rows could not all be read.
+        """
+        query = """
+                SELECT copies.copy_id, copies.book_id, loans.loan_id
+                FROM copies
+                LEFT JOIN loans ON loans.copy_id = copies.copy_id AND loans.return_date IS NULL
+                ORDER BY copies.book_id, copies.copy_id
+                """
+
+        # A dedicated connection, so queries made while consuming the stream cannot reuse it
+        with self.connection_pool.lease(shared=False) as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(query)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for copy_id, book_id, loan_id in rows:
+                        yield copy_id, book_id, loan_id is not None
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+            finally:
+                cursor.close()
+
+    def track_checkout(self, book_id, copy_id):
+        """
+        Marks a copy as lent out in the bitmap once the current unit of work commits.
+        """
+        if self.availability is not None:
+            self.connection_pool.on_commit(lambda: self.availability.mark_out(book_id, copy_id))
+
+    def track_return(self, book_id, copy_id):
+        """
+        Marks a copy as back on the shelf in the bitmap once the current unit of work commits.
+        """
+        if self.availability is not None and copy_id is not None:
+            self.connection_pool.on_commit(lambda: self.availability.mark_in(book_id, copy_id))
+
+    # Additional methods can be added here as needed.
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class EntityCache:
+    """
+    A thread-safe, in-process cache of records keyed by primary key, with LRU eviction and a TTL.
+
+    Attributes:
+        max_entries (int): The number of records kept before the least recently used is evicted.
+        ttl_seconds (float): How long a record is served from the cache before it is read again.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=60.0):
+        """
+        Initializes the EntityCache.
+
+        Parameters:
+            max_entries (int): The number of records kept before the least recently used is evicted.
+            ttl_seconds (float): How long a record is served from the cache before it is read again.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        # Reads under way that will fill the cache, as key -> token; see reserve()
+        self._fills = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        """
+        Looks a record up in the cache.
+
+        Parameters:
+            key: The primary key of the record.
+
+        Returns:
+            The cached value, or None on a miss or when the entry has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Stores a record, evicting the least recently used one if the cache is full.
+
+        Parameters:
+            key: The primary key of the record.
+            value: The value to cache.
+        """
+        with self._lock:
+            self._fills.pop(key, None)
+            self._store(key, value)
+
+    def reserve(self, key):
+        """
+        Marks the start of a database read whose result will fill the cache through fill().
+
+        Call it before the read is issued: a put() or evict() of the key in the meantime cancels the
+        reservation, so a row read before a concurrent write cannot overwrite what that write cached.
+
+        Parameters:
+            key: The primary key of the record.
+
+        Returns:
+            object: The token to pass to fill().
+        """
+        token = object()
+        with self._lock:
+            self._fills[key] = token
+            self._fills.move_to_end(key)
+            # Reads that never fill the cache, e.g. of missing records, must not pile up
+            while len(self._fills) > self.max_entries:
+                self._fills.popitem(last=False)
+        return token
+
+    def fill(self, key, value, token):
+        """
+        Stores a record read after reserve(), unless the key was written or evicted since.
+
+        Parameters:
+            key: The primary key of the record.
+            value: The value to cache.
+            token: The token reserve() returned.
+
+        Returns:
+            bool: True if the record was stored.
+        """
+        with self._lock:
+            if self._fills.get(key) is not token:
+                return False
+            del self._fills[key]
+            self._store(key, value)
+            return True
+
+    def _store(self, key, value):
+        # Callers hold self._lock
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def evict(self, key):
+        """
+        Removes a record from the cache, if present.
+
+        Parameters:
+            key: The primary key of the record.
+        """
+        with self._lock:
+            self._fills.pop(key, None)
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every record from the cache.
+        """
+        with self._lock:
+            self._fills.clear()
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Reports cache usage.
+
+        Returns:
+            dict: Entry count, capacity, hits, misses, hit ratio and LRU evictions.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+            }
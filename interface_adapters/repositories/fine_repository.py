@@ -0,0 +1,190 @@
+from frameworks_and_drivers.database.drivers import Error
+
+
+class FineRepository:
+    """
+    Repository class for handling the database operations related to late fees.
+
+    Fines are kept in an append-only ledger ('fines'), with the running total of each fined loan in
+    'fine_totals' and one row per fines run in 'fine_runs'.
+    """
+
+    def __init__(self, connection_pool):
+        """
+        Initializes the FineRepository with a database connection pool.
+
+        Parameters:
+            connection_pool (ConnectionPool): The pool that database connections are leased from.
+        """
+        self.connection_pool = connection_pool
+
+    def transaction(self):
+        """
+        Opens a unit of work shared by every repository using the same connection pool.
+
+        Returns:
+            A context manager yielding the leased connection.
+        """
+        return self.connection_pool.transaction()
+
+    def get_watermark(self):
+        """
+        Reads the date the latest fines run assessed loans up to.
+
+        Returns:
+            str or None: The as_of date of the latest run as 'YYYY-MM-DD', or None before the first run.
+        """
+        query = "SELECT MAX(as_of) FROM fine_runs"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query)
+                watermark = cursor.fetchone()[0]
+                return str(watermark)[:10] if watermark is not None else None
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+
+    def iter_candidate_loans(self, watermark, as_of, chunk_size=10000):
+        """
+        Streams the loans whose fine may have changed since the previous run, a chunk at a time.
+
+        These are the open loans past their due date, the loans fined while still open, and the loans
+        returned late since the watermark; every other loan's fine is already final. Each set is read
+        through an index, so the full loan history is only read on the first run. Rows are read from an
+        unbuffered cursor on a dedicated connection, so only one chunk is held in memory at a time.
+
+        Parameters:
+            watermark (str or None): The as_of date of the previous run; None on the first run.
+            as_of (str): The date fines are assessed up to, as 'YYYY-MM-DD'.
+            chunk_size (int): The number of loans fetched from the database at a time.
+
+        Yields:
+            list: (loan_id, user_id, due_date, return_date, amount_cents already charged) for each loan
+            of the chunk, in loan_id order.
+        """
+        query = """
+                SELECT loans.loan_id, loans.user_id, loans.due_date, loans.return_date,
+                       COALESCE(fine_totals.amount_cents, 0)
+                FROM (
+                    SELECT loan_id FROM loans WHERE return_date IS NULL AND due_date < %s
+                    UNION
+                    SELECT loan_id FROM fine_totals WHERE settled = 0
+                    UNION
+                    SELECT loan_id FROM loans WHERE return_date >= %s AND return_date > due_date
+                ) AS candidates
+                JOIN loans ON loans.loan_id = candidates.loan_id
+                LEFT JOIN fine_totals ON fine_totals.loan_id = loans.loan_id
+                ORDER BY loans.loan_id
+                """
+        args = (as_of, watermark or '0001-01-01')
+
+        # A dedicated connection, so the assessments written while consuming the stream cannot reuse it
+        with self.connection_pool.lease(shared=False) as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(query, args)
+                while True:
+                    loans = cursor.fetchmany(chunk_size)
+                    if not loans:
+                        break
+                    yield loans
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+            finally:
+                cursor.close()
+
+    def write_assessments(self, entries, totals):
+        """
+        Appends ledger entries and replaces the running totals of the assessed loans, with batched
+        statements and one commit.
+
+        Parameters:
+            entries (list of tuples): (loan_id, user_id, days_late, amount_cents, assessed_on) for each
+                change in a loan's fine.
+            totals (list of tuples): (loan_id, user_id, days_late, amount_cents, settled) for each
+                assessed loan.
+
+        Raises:
+            Error: If the batch could not be written; nothing from the batch is committed.
+        """
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                if entries:
+                    cursor.executemany(
+                        "INSERT INTO fines (loan_id, user_id, days_late, amount_cents, assessed_on) "
+                        "VALUES (%s, %s, %s, %s, %s)",
+                        entries,
+                    )
+                if totals:
+                    cursor.executemany("DELETE FROM fine_totals WHERE loan_id = %s", [(total[0],) for total in totals])
+                    cursor.executemany(
+                        "INSERT INTO fine_totals (loan_id, user_id, days_late, amount_cents, settled) "
+                        "VALUES (%s, %s, %s, %s, %s)",
+                        totals,
+                    )
+                self.connection_pool.commit(connection)
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+                raise
+
+    def record_run(self, as_of, loans_assessed, entries_written, ran_at):
+        """
+        Records a completed fines run, which moves the watermark to its as_of date.
+
+        Parameters:
+            as_of (str): The date fines were assessed up to, as 'YYYY-MM-DD'.
+            loans_assessed (int): The number of candidate loans assessed.
+            entries_written (int): The number of ledger entries written.
+            ran_at (str): When the run finished, as 'YYYY-MM-DD HH:MM:SS'.
+        """
+        query = """
+                INSERT INTO fine_runs (as_of, loans_assessed, entries_written, ran_at)
+                VALUES (%s, %s, %s, %s)
+                """
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, (as_of, loans_assessed, entries_written, ran_at))
+                self.connection_pool.commit(connection)
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+                raise
+
+    def get_totals_by_user(self, limit=50):
+        """
+        Retrieves the users with the highest fines.
+
+        Parameters:
+            limit (int): The maximum number of users to return.
+
+        Returns:
+            Per-user totals with their headers, highest first.
+        """
+        query = """
+                SELECT fine_totals.user_id, users.name, COUNT(*) AS loans_fined,
+                       SUM(fine_totals.amount_cents) AS amount_cents
+                FROM fine_totals
+                LEFT JOIN users ON users.user_id = fine_totals.user_id
+                WHERE fine_totals.amount_cents > 0
+                GROUP BY fine_totals.user_id, users.name
+                ORDER BY amount_cents DESC, fine_totals.user_id
+                LIMIT %s
+                """
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, (limit,))
+                headers = [i[0] for i in cursor.description]
+                return {'content': cursor.fetchall(), 'headers': headers}
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    # Additional methods can be added here as needed.
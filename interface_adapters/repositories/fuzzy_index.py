@@ -0,0 +1,183 @@
+import threading
+from array import array
+from collections import Counter
+from difflib import SequenceMatcher
+
+
+class FuzzyIndex:
+    """
+    A thread-safe, in-process index for finding records whose text fields approximately match a query.
+
+    Every value is broken into trigrams (overlapping three-letter pieces, padded at word boundaries),
+    and each trigram maps to the IDs of the records containing it. A query only looks at the records
+    sharing the most trigrams with it, so a typo such as "Jon Smth" still finds "John Smith" without
+    comparing the query to every record; those candidates are then ranked by edit similarity.
+
+    Attributes:
+        fields (tuple): The names of the indexed fields, e.g. ('name', 'email').
+    """
+
+    def __init__(self, fields, candidates_per_result=20, max_postings=200000):
+        """
+        Initializes an empty FuzzyIndex.
+
+        Parameters:
+            fields (iterable of str): The names of the indexed fields.
+            candidates_per_result (int): How many candidates are ranked for each result asked for.
+            max_postings (int): The number of record IDs a query reads before it stops looking at
+                more common trigrams.
+        """
+        self.fields = tuple(fields)
+        self.candidates_per_result = candidates_per_result
+        self.max_postings = max_postings
+        self._postings = {}  # trigram -> IDs of the records containing it
+        self._values = {}  # record id -> the record's values, in field order
+        self._stale = 0  # postings left behind by updated or removed records
+        self._lock = threading.Lock()
+
+    def load(self, records):
+        """
+        Replaces the index with the given records, e.g. when the application starts.
+
+        Parameters:
+            records (iterable): (record id, values in field order) for every record.
+        """
+        postings = {}
+        values = {}
+        for record_id, record_values in records:
+            values[record_id] = tuple(record_values)
+            self._post(postings, record_id, values[record_id])
+        with self._lock:
+            self._postings = postings
+            self._values = values
+            self._stale = 0
+
+    def put(self, record_id, record_values):
+        """
+        Adds a record, or replaces the values of one already indexed.
+
+        Parameters:
+            record_id: The primary key of the record.
+            record_values (iterable): The record's values, in field order.
+        """
+        with self._lock:
+            if self._values.pop(record_id, None) is not None:
+                self._stale += 1
+            self._values[record_id] = tuple(record_values)
+            self._post(self._postings, record_id, self._values[record_id])
+            self._compact_if_stale()
+
+    def remove(self, record_id):
+        """
+        Removes a record from the index, if present.
+
+        Parameters:
+            record_id: The primary key of the record.
+        """
+        with self._lock:
+            if self._values.pop(record_id, None) is not None:
+                self._stale += 1
+                self._compact_if_stale()
+
+    def search(self, text, limit=5):
+        """
+        Finds the records whose values are most similar to a query.
+
+        Parameters:
+            text (str): The query, e.g. a misspelt name or email address.
+            limit (int): The maximum number of records to return.
+
+        Returns:
+            list: Up to limit (score, record id) pairs, best first; a score of 1.0 is an exact match.
+        """
+        query = self._normalize(text)
+        grams = self._grams(query)
+        if not grams:
+            return []
+
+        with self._lock:
+            # Rare trigrams say the most about a match and are the cheapest to read, so start there
+            postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+            counts = Counter()
+            read = 0
+            for posting in postings:
+                if read and read + len(posting) > self.max_postings:
+                    break
+                counts.update(posting)
+                read += len(posting)
+            candidates = [
+                (record_id, self._values[record_id])
+                for record_id, _ in counts.most_common(limit * self.candidates_per_result)
+                if record_id in self._values
+            ]
+
+        results = [(self._score(query, record_values), record_id) for record_id, record_values in candidates]
+        results.sort(key=lambda result: (-result[0], result[1]))
+        return [(round(score, 3), record_id) for score, record_id in results[:limit]]
+
+    def stats(self):
+        """
+        Reports the size of the index.
+
+        Returns:
+            dict: The number of records, distinct trigrams and postings.
+        """
+        with self._lock:
+            return {
+                'records': len(self._values),
+                'trigrams': len(self._postings),
+                'postings': sum(len(posting) for posting in self._postings.values()),
+                'stale_postings': self._stale,
+            }
+
+    @staticmethod
+    def _normalize(text):
+        """
+        Case-folds a value and collapses its whitespace.
+        """
+        return ' '.join(str(text or '').casefold().split())
+
+    @staticmethod
+    def _grams(value):
+        """
+        Breaks a normalized value into its set of trigrams, padded so word starts and ends count too.
+        """
+        padded = f"  {value} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)} if value else set()
+
+    def _post(self, postings, record_id, record_values):
+        """
+        Adds a record's ID to the posting list of every trigram in its values.
+        """
+        grams = set()
+        for value in record_values:
+            grams |= self._grams(self._normalize(value))
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array('I')  # 32-bit IDs, like the INT primary keys
+            posting.append(record_id)
+
+    def _score(self, query, record_values):
+        """
+        Scores how similar a query is to the best matching value of a record, from 0.0 to 1.0.
+        """
+        best = 0.0
+        for value in record_values:
+            value = self._normalize(value)
+            # An email address is also compared without its domain, which is rarely what is typed
+            for candidate in {value, value.split('@')[0]}:
+                if candidate:
+                    best = max(best, SequenceMatcher(None, query, candidate).ratio())
+        return best
+
+    def _compact_if_stale(self):
+        """
+        Rebuilds the postings once most of them belong to updated or removed records. Caller holds the lock.
+        """
+        if self._stale > max(1000, len(self._values)):
+            postings = {}
+            for record_id, record_values in self._values.items():
+                self._post(postings, record_id, record_values)
+            self._postings = postings
+            self._stale = 0
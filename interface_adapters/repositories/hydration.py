@@ -0,0 +1,44 @@
+from itertools import starmap
+from operator import itemgetter
+
+
+def hydrate(entity, headers, rows):
+    """
+    Builds an entity object from each row of a query result.
+
+    The entity's __slots__ name its attributes in column order, so rows whose headers match are passed
+    to the constructor positionally without building an intermediate dict; rows with their columns in
+    another order are first rearranged by name.
+
+    Parameters:
+        entity (type): The entity class, e.g. Book.
+        headers (list of str): The column names of the rows.
+        rows (iterable of tuples): The rows as read from the cursor.
+
+    Returns:
+        list: One entity object per row.
+    """
+    fields = entity.__slots__
+    if tuple(headers) == fields:
+        return list(starmap(entity, rows))
+    columns = itemgetter(*[list(headers).index(field) for field in fields])
+    return list(starmap(entity, map(columns, rows)))
+
+
+def hydrate_result(entity, result, fetchone=False):
+    """
+    Replaces the rows of a repository result with entity objects.
+
+    Parameters:
+        entity (type): The entity class, e.g. Book.
+        result (dict): The result, with 'content' and 'headers'.
+        fetchone (bool): Whether 'content' is a single record rather than a list of records.
+
+    Returns:
+        dict: A new result whose 'content' holds entity objects, or None for a missing record.
+    """
+    if fetchone:
+        content = hydrate(entity, result['headers'], [result['content']])[0] if result['content'] else None
+    else:
+        content = hydrate(entity, result['headers'], result['content'])
+    return dict(result, content=content)
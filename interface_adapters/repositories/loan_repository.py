@@ -1,4 +1,11 @@
-from mysql.connector import Error
+import time
+from datetime import datetime
+
+from entities.loan import Loan
+from frameworks_and_drivers.database.drivers import Error
+from frameworks_and_drivers.database.partitioning import partitions_between
+from interface_adapters.repositories.columnar import to_record_batch
+from interface_adapters.repositories.hydration import hydrate, hydrate_result
 
 
 class LoanRepository:
@@ -6,16 +13,39 @@ class LoanRepository:
     Repository class for handling the database operations related to book loans.
     """
 
-    def __init__(self, connection):
+    # Columns of the rows yielded by iter_overdue_loans()
+    overdue_headers = ('loan_id', 'book_id', 'title', 'user_id', 'name', 'copy_id', 'loan_date', 'due_date')
+
+    # Columns through which books and users are referenced by their loans, for get_loan_references()
+    reference_fields = ('book_id', 'user_id')
+
+    # Oldest loan_date a date-bounded query can start from
+    min_loan_date = '0001-01-01'
+
+    def __init__(self, connection_pool, cache=None):
         """
-        Initializes the LoanRepository with a database connection.
+        Initializes the LoanRepository with a database connection pool.
 
         Parameters:
-            connection: A MySQL database connection object.
+            connection_pool (ConnectionPool): The pool that database connections are leased from.
+            cache (EntityCache, optional): Cache for single-record lookups by loan_id.
         """
-        self.connection = connection
+        self.connection_pool = connection_pool
+        self.cache = cache
 
-    def create_loan(self, book_id, user_id, loan_date, due_date):
+    def transaction(self):
+        """
+        Opens a unit of work shared by every repository using the same connection pool.
+
+        Repository calls made inside the returned context manager run in one transaction with a single
+        commit at the end, and are rolled back together if any of them fails.
+
+        Returns:
+            A context manager yielding the leased connection.
+        """
+        return self.connection_pool.transaction()
+
+    def create_loan(self, book_id, user_id, loan_date, due_date, copy_id=None):
         """
         Creates a new loan record in the database.
 
@@ -24,23 +54,158 @@ class LoanRepository:
             user_id (int): The unique identifier of the user who is borrowing the book.
             loan_date (str): The date when the book is loaned out.
             due_date (str): The due date for returning the book.
+            copy_id (int, optional): The physical copy being loaned.
         """
         query = """
-                INSERT INTO loans (book_id, user_id, loan_date, due_date) 
-                VALUES (%s, %s, %s, %s)
+                INSERT INTO loans (book_id, user_id, loan_date, due_date, copy_id) 
+                VALUES (%s, %s, %s, %s, %s)
                 """
-        args = (book_id, user_id, loan_date, due_date)
+        args = (book_id, user_id, loan_date, due_date, copy_id)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            self.connection.commit()
-            print("Loan created successfully")
-        except Error as e:
-            print(f"Error: '{e}'")
-            self.connection.rollback()
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                self.connection_pool.commit(connection)
+                print("Loan created successfully")
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
 
-    def get_loans_by_id(self, id_field_name, id_value, fetchone=True):
+    def create_loans(self, loans):
+        """
+        Creates many loan records with a single multi-row INSERT and one commit.
+
+        Either every loan is created or, if any row is rejected, none is.
+
+        Parameters:
+            loans (list of tuples): (book_id, user_id, loan_date, due_date, copy_id) for each loan.
+
+        Raises:
+            Error: If the loans could not be written; nothing is committed.
+        """
+        values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(loans))
+        query = f"INSERT INTO loans (book_id, user_id, loan_date, due_date, copy_id) VALUES {values}"
+        args = tuple(value for loan in loans for value in loan)
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                self.connection_pool.commit(connection)
+                print("Loans created successfully")
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+                raise
+
+    def get_active_loan_ids(self, loan_ids):
+        """
+        Finds which of the given loans exist and are not yet returned, with a single query.
+
+        Parameters:
+            loan_ids (list of int): The loan IDs to check.
+
+        Returns:
+            dict: (book_id, copy_id) of each loan that is still open, keyed by loan_id.
+        """
+        if not loan_ids:
+            return {}
+        placeholders = ', '.join(['%s'] * len(loan_ids))
+        query = (f"SELECT loan_id, book_id, copy_id FROM loans "
+                 f"WHERE loan_id IN ({placeholders}) AND return_date IS NULL")
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, tuple(loan_ids))
+                return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+
+    def get_loan_references(self, id_field_name, id_values):
+        """
+        Finds which of the given books or users still have loans, without reading the loans themselves.
+
+        Each ID is probed with two EXISTS subqueries on the (book_id, return_date) or
+        (user_id, return_date) index, which stop at the first matching entry however many loans the
+        book or user has had. Archived loans are not counted, as nothing refers to them.
+
+        Parameters:
+            id_field_name (str): 'book_id' or 'user_id'.
+            id_values (list of int): The IDs to check.
+
+        Returns:
+            dict: (has active loans, has returned loans) keyed by ID, for each ID with at least one loan.
+
+        Raises:
+            ValueError: If id_field_name is not 'book_id' or 'user_id'.
+        """
+        if id_field_name not in self.reference_fields:
+            raise ValueError(f"Loans are not referenced by '{id_field_name}'.")
+        id_values = list(dict.fromkeys(id_values))
+
+        references = {}
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                # SQLite allows at most 500 terms in a compound SELECT
+                for start in range(0, len(id_values), 500):
+                    chunk = id_values[start:start + 500]
+                    ids = ' UNION ALL '.join(['SELECT %s AS id'] * len(chunk))
+                    query = f"""
+                            SELECT ids.id,
+                                   EXISTS (SELECT 1 FROM loans WHERE loans.{id_field_name} = ids.id
+                                           AND loans.return_date IS NULL LIMIT 1),
+                                   EXISTS (SELECT 1 FROM loans WHERE loans.{id_field_name} = ids.id
+                                           AND loans.return_date IS NOT NULL LIMIT 1)
+                            FROM ({ids}) AS ids
+                            """
+                    cursor.execute(query, tuple(chunk))
+                    references.update((row[0], (bool(row[1]), bool(row[2])))
+                                      for row in cursor.fetchall() if row[1] or row[2])
+                return references
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+
+    def return_loans(self, loan_ids, return_date):
+        """
+        Marks many open loans as returned with a single UPDATE and one commit.
+
+        Either every loan is marked returned or, if any of them is missing or already returned,
+        none is.
+
+        Parameters:
+            loan_ids (list of int): The IDs of the loans being returned.
+            return_date (str): The date when the books were returned.
+
+        Raises:
+            Error: If the loans could not be updated; nothing is committed.
+            Exception: If not every loan was open; nothing is committed.
+        """
+        placeholders = ', '.join(['%s'] * len(loan_ids))
+        query = f"UPDATE loans SET return_date = %s WHERE loan_id IN ({placeholders}) AND return_date IS NULL"
+        args = (return_date,) + tuple(loan_ids)
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                if cursor.rowcount != len(set(loan_ids)):
+                    self.connection_pool.rollback(connection)
+                    raise Exception("Some loans were returned by someone else in the meantime. Nothing was changed.")
+                self.connection_pool.commit(connection)
+                if self.cache is not None:
+                    self.connection_pool.on_commit(lambda ids=loan_ids: [self.cache.evict(loan_id) for loan_id in ids])
+                print("Loans updated successfully")
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+                raise
+
+    def get_loans_by_id(self, id_field_name, id_value, fetchone=True, as_entities=False, include_archive=False):
         """
         Retrieves loan record(s) from the database by its ID.
 
@@ -48,24 +213,46 @@ class LoanRepository:
             id_field_name (str): The column/field name of the id.
             id_value (str or int): The unique identifier of the column/field.
             fetchone (bool): Check if the user needs only one loan.
+            as_entities (bool): Return Loan objects instead of tuples.
+            include_archive (bool): Also search the archived loans, which are otherwise left out.
 
         Returns:
             Loan record(s) from the database.
         """
+        # Single-record lookups by primary key are served from the cache when one is configured
+        use_cache = self.cache is not None and fetchone and id_field_name == 'loan_id' and not include_archive
+        if use_cache:
+            cached = self.cache.get(id_value)
+            if cached is not None:
+                return hydrate_result(Loan, cached, fetchone) if as_entities else cached
+            # Taken before the read, so a write committed while it runs keeps the read out of the cache
+            token = self.cache.reserve(id_value)
+
         query = f"SELECT * FROM loans WHERE {id_field_name} = %s"
         args = (id_value,)
+        if include_archive:
+            columns = ', '.join(Loan.__slots__)
+            query = (f"SELECT {columns} FROM loans WHERE {id_field_name} = %s "
+                     f"UNION ALL SELECT {columns} FROM loans_archive WHERE {id_field_name} = %s "
+                     f"ORDER BY loan_id")
+            args = (id_value, id_value)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            headers = [i[0] for i in cursor.description]
-            if fetchone:
-                loan = cursor.fetchone()
-            else:
-                loan = cursor.fetchall()
-            return {'content': loan, 'headers': headers}
-        except Error as e:
-            print(f"Error: '{e}'")
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                headers = [i[0] for i in cursor.description]
+                if fetchone:
+                    loan = cursor.fetchone()
+                else:
+                    loan = cursor.fetchall()
+                result = {'content': loan, 'headers': headers}
+                if use_cache and loan is not None:
+                    # Cached only once committed, so a rolled-back unit of work leaves no trace
+                    self.connection_pool.on_commit(lambda: self.cache.fill(id_value, result, token))
+                return hydrate_result(Loan, result, fetchone) if as_entities else result
+            except Error as e:
+                print(f"Error: '{e}'")
 
     def get_loans(self, fetchone=True):
         """
@@ -79,17 +266,246 @@ class LoanRepository:
         """
         query = f"SELECT * FROM loans"
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query)
-            headers = [i[0] for i in cursor.description]
-            if fetchone:
-                loans = cursor.fetchone()
-            else:
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query)
+                headers = [i[0] for i in cursor.description]
+                if fetchone:
+                    loans = cursor.fetchone()
+                else:
+                    loans = cursor.fetchall()
+                return {'content': loans, 'headers': headers}
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def get_loans_page(self, page_size=50, after=None, as_entities=False, columnar=False):
+        """
+        Retrieves one page of loan records, ordered by loan_id.
+
+        Pages are found by seeking past the last loan_id of the previous page rather than with OFFSET,
+        so every page costs the same however deep into the table it is.
+
+        Parameters:
+            page_size (int): The maximum number of loans to return.
+            after (int, optional): The next_cursor of the previous page; None for the first page.
+            as_entities (bool): Return Loan objects instead of tuples.
+            columnar (bool): Return the page as one Arrow record batch instead of a list of rows.
+
+        Returns:
+            Loan records with their headers, plus the next_cursor to pass as 'after' for the
+            following page (None on the last page).
+        """
+        query = "SELECT * FROM loans WHERE loan_id > %s ORDER BY loan_id LIMIT %s"
+        # One extra row tells whether another page follows
+        args = (after if after is not None else 0, page_size + 1)
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                headers = [i[0] for i in cursor.description]
                 loans = cursor.fetchall()
-            return {'content': loans, 'headers': headers}
-        except Error as e:
-            print(f"Error: '{e}'")
+                next_cursor = loans[page_size - 1][0] if len(loans) > page_size else None
+                loans = loans[:page_size]
+                if columnar:
+                    loans = to_record_batch(headers, loans)
+                elif as_entities:
+                    loans = hydrate(Loan, headers, loans)
+                return {'content': loans, 'headers': headers, 'next_cursor': next_cursor}
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def iter_loans(self, chunk_size=1000, as_entities=False):
+        """
+        Streams every loan record, ordered by loan_id, without loading the table into memory.
+
+        Rows are read from an unbuffered server-side cursor in chunks of chunk_size rows. The cursor
+        and its connection are released as soon as the generator is exhausted or closed, including
+        when the consumer stops early.
+
+        Parameters:
+            chunk_size (int): The number of rows fetched from the database at a time.
+            as_entities (bool): Yield Loan objects instead of tuples.
+
+        Yields:
+            tuple or Loan: One loan record at a time.
+
+        Raises:
+            Error: If the rows could not all be read.
+        """
+        query = "SELECT * FROM loans ORDER BY loan_id"
+
+        # A dedicated connection, so queries made while consuming the stream cannot reuse it
+        with self.connection_pool.lease(shared=False) as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(query)
+                headers = [i[0] for i in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from hydrate(Loan, headers, rows) if as_entities else rows
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+            finally:
+                cursor.close()
+
+    def iter_overdue_loans(self, now, chunk_size=1000):
+        """
+        Streams the open loans whose due date has passed, most overdue first, with the title of the book
+        and the name of the borrower.
+
+        The filter runs in the database on the (return_date, due_date) index, so only overdue loans are
+        read rather than the whole loans table.
+
+        Parameters:
+            now (str): The moment loans are overdue at, as 'YYYY-MM-DD HH:MM:SS'.
+            chunk_size (int): The number of rows fetched from the database at a time.
+
+        Yields:
+            tuple: One overdue loan at a time, with the columns of overdue_headers.
+
+        Raises:
+            Error: If the rows could not all be read.
+        """
+        query = """
+                SELECT loans.loan_id, loans.book_id, books.title, loans.user_id, users.name,
+                       loans.copy_id, loans.loan_date, loans.due_date
+                FROM loans
+                LEFT JOIN books ON books.book_id = loans.book_id
+                LEFT JOIN users ON users.user_id = loans.user_id
+                WHERE loans.return_date IS NULL AND loans.due_date < %s
+                ORDER BY loans.due_date, loans.loan_id
+                """
+
+        # A dedicated connection, so queries made while consuming the stream cannot reuse it
+        with self.connection_pool.lease(shared=False) as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(query, (now,))
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from rows
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+            finally:
+                cursor.close()
+
+    def get_loan_activity(self, start_date, end_date):
+        """
+        Summarizes, month by month, the loans made in a date range.
+
+        When loans is partitioned by loan_date, only the partitions overlapping the range are read.
+
+        Parameters:
+            start_date (str): The first loan date of the range, as 'YYYY-MM-DD'.
+            end_date (str): The loan date the range stops before, as 'YYYY-MM-DD'.
+
+        Returns:
+            The number of loans, borrowers, returns, late returns and loans still out for each month,
+            with their headers.
+        """
+        with self.connection_pool.lease() as connection:
+            try:
+                query = f"""
+                        SELECT SUBSTR(loans.loan_date, 1, 7) AS month, COUNT(*) AS loans,
+                               COUNT(DISTINCT loans.user_id) AS borrowers,
+                               SUM(CASE WHEN loans.return_date IS NOT NULL THEN 1 ELSE 0 END) AS returned,
+                               SUM(CASE WHEN loans.return_date > loans.due_date THEN 1 ELSE 0 END) AS returned_late,
+                               SUM(CASE WHEN loans.return_date IS NULL THEN 1 ELSE 0 END) AS still_out
+                        FROM {self._loans_between(connection, start_date, end_date)}
+                        WHERE loans.loan_date >= %s AND loans.loan_date < %s
+                        GROUP BY month
+                        ORDER BY month
+                        """
+                cursor = connection.cursor()
+                cursor.execute(query, (start_date, end_date))
+                headers = [i[0] for i in cursor.description]
+                return {'content': cursor.fetchall(), 'headers': headers}
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def _loans_between(self, connection, start_date, end_date):
+        """
+        Builds the FROM clause reading only the loans partitions that can hold loans dated in
+        [start_date, end_date); the whole loans table when it is not partitioned.
+        """
+        driver = self.connection_pool.driver
+        return driver.loans_source(partitions_between(driver.loan_partitions(connection), start_date, end_date))
+
+    def archive_returned_loans(self, returned_before, batch_size=500, pause=0.0):
+        """
+        Moves the loans returned before a date from loans to loans_archive, in batches.
+
+        Each batch is copied and deleted in its own short transaction, oldest returns first, with an
+        optional pause between batches, so the job can run while the library is open. Loans with a fine
+        that the next fines run may still change, and loans returned late since the last fines run, are
+        left in place until it has run. When loans is
+        partitioned, the partitions made before the date are emptied one at a time, oldest first; a loan
+        is made before it is returned, so the later ones are never read.
+
+        Parameters:
+            returned_before (str): Loans returned before this date, as 'YYYY-MM-DD', are archived.
+            batch_size (int): The number of loans moved per transaction.
+            pause (float): Seconds to sleep between batches, to leave headroom for other traffic.
+
+        Returns:
+            int: The number of loans archived.
+
+        Raises:
+            Error: If a batch could not be moved; the batches before it stay archived.
+        """
+        columns = ', '.join(Loan.__slots__)
+        driver = self.connection_pool.driver
+        with self.connection_pool.lease() as connection:
+            partitions = partitions_between(driver.loan_partitions(connection), self.min_loan_date, returned_before)
+        # One partition at a time, oldest first, so every batch is read in return_date order from one index
+        sources = [driver.loans_source([partition]) for partition in partitions] or [driver.loans_source([])]
+
+        archived = 0
+        for source in sources:
+            select_query = f"""
+                    SELECT loans.loan_id FROM {source}
+                    WHERE loans.return_date < %s
+                      AND loans.loan_id NOT IN (SELECT loan_id FROM fine_totals WHERE settled = 0)
+                      AND NOT (loans.return_date > loans.due_date
+                               AND loans.return_date >= (SELECT COALESCE(MAX(as_of), %s) FROM fine_runs))
+                    ORDER BY loans.return_date
+                    LIMIT %s
+                    """
+            while True:
+                with self.connection_pool.lease() as connection:
+                    try:
+                        cursor = connection.cursor()
+                        cursor.execute(select_query, (returned_before, self.min_loan_date, batch_size))
+                        loan_ids = [row[0] for row in cursor.fetchall()]
+                        if not loan_ids:
+                            break
+                        placeholders = ', '.join(['%s'] * len(loan_ids))
+                        cursor.execute(
+                            f"INSERT INTO loans_archive ({columns}, archived_at) "
+                            f"SELECT {columns}, %s FROM loans WHERE loan_id IN ({placeholders})",
+                            [datetime.now().strftime('%Y-%m-%d %H:%M:%S')] + loan_ids,
+                        )
+                        cursor.execute(f"DELETE FROM loans WHERE loan_id IN ({placeholders})", loan_ids)
+                        self.connection_pool.commit(connection)
+                        if self.cache is not None:
+                            self.connection_pool.on_commit(
+                                lambda ids=loan_ids: [self.cache.evict(loan_id) for loan_id in ids])
+                    except Error as e:
+                        print(f"Error: '{e}'")
+                        self.connection_pool.rollback(connection)
+                        raise
+                archived += len(loan_ids)
+                if pause:
+                    time.sleep(pause)
+        return archived
 
     def update_loan(self, loan_id, book_id, user_id, loan_date, due_date, return_date):
         """
@@ -110,32 +526,52 @@ class LoanRepository:
                 """
         args = (book_id, user_id, loan_date, due_date, return_date, loan_id)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            self.connection.commit()
-            print("Loan updated successfully")
-        except Error as e:
-            print(f"Error: '{e}'")
-            self.connection.rollback()
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                self.connection_pool.commit(connection)
+                if self.cache is not None:
+                    # Write-through: cache the record as stored, so the next lookup is a hit
+                    cursor.execute("SELECT * FROM loans WHERE loan_id = %s", (loan_id,))
+                    loan = cursor.fetchone()
+                    if loan is not None:
+                        cached = {'content': loan, 'headers': [i[0] for i in cursor.description]}
+                        self.connection_pool.on_commit(lambda: self.cache.put(loan_id, cached))
+                print("Loan updated successfully")
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
 
-    def delete_loan(self, loan_id):
+    def delete_loan(self, loan_id, open_only=False):
         """
         Deletes a loan record from the database.
 
         Parameters:
             loan_id (int): The unique identifier of the loan to be deleted.
+            open_only (bool): Only delete the loan if it has not been returned.
+
+        Returns:
+            bool: True if a loan was deleted.
         """
         query = "DELETE FROM loans WHERE loan_id = %s"
+        if open_only:
+            query += " AND return_date IS NULL"
         args = (loan_id,)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            self.connection.commit()
-            print("Loan deleted successfully")
-        except Error as e:
-            print(f"Error: '{e}'")
-            self.connection.rollback()
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                deleted = cursor.rowcount > 0
+                self.connection_pool.commit(connection)
+                if self.cache is not None:
+                    self.connection_pool.on_commit(lambda: self.cache.evict(loan_id))
+                if deleted:
+                    print("Loan deleted successfully")
+                return deleted
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
 
     # Additional methods can be added here as needed.
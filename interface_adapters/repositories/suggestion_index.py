@@ -0,0 +1,123 @@
+import threading
+from bisect import bisect_left, insort
+
+
+class SuggestionIndex:
+    """
+    A thread-safe, in-process prefix index for autocompleting text fields of records.
+
+    For each field the case-folded values are kept in a sorted list of (value, record id) pairs, so
+    the values starting with a prefix form one contiguous run that a binary search finds in
+    O(log n); a top-k query then reads k entries from there.
+
+    Attributes:
+        fields (tuple): The names of the indexed fields, e.g. ('title', 'author').
+    """
+
+    def __init__(self, fields):
+        """
+        Initializes an empty SuggestionIndex.
+
+        Parameters:
+            fields (iterable of str): The names of the indexed fields.
+        """
+        self.fields = tuple(fields)
+        self._entries = {field: [] for field in self.fields}
+        self._values = {}  # record id -> the record's values, in field order
+        self._lock = threading.Lock()
+
+    def load(self, records):
+        """
+        Replaces the index with the given records, e.g. when the application starts.
+
+        Parameters:
+            records (iterable): (record id, values in field order) for every record.
+        """
+        entries = {field: [] for field in self.fields}
+        values = {}
+        for record_id, record_values in records:
+            values[record_id] = tuple(record_values)
+            for field, value in zip(self.fields, record_values):
+                if value:
+                    entries[field].append((value.casefold(), record_id))
+        for field_entries in entries.values():
+            field_entries.sort()
+        with self._lock:
+            self._entries = entries
+            self._values = values
+
+    def put(self, record_id, record_values):
+        """
+        Adds a record, or replaces the values of one already indexed.
+
+        Parameters:
+            record_id: The primary key of the record.
+            record_values (iterable): The record's values, in field order.
+        """
+        with self._lock:
+            self._remove(record_id)
+            self._values[record_id] = tuple(record_values)
+            for field, value in zip(self.fields, self._values[record_id]):
+                if value:
+                    insort(self._entries[field], (value.casefold(), record_id))
+
+    def remove(self, record_id):
+        """
+        Removes a record from the index, if present.
+
+        Parameters:
+            record_id: The primary key of the record.
+        """
+        with self._lock:
+            self._remove(record_id)
+
+    def suggest(self, field, prefix, limit=10):
+        """
+        Finds the values of a field that start with a prefix, ignoring case.
+
+        Parameters:
+            field (str): One of the indexed fields.
+            prefix (str): What has been typed so far.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list: Up to limit (value, record id) pairs, in alphabetical order of value.
+        """
+        key = prefix.casefold()
+        position = self.fields.index(field)
+        suggestions = []
+        with self._lock:
+            entries = self._entries[field]
+            i = bisect_left(entries, (key,))
+            while i < len(entries) and len(suggestions) < limit and entries[i][0].startswith(key):
+                record_id = entries[i][1]
+                suggestions.append((self._values[record_id][position], record_id))
+                i += 1
+        return suggestions
+
+    def stats(self):
+        """
+        Reports the size of the index.
+
+        Returns:
+            dict: The number of records and the number of entries per field.
+        """
+        with self._lock:
+            stats = {'records': len(self._values)}
+            for field, entries in self._entries.items():
+                stats[f'{field}_entries'] = len(entries)
+            return stats
+
+    def _remove(self, record_id):
+        """
+        Removes a record's entries. Caller holds the lock.
+        """
+        record_values = self._values.pop(record_id, None)
+        if record_values is None:
+            return
+        for field, value in zip(self.fields, record_values):
+            if value:
+                entries = self._entries[field]
+                i = bisect_left(entries, (value.casefold(), record_id))
+                if i < len(entries) and entries[i] == (value.casefold(), record_id):
+                    del entries[i]
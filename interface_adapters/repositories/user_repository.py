@@ -1,4 +1,7 @@
-from mysql.connector import Error
+from entities.user import User
+from frameworks_and_drivers.database.drivers import Error
+from interface_adapters.repositories.columnar import to_record_batch
+from interface_adapters.repositories.hydration import hydrate, hydrate_result
 
 
 class UserRepository:
@@ -6,14 +9,39 @@ class UserRepository:
     Repository class for handling the database operations related to users.
     """
 
-    def __init__(self, connection):
+    # Fields that can be autocompleted with suggest()
+    suggestion_fields = ('name',)
+    # Fields matched approximately by find_similar()
+    fuzzy_fields = ('name', 'email')
+
+    def __init__(self, connection_pool, cache=None, suggestions=None, fuzzy=None):
         """
-        Initializes the UserRepository with a database connection.
+        Initializes the UserRepository with a database connection pool.
 
         Parameters:
-            connection: A MySQL database connection object.
+            connection_pool (ConnectionPool): The pool that database connections are leased from.
+            cache (EntityCache, optional): Cache for single-record lookups by user_id.
+            suggestions (SuggestionIndex, optional): In-process prefix index over the name of every
+                user, kept current by this repository's writes.
+            fuzzy (FuzzyIndex, optional): In-process trigram index over the name and email of every
+                user, used by find_similar() and kept current by this repository's writes.
+        """
+        self.connection_pool = connection_pool
+        self.cache = cache
+        self.suggestions = suggestions
+        self.fuzzy = fuzzy
+
+    def transaction(self):
         """
-        self.connection = connection
+        Opens a unit of work shared by every repository using the same connection pool.
+
+        Repository calls made inside the returned context manager run in one transaction with a single
+        commit at the end, and are rolled back together if any of them fails.
+
+        Returns:
+            A context manager yielding the leased connection.
+        """
+        return self.connection_pool.transaction()
 
     def add_user(self, name, email, role):
         """
@@ -30,16 +58,152 @@ class UserRepository:
                 """
         args = (name, email, role)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            self.connection.commit()
-            print("User added successfully")
-        except Error as e:
-            print(f"Error: '{e}'")
-            self.connection.rollback()
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                user_id = cursor.lastrowid
+                self.connection_pool.commit(connection)
+                self._track_user(user_id, name, email)
+                print("User added successfully")
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+
+    def add_users(self, users):
+        """
+        Adds many users to the database with a single batched INSERT and one commit.
+
+        Parameters:
+            users (list of tuples): (name, email, role) for each user.
+
+        Returns:
+            int: The number of users added.
 
-    def get_users_by_id(self, id_field_name, id_value, fetchone=True):
+        Raises:
+            Error: If the batch could not be written; nothing from the batch is committed.
+        """
+        query = """
+                INSERT INTO users (name, email, role) 
+                VALUES (%s, %s, %s)
+                """
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                indexed = self.suggestions is not None or self.fuzzy is not None
+                if indexed:
+                    cursor.execute("SELECT COALESCE(MAX(user_id), 0) FROM users")
+                    last_user_id = cursor.fetchone()[0]
+                cursor.executemany(query, users)
+                if indexed:
+                    cursor.execute("SELECT user_id, name, email FROM users WHERE user_id > %s", (last_user_id,))
+                    added = cursor.fetchall()
+                self.connection_pool.commit(connection)
+                if indexed:
+                    for user_id, name, email in added:
+                        self._track_user(user_id, name, email)
+                return len(users)
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+                raise
+
+    def iter_emails(self, chunk_size=10000):
+        """
+        Streams the email address of every user, without loading the users table into memory.
+
+        Parameters:
+            chunk_size (int): The number of rows fetched from the database at a time.
+
+        Yields:
+            str: One email address at a time.
+
+        Raises:
+            Error: If the rows could not all be read.
+        """
+        query = "SELECT email FROM users"
+
+        with self.connection_pool.lease(shared=False) as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(query)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row[0]
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+            finally:
+                cursor.close()
+
+    def load_suggestions(self):
+        """
+        Builds the prefix index from every user in the database, e.g. when the application starts.
+        """
+        if self.suggestions is not None:
+            self.suggestions.load((row[0], (row[1],)) for row in self.iter_users())
+
+    def load_fuzzy_index(self):
+        """
+        Builds the trigram index from every user in the database, e.g. when the application starts.
+        """
+        if self.fuzzy is not None:
+            self.fuzzy.load((row[0], (row[1], row[2])) for row in self.iter_users())
+
+    def find_similar(self, text, limit=5):
+        """
+        Finds the users whose name or email is closest to a query that may contain typos.
+
+        Parameters:
+            text (str): The name or email address to look for.
+            limit (int): The maximum number of users to return.
+
+        Returns:
+            list: Up to limit (score, user_id) pairs, best first, scored from 0.0 to 1.0.
+
+        Raises:
+            Exception: If no trigram index is configured.
+        """
+        if self.fuzzy is None:
+            raise Exception("Approximate search is not enabled.")
+        return self.fuzzy.search(text, limit)
+
+    def suggest(self, field, prefix, limit=10):
+        """
+        Autocompletes a field: finds users whose value of it starts with what has been typed.
+
+        Served from the prefix index when one is configured, otherwise by a LIKE query.
+
+        Parameters:
+            field (str): One of suggestion_fields.
+            prefix (str): What has been typed so far.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list: Up to limit (value, user_id) pairs, in alphabetical order of value.
+        """
+        if field not in self.suggestion_fields:
+            raise ValueError(f"Cannot autocomplete '{field}'. Choose one of: {', '.join(self.suggestion_fields)}.")
+        if self.suggestions is not None:
+            return self.suggestions.suggest(field, prefix, limit)
+
+        pattern = prefix.replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%'
+        query = f"SELECT {field}, user_id FROM users WHERE {field} LIKE %s ESCAPE '!' ORDER BY {field}, user_id LIMIT %s"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, (pattern, limit))
+                return [tuple(row) for row in cursor.fetchall()]
+            except Error as e:
+                print(f"Error: '{e}'")
+                return []
+
+    def get_users_by_id(self, id_field_name, id_value, fetchone=True, as_entities=False):
         """
         Retrieves user record(s) from the database by its ID.
 
@@ -47,24 +211,62 @@ class UserRepository:
             id_field_name (str): The column/field name of the id.
             id_value (str or int): The unique identifier of the column/field.
             fetchone (bool): Check if the user needs only one user.
+            as_entities (bool): Return User objects instead of tuples.
 
         Returns:
             User record(s) from the database.
         """
+        # Single-record lookups by primary key are served from the cache when one is configured
+        use_cache = self.cache is not None and fetchone and id_field_name == 'user_id'
+        if use_cache:
+            cached = self.cache.get(id_value)
+            if cached is not None:
+                return hydrate_result(User, cached, fetchone) if as_entities else cached
+            # Taken before the read, so a write committed while it runs keeps the read out of the cache
+            token = self.cache.reserve(id_value)
+
         query = f"SELECT * FROM users WHERE {id_field_name} = %s"
         args = (id_value,)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            headers = [i[0] for i in cursor.description]
-            if fetchone:
-                user = cursor.fetchone()
-            else:
-                user = cursor.fetchall()
-            return {'content': user, 'headers': headers}
-        except Error as e:
-            print(f"Error: '{e}'")
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                headers = [i[0] for i in cursor.description]
+                if fetchone:
+                    user = cursor.fetchone()
+                else:
+                    user = cursor.fetchall()
+                result = {'content': user, 'headers': headers}
+                if use_cache and user is not None:
+                    # Cached only once committed, so a rolled-back unit of work leaves no trace
+                    self.connection_pool.on_commit(lambda: self.cache.fill(id_value, result, token))
+                return hydrate_result(User, result, fetchone) if as_entities else result
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def get_users_by_ids(self, user_ids):
+        """
+        Retrieves several user records with one query.
+
+        Parameters:
+            user_ids (iterable of int): The IDs of the users to retrieve.
+
+        Returns:
+            dict: {'content': records in user_id order, 'headers': column names}.
+        """
+        user_ids = sorted(set(user_ids))
+        placeholders = ', '.join(['%s'] * len(user_ids)) or 'NULL'
+        query = f"SELECT * FROM users WHERE user_id IN ({placeholders}) ORDER BY user_id"
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, tuple(user_ids))
+                headers = [i[0] for i in cursor.description]
+                return {'content': cursor.fetchall(), 'headers': headers}
+            except Error as e:
+                print(f"Error: '{e}'")
 
     def get_users(self, fetchone=True):
         """
@@ -78,17 +280,92 @@ class UserRepository:
         """
         query = f"SELECT * FROM users"
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query)
-            headers = [i[0] for i in cursor.description]
-            if fetchone:
-                users = cursor.fetchone()
-            else:
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query)
+                headers = [i[0] for i in cursor.description]
+                if fetchone:
+                    users = cursor.fetchone()
+                else:
+                    users = cursor.fetchall()
+                return {'content': users, 'headers': headers}
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def get_users_page(self, page_size=50, after=None, as_entities=False, columnar=False):
+        """
+        Retrieves one page of user records, ordered by user_id.
+
+        Pages are found by seeking past the last user_id of the previous page rather than with OFFSET,
+        so every page costs the same however deep into the table it is.
+
+        Parameters:
+            page_size (int): The maximum number of users to return.
+            after (int, optional): The next_cursor of the previous page; None for the first page.
+            as_entities (bool): Return User objects instead of tuples.
+            columnar (bool): Return the page as one Arrow record batch instead of a list of rows.
+
+        Returns:
+            User records with their headers, plus the next_cursor to pass as 'after' for the
+            following page (None on the last page).
+        """
+        query = "SELECT * FROM users WHERE user_id > %s ORDER BY user_id LIMIT %s"
+        # One extra row tells whether another page follows
+        args = (after if after is not None else 0, page_size + 1)
+
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                headers = [i[0] for i in cursor.description]
                 users = cursor.fetchall()
-            return {'content': users, 'headers': headers}
-        except Error as e:
-            print(f"Error: '{e}'")
+                next_cursor = users[page_size - 1][0] if len(users) > page_size else None
+                users = users[:page_size]
+                if columnar:
+                    users = to_record_batch(headers, users)
+                elif as_entities:
+                    users = hydrate(User, headers, users)
+                return {'content': users, 'headers': headers, 'next_cursor': next_cursor}
+            except Error as e:
+                print(f"Error: '{e}'")
+
+    def iter_users(self, chunk_size=1000, as_entities=False):
+        """
+        Streams every user record, ordered by user_id, without loading the table into memory.
+
+        Rows are read from an unbuffered server-side cursor in chunks of chunk_size rows. The cursor
+        and its connection are released as soon as the generator is exhausted or closed, including
+        when the consumer stops early.
+
+        Parameters:
+            chunk_size (int): The number of rows fetched from the database at a time.
+            as_entities (bool): Yield User objects instead of tuples.
+
+        Yields:
+            tuple or User: One user record at a time.
+
+        Raises:
+            Error: If the rows could not all be read.
+        """
+        query = "SELECT * FROM users ORDER BY user_id"
+
+        # A dedicated connection, so queries made while consuming the stream cannot reuse it
+        with self.connection_pool.lease(shared=False) as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(query)
+                headers = [i[0] for i in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from hydrate(User, headers, rows) if as_entities else rows
+            except Error as e:
+                print(f"Error: '{e}'")
+                raise
+            finally:
+                cursor.close()
 
     def update_user(self, user_id, name, email, role):
         """
@@ -107,14 +384,26 @@ class UserRepository:
                 """
         args = (name, email, role, user_id)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            self.connection.commit()
-            print("User updated successfully")
-        except Error as e:
-            print(f"Error: '{e}'")
-            self.connection.rollback()
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                updated = cursor.rowcount > 0
+                self.connection_pool.commit(connection)
+                if self.cache is not None:
+                    # Write-through: cache the record as stored, so the next lookup is a hit
+                    cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
+                    user = cursor.fetchone()
+                    if user is not None:
+                        cached = {'content': user, 'headers': [i[0] for i in cursor.description]}
+                        self.connection_pool.on_commit(lambda: self.cache.put(user_id, cached))
+                # An update that matched no user must not add one to the search indexes
+                if updated:
+                    self._track_user(user_id, name, email)
+                print("User updated successfully")
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
 
     def delete_user(self, user_id):
         """
@@ -126,13 +415,35 @@ class UserRepository:
         query = "DELETE FROM users WHERE user_id = %s"
         args = (user_id,)
 
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, args)
-            self.connection.commit()
-            print("User deleted successfully")
-        except Error as e:
-            print(f"Error: '{e}'")
-            self.connection.rollback()
+        with self.connection_pool.lease() as connection:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, args)
+                self.connection_pool.commit(connection)
+                if self.cache is not None:
+                    self.connection_pool.on_commit(lambda: self.cache.evict(user_id))
+                self._track_user_deleted(user_id)
+                print("User deleted successfully")
+            except Error as e:
+                print(f"Error: '{e}'")
+                self.connection_pool.rollback(connection)
+
+    def _track_user(self, user_id, name, email):
+        """
+        Puts a user in the in-process search indexes once the current unit of work commits.
+        """
+        if self.suggestions is not None:
+            self.connection_pool.on_commit(lambda: self.suggestions.put(user_id, (name,)))
+        if self.fuzzy is not None:
+            self.connection_pool.on_commit(lambda: self.fuzzy.put(user_id, (name, email)))
+
+    def _track_user_deleted(self, user_id):
+        """
+        Removes a user from the in-process search indexes once the current unit of work commits.
+        """
+        if self.suggestions is not None:
+            self.connection_pool.on_commit(lambda: self.suggestions.remove(user_id))
+        if self.fuzzy is not None:
+            self.connection_pool.on_commit(lambda: self.fuzzy.remove(user_id))
 
     # Additional methods can be added here as needed.
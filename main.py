@@ -1,6 +1,6 @@
 import sys
 import os
-import ui.cli.cli_main as cli
+from frameworks_and_drivers.database.database_connector import run_migrations
 
 
 def main():
@@ -11,13 +11,18 @@ def main():
     a Graphical User Interface (GUI), and launches the selected interface.
     """
     print("\nWelcome to the Library Management System | Developed by Souradeep Banerjee 💗\n")
+
+    # Apply any schema migrations shipped since the last start; returns immediately when current
+    run_migrations()
+
     print("Choose the interface you would like to use:")
     print("1. Command-Line Interface (CLI)")
     print("2. Graphical User Interface (GUI)")
     choice = input("Enter your choice (1 or 2): ")
 
     if choice == "1":
-        # Launch the CLI
+        # Launch the CLI; imported only now, as its wiring loads in-memory indexes from the migrated tables
+        import ui.cli.cli_main as cli
         cli.main()
     elif choice == "2":
         # Launch the GUI using Streamlit
@@ -1,6 +1,4 @@
-import os
 import subprocess
-import sys
 
 
 def install_requirements():
@@ -23,19 +21,58 @@ def create_config_file():
     print("\nSetting up Configuration for Library Management System")
 
     # Prompting for database connection details
-    host = input("Enter database host (e.g., localhost): ")
-    username = input("Enter database username: ")
-    password = input("Enter database password: ")
-    database = input("Enter database name (e.g., LibraryManagementSystem): ")
+    driver = input("Enter database driver ('mysql' or 'sqlite', default: mysql): ") or "mysql"
+    if driver == "sqlite":
+        host = username = password = ""
+        database = input("Enter database file path (e.g., library.db): ")
+    else:
+        host = input("Enter database host (e.g., localhost): ")
+        username = input("Enter database username: ")
+        password = input("Enter database password: ")
+        database = input("Enter database name (e.g., LibraryManagementSystem): ")
 
     # Creating the content for config.py
     config_content = f"""# config.py
 DB_CONFIG = {{
+    'driver': '{driver}',
     'host': '{host}',
     'username': '{username}',
     'password': '{password}',
     'database': '{database}'
 }}
+
+# Connection pool shared by the repositories
+POOL_CONFIG = {{
+    'size': 5,
+    'timeout': 10.0
+}}
+
+# In-process cache for primary-key lookups in the repositories
+CACHE_CONFIG = {{
+    'enabled': False,
+    'max_entries': 10000,
+    'ttl_seconds': 60.0
+}}
+
+# Late fees charged by the fines run, in cents
+FINES_CONFIG = {{
+    'daily_rate_cents': 25,
+    'max_fine_cents': 2000,
+    'grace_days': 0
+}}
+
+# Returned loans older than min_age_days are moved to loans_archive in throttled batches
+ARCHIVE_CONFIG = {{
+    'min_age_days': 365,
+    'batch_size': 500,
+    'pause_seconds': 0.1
+}}
+
+# Partition loans by loan_date year; the partitions of the coming future_partitions years are created on start
+PARTITION_CONFIG = {{
+    'enabled': False,
+    'future_partitions': 2
+}}
 """
 
     # Writing the content to config.py
@@ -47,15 +84,15 @@ DB_CONFIG = {{
 
 def run_database_setup():
     """
-    Sets up the database using database_connector.py.
+    Sets up the database in process using database_connector.py.
 
-    Changes the working directory to the directory containing database_connector.py,
-    executes the script to create the database and tables, then returns to the root directory.
+    Creates the database if needed and applies every pending schema migration. Running the setup
+    again on an existing database only applies the migrations it has not seen yet.
     """
     print("\nSetting up the Database...")
-    os.chdir("frameworks_and_drivers/database")
-    subprocess.run([sys.executable, "database_connector.py"], check=True)
-    os.chdir("../../")
+    # Imported here because config.py is only written by create_config_file()
+    from frameworks_and_drivers.database import database_connector
+    database_connector.main()
 
 
 def main():
@@ -0,0 +1,20 @@
+import pytest
+
+from frameworks_and_drivers.database.connection_pool import ConnectionPool
+from frameworks_and_drivers.database.drivers import SQLiteDriver
+from frameworks_and_drivers.database.migrations import migrate
+
+
+@pytest.fixture
+def connection_pool(tmp_path):
+    """
+    A pool of 16 connections over a newly migrated SQLite database in WAL mode.
+    """
+    driver = SQLiteDriver()
+    dbinfo = {'database': str(tmp_path / 'library.db')}
+    conn = driver.connect(dbinfo)
+    migrate(conn, driver)
+    conn.close()
+    return ConnectionPool(lambda: driver.connect(dbinfo), size=16, timeout=30.0,
+                          health_check=driver.is_healthy, begin=driver.begin, driver=driver)
+
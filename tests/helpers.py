@@ -0,0 +1,61 @@
+import threading
+
+
+def add_book(connection_pool, copies, borrowers):
+    """
+    Adds a book with the given number of copies on the shelf, and one user per borrower.
+
+    Returns:
+        tuple: The book_id, and the user_id of each borrower.
+    """
+    with connection_pool.lease() as connection:
+        cursor = connection.cursor()
+        cursor.execute("INSERT INTO books (title, author) VALUES (%s, %s)", ('Contended Book', 'Some Author'))
+        book_id = cursor.lastrowid
+        cursor.execute("INSERT INTO book_availability (book_id, total_copies, copies_out) VALUES (%s, %s, 0)",
+                       (book_id, copies))
+        cursor.executemany("INSERT INTO copies (book_id, barcode) VALUES (%s, %s)",
+                           [(book_id, f"B{book_id:08d}-{number:03d}") for number in range(1, copies + 1)])
+        user_ids = []
+        for number in range(borrowers):
+            cursor.execute("INSERT INTO users (name, email, role) VALUES (%s, %s, %s)",
+                           (f"Borrower {number}", f"borrower{number}@example.com", 'member'))
+            user_ids.append(cursor.lastrowid)
+        connection.commit()
+    return book_id, user_ids
+
+
+def copies_out(connection_pool, book_id):
+    """
+    Reads the copies_out counter of a book.
+    """
+    with connection_pool.lease() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT copies_out FROM book_availability WHERE book_id = %s", (book_id,))
+        return cursor.fetchone()[0]
+
+
+def run_concurrently(count, action):
+    """
+    Starts count threads that call action(index) together, and collects what each raised.
+
+    Returns:
+        list: None for each call that returned, or the message of the exception it raised.
+    """
+    start = threading.Barrier(count)
+    outcomes = []
+
+    def run(index):
+        start.wait()
+        try:
+            action(index)
+            outcomes.append(None)
+        except Exception as e:
+            outcomes.append(str(e))
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
@@ -0,0 +1,47 @@
+from datetime import date, datetime
+
+from helpers import add_book
+from interface_adapters.repositories.fine_repository import FineRepository
+from interface_adapters.repositories.loan_repository import LoanRepository
+from use_cases.archive_loans_use_case import ArchiveLoansUseCase
+from use_cases.assess_fines_use_case import AssessFinesUseCase
+
+
+def add_returned_loans(connection_pool, book_id, user_id, loans):
+    """
+    Adds returned loans of a book, given as (loan_date, due_date, return_date).
+    """
+    with connection_pool.lease() as connection:
+        cursor = connection.cursor()
+        cursor.executemany(
+            "INSERT INTO loans (book_id, user_id, loan_date, due_date, return_date) VALUES (%s, %s, %s, %s, %s)",
+            [(book_id, user_id) + loan for loan in loans],
+        )
+        connection.commit()
+
+
+def loan_ids(connection_pool, table_name):
+    with connection_pool.lease() as connection:
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT loan_id FROM {table_name} ORDER BY loan_id")
+        return [row[0] for row in cursor.fetchall()]
+
+
+def test_archiving_before_fines_keeps_unassessed_late_returns(connection_pool):
+    book_id, (user_id,) = add_book(connection_pool, copies=1, borrowers=1)
+    add_returned_loans(connection_pool, book_id, user_id, [
+        ('2020-01-01 10:00:00', '2020-01-15 10:00:00', '2020-01-10 10:00:00'),  # on time
+        ('2020-02-01 10:00:00', '2020-02-15 10:00:00', '2020-02-29 10:00:00'),  # 14 days late
+    ])
+    archive = ArchiveLoansUseCase(LoanRepository(connection_pool), min_age_days=365, pause_seconds=0)
+    fines = AssessFinesUseCase(FineRepository(connection_pool), daily_rate_cents=10)
+
+    assert archive.execute(now=datetime(2024, 6, 1)) == 1
+    assert loan_ids(connection_pool, 'loans') == [2]
+
+    run = fines.execute(as_of=date(2024, 6, 1))
+    assert (run['entries_written'], run['amount_cents']) == (1, 140)
+
+    # Assessed and settled, the late return can now be archived too
+    assert archive.execute(now=datetime(2024, 6, 1)) == 1
+    assert loan_ids(connection_pool, 'loans_archive') == [1, 2]
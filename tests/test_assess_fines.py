@@ -0,0 +1,55 @@
+from datetime import date
+
+from helpers import add_book
+from interface_adapters.repositories.fine_repository import FineRepository
+from use_cases.assess_fines_use_case import AssessFinesUseCase
+
+
+def add_open_loans(connection_pool, book_id, user_ids, due_date):
+    with connection_pool.lease() as connection:
+        cursor = connection.cursor()
+        cursor.executemany("INSERT INTO loans (book_id, user_id, loan_date, due_date) VALUES (%s, %s, %s, %s)",
+                           [(book_id, user_id, '2023-12-01 10:00:00', due_date) for user_id in user_ids])
+        connection.commit()
+
+
+def return_loan(connection_pool, loan_id, return_date):
+    with connection_pool.lease() as connection:
+        cursor = connection.cursor()
+        cursor.execute("UPDATE loans SET return_date = %s WHERE loan_id = %s", (return_date, loan_id))
+        connection.commit()
+
+
+def test_fines_runs_read_candidates_in_chunks_and_charge_only_changes(connection_pool):
+    book_id, user_ids = add_book(connection_pool, copies=5, borrowers=5)
+    add_open_loans(connection_pool, book_id, user_ids, '2024-01-01 10:00:00')
+    fine_repository = FineRepository(connection_pool)
+    chunks = []
+    iter_candidate_loans = fine_repository.iter_candidate_loans
+
+    def read_chunks(*args):
+        for loans in iter_candidate_loans(*args):
+            chunks.append([loan[0] for loan in loans])
+            yield loans
+
+    fine_repository.iter_candidate_loans = read_chunks
+    fines = AssessFinesUseCase(fine_repository, daily_rate_cents=25)
+
+    run = fines.execute(as_of=date(2024, 1, 11), batch_size=2)
+    assert chunks == [[1, 2], [3, 4], [5]]
+    assert (run['loans_assessed'], run['entries_written'], run['amount_cents']) == (5, 5, 5 * 250)
+
+    # The same day again: every open loan is still a candidate, but no fine changed
+    run = fines.execute(as_of=date(2024, 1, 11), batch_size=2)
+    assert (run['loans_assessed'], run['entries_written'], run['amount_cents']) == (5, 0, 0)
+
+    # Loan 1 was returned after 12 days, the others are 19 days late
+    return_loan(connection_pool, 1, '2024-01-13 09:00:00')
+    run = fines.execute(as_of=date(2024, 1, 20), batch_size=2)
+    assert (run['loans_assessed'], run['entries_written'], run['amount_cents']) == (5, 5, 50 + 4 * 225)
+
+    # Loan 1's fine is settled, so later runs no longer read it
+    chunks.clear()
+    run = fines.execute(as_of=date(2024, 1, 21), batch_size=2)
+    assert chunks == [[2, 3], [4, 5]]
+    assert (run['loans_assessed'], run['entries_written'], run['amount_cents']) == (4, 4, 4 * 25)
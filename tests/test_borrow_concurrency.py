@@ -0,0 +1,28 @@
+from helpers import add_book, copies_out, run_concurrently
+from interface_adapters.repositories.book_repository import BookRepository
+from interface_adapters.repositories.copy_availability import CopyAvailability
+from interface_adapters.repositories.copy_repository import CopyRepository
+from interface_adapters.repositories.loan_repository import LoanRepository
+from use_cases.borrow_book_use_case import BorrowBookUseCase
+
+BORROWERS = 16
+
+
+def test_concurrent_borrowers_of_the_last_copy_get_it_exactly_once(connection_pool):
+    book_id, user_ids = add_book(connection_pool, copies=1, borrowers=BORROWERS)
+    copy_repository = CopyRepository(connection_pool, CopyAvailability())
+    copy_repository.load_availability()
+    use_case = BorrowBookUseCase(BookRepository(connection_pool), LoanRepository(connection_pool), copy_repository)
+
+    outcomes = run_concurrently(
+        BORROWERS, lambda index: use_case.execute_batch([book_id], user_ids[index], '2024-01-01', '2024-01-15'))
+
+    failures = [outcome for outcome in outcomes if outcome is not None]
+    assert len(outcomes) == BORROWERS
+    assert len(failures) == BORROWERS - 1
+    assert all(failure == f"Books already on loan: {book_id}." for failure in failures)
+    assert copies_out(connection_pool, book_id) == 1
+    with connection_pool.lease() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM loans WHERE book_id = %s AND return_date IS NULL", (book_id,))
+        assert cursor.fetchone()[0] == 1
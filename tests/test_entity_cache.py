@@ -0,0 +1,48 @@
+import threading
+
+from helpers import add_book
+from interface_adapters.repositories.book_repository import BookRepository
+from interface_adapters.repositories.entity_cache import EntityCache
+
+
+def test_fill_is_dropped_after_a_write_or_evict_since_the_reserve():
+    cache = EntityCache()
+
+    token = cache.reserve(1)
+    cache.put(1, 'written')
+    assert not cache.fill(1, 'read before the write', token)
+    assert cache.get(1) == 'written'
+
+    token = cache.reserve(1)
+    cache.evict(1)
+    assert not cache.fill(1, 'read before the delete', token)
+    assert cache.get(1) is None
+
+    token = cache.reserve(1)
+    assert cache.fill(1, 'read', token)
+    assert cache.get(1) == 'read'
+
+
+def test_lookup_racing_an_update_does_not_cache_the_old_row(connection_pool):
+    book_id, _ = add_book(connection_pool, copies=1, borrowers=0)
+    cache = EntityCache()
+    books = BookRepository(connection_pool, cache)
+    read_done, updated = threading.Event(), threading.Event()
+    fill = cache.fill
+
+    def fill_after_update(key, value, token):
+        # Holds the lookup between its read and its cache fill until the update has committed
+        read_done.set()
+        updated.wait()
+        return fill(key, value, token)
+
+    cache.fill = fill_after_update
+    lookup = threading.Thread(target=books.get_books_by_id, args=('book_id', book_id))
+    lookup.start()
+    read_done.wait()
+    books.update_book(book_id, 'New Title', 'Some Author', None, None, None)
+    updated.set()
+    lookup.join()
+
+    assert cache.get(book_id)['content'][1] == 'New Title'
+    assert books.get_books_by_id('book_id', book_id)['content'][1] == 'New Title'
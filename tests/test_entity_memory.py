@@ -0,0 +1,14 @@
+import pytest
+
+from benchmarks.entity_memory import run
+
+
+@pytest.mark.slow
+def test_slotted_entities_hold_a_million_rows_in_under_half_the_memory_of_dicts():
+    results = run(1000000)
+
+    dicts, _ = results['dicts']
+    unslotted, _ = results['unslotted entities']
+    slotted, _ = results['slotted entities']
+    assert slotted < dicts / 2
+    assert slotted < unslotted
@@ -0,0 +1,65 @@
+from datetime import date
+
+from frameworks_and_drivers.database.partitioning import maintain_loan_partitions
+from helpers import add_book
+
+
+def shard_loan_ids(cursor, partition_name):
+    cursor.execute(f"SELECT loan_id FROM loans_{partition_name} ORDER BY loan_id")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def add_loan(cursor, book_id, user_id, loan_date):
+    cursor.execute("INSERT INTO loans (book_id, user_id, loan_date, due_date) VALUES (%s, %s, %s, %s)",
+                   (book_id, user_id, loan_date, loan_date))
+    cursor.execute("SELECT MAX(loan_id) FROM loans")
+    return cursor.fetchone()[0]
+
+
+def test_sharded_loans_view_routes_writes_and_keeps_ids_unique(connection_pool):
+    book_id, (user_id,) = add_book(connection_pool, copies=1, borrowers=1)
+    this_year = date.today().year
+    with connection_pool.lease() as connection:
+        cursor = connection.cursor()
+        for loan_date in ('2022-03-01 10:00:00', '2023-03-01 10:00:00', '2023-07-01 10:00:00'):
+            add_loan(cursor, book_id, user_id, loan_date)
+        connection.commit()
+        # The loan with the highest ID is deleted before sharding; its ID must not be handed out again
+        cursor.execute("DELETE FROM loans WHERE loan_id = 3")
+        connection.commit()
+
+        created = maintain_loan_partitions(connection, connection_pool.driver, future_partitions=0)
+        assert [name for name, _ in created] == [f"p{year}" for year in range(2022, this_year + 1)] + ['p_future']
+        assert shard_loan_ids(cursor, 'p2022') == [1]
+        assert shard_loan_ids(cursor, 'p2023') == [2]
+
+        # Inserts through the view take the next ID from loan_sequence and land in their year's shard
+        assert add_loan(cursor, book_id, user_id, '2022-12-31 23:59:59') == 4
+        assert add_loan(cursor, book_id, user_id, f"{this_year + 1}-01-02 10:00:00") == 5
+        connection.commit()
+        assert shard_loan_ids(cursor, 'p2022') == [1, 4]
+        assert shard_loan_ids(cursor, 'p_future') == [5]
+
+        # An update stays in place unless the new loan_date belongs to another shard. The guarded returns
+        # and deletes rely on rowcount counting the loans they changed.
+        for expected in (1, 0):
+            cursor.execute("UPDATE loans SET return_date = %s WHERE loan_id = 1 AND return_date IS NULL",
+                           ('2022-03-10 10:00:00',))
+            assert cursor.rowcount == expected
+        cursor.execute("UPDATE loans SET loan_date = %s WHERE loan_id = 4", ('2023-01-01 00:00:00',))
+        cursor.execute("DELETE FROM loans WHERE loan_id = 2 AND return_date IS NULL")
+        assert cursor.rowcount == 1
+        connection.commit()
+        assert shard_loan_ids(cursor, 'p2022') == [1]
+        assert shard_loan_ids(cursor, 'p2023') == [4]
+        cursor.execute("SELECT loan_id, return_date FROM loans ORDER BY loan_id")
+        assert cursor.fetchall() == [(1, '2022-03-10 10:00:00'), (4, None), (5, None)]
+
+        # Extending the partitions moves next year's loans out of the unbounded shard
+        created = maintain_loan_partitions(connection, connection_pool.driver, future_partitions=1)
+        assert created == [(f"p{this_year + 1}", f"{this_year + 2}-01-01")]
+        assert shard_loan_ids(cursor, f"p{this_year + 1}") == [5]
+        assert shard_loan_ids(cursor, 'p_future') == []
+        assert add_loan(cursor, book_id, user_id, f"{this_year + 1}-06-01 10:00:00") == 6
+        connection.commit()
+        assert shard_loan_ids(cursor, f"p{this_year + 1}") == [5, 6]
@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+from frameworks_and_drivers.database import migrations
+from frameworks_and_drivers.database.drivers import SQLiteDriver
+from frameworks_and_drivers.database.migrations import current_version, migrate
+
+
+@pytest.fixture
+def connection(tmp_path):
+    """
+    A connection to a SQLite database at schema version 3, holding two books: one on loan twice, and
+    one on the shelf.
+    """
+    driver = SQLiteDriver()
+    conn = driver.connect({'database': str(tmp_path / 'library.db')})
+    migrate_to(conn, driver, 3)
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO books (book_id, title, author) VALUES (%s, %s, %s)",
+                       [(1, 'Lent Book', 'Some Author'), (2, 'Shelved Book', 'Some Author')])
+    cursor.executemany("INSERT INTO users (user_id, name, email, role) VALUES (%s, %s, %s, %s)",
+                       [(1, 'First', 'first@example.com', 'member'), (2, 'Second', 'second@example.com', 'member')])
+    cursor.executemany("INSERT INTO loans (book_id, user_id, loan_date, due_date) VALUES (%s, %s, %s, %s)",
+                       [(1, 1, '2024-01-01', '2024-01-15'), (1, 2, '2024-01-02', '2024-01-16')])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def migrate_to(conn, driver, version):
+    applied = migrations.MIGRATIONS
+    migrations.MIGRATIONS = [migration for migration in applied if migration.version <= version]
+    try:
+        migrate(conn, driver)
+    finally:
+        migrations.MIGRATIONS = applied
+
+
+def test_copies_migration_resumes_after_failing_part_way(connection, monkeypatch):
+    driver = SQLiteDriver()
+
+    def fail(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    # Fails after the copy_id column, the indexes and the copies have been committed
+    monkeypatch.setattr(migrations, 'backfill', fail)
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(connection, driver)
+    assert current_version(connection) == 4
+
+    monkeypatch.undo()
+    migrate(connection, driver)
+
+    assert current_version(connection) == migrations.MIGRATIONS[-1].version
+    cursor = connection.cursor()
+    cursor.execute("SELECT book_id, barcode FROM copies ORDER BY copy_id")
+    assert cursor.fetchall() == [(1, 'B00000001-001'), (1, 'B00000001-002'), (2, 'B00000002-001')]
+    cursor.execute("SELECT loan_id, copy_id FROM loans ORDER BY loan_id")
+    assert cursor.fetchall() == [(1, 1), (2, 2)]
+    cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE name IN ('copy_numbers', 'copy_assignments')")
+    assert cursor.fetchone()[0] == 0
@@ -0,0 +1,71 @@
+from helpers import add_book, copies_out, run_concurrently
+from interface_adapters.repositories.book_repository import BookRepository
+from interface_adapters.repositories.copy_availability import CopyAvailability
+from interface_adapters.repositories.copy_repository import CopyRepository
+from interface_adapters.repositories.entity_cache import EntityCache
+from interface_adapters.repositories.loan_repository import LoanRepository
+from use_cases.borrow_book_use_case import BorrowBookUseCase
+from use_cases.delete_loan_use_case import DeleteLoanUseCase
+from use_cases.return_book_use_case import ReturnBookUseCase
+
+COPIES = 3
+THREADS = 8
+
+
+class Instance:
+    """
+    The repositories of one running application, e.g. the CLI or the Streamlit server, each of which has
+    its own cache and copy bitmap over the shared database.
+    """
+
+    def __init__(self, connection_pool):
+        self.loan_repository = LoanRepository(connection_pool, EntityCache())
+        self.book_repository = BookRepository(connection_pool)
+        self.copy_repository = CopyRepository(connection_pool, CopyAvailability())
+        self.copy_repository.load_availability()
+
+
+def lend_every_copy(connection_pool):
+    """
+    Lends every copy of a new book, then starts two instances that have both cached the loans as open.
+
+    Returns:
+        tuple: The book_id, the loan_ids and the two instances.
+    """
+    book_id, user_ids = add_book(connection_pool, copies=COPIES, borrowers=COPIES)
+    lender = Instance(connection_pool)
+    borrow_book_use_case = BorrowBookUseCase(lender.book_repository, lender.loan_repository, lender.copy_repository)
+    for user_id in user_ids:
+        borrow_book_use_case.execute(book_id, user_id, '2024-01-01', '2024-01-15')
+    with connection_pool.lease() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT loan_id FROM loans WHERE book_id = %s ORDER BY loan_id", (book_id,))
+        loan_ids = [row[0] for row in cursor.fetchall()]
+
+    instances = [Instance(connection_pool), Instance(connection_pool)]
+    for instance in instances:
+        for loan_id in loan_ids:
+            instance.loan_repository.get_loans_by_id('loan_id', loan_id)
+    return book_id, loan_ids, instances
+
+
+def test_concurrent_returns_of_one_loan_put_its_copy_back_once(connection_pool):
+    book_id, loan_ids, instances = lend_every_copy(connection_pool)
+    use_cases = [ReturnBookUseCase(instance.loan_repository, instance.book_repository, instance.copy_repository)
+                 for instance in instances]
+
+    outcomes = run_concurrently(THREADS, lambda index: use_cases[index % 2].execute(loan_ids[0], '2024-01-10'))
+
+    assert outcomes.count(None) == THREADS
+    assert copies_out(connection_pool, book_id) == COPIES - 1
+
+
+def test_concurrent_deletes_of_an_open_loan_put_its_copy_back_once(connection_pool):
+    book_id, loan_ids, instances = lend_every_copy(connection_pool)
+    use_cases = [DeleteLoanUseCase(instance.loan_repository, instance.book_repository, instance.copy_repository)
+                 for instance in instances]
+
+    outcomes = run_concurrently(THREADS, lambda index: use_cases[index % 2].execute(loan_ids[0]))
+
+    assert outcomes.count(None) == THREADS
+    assert copies_out(connection_pool, book_id) == COPIES - 1
@@ -0,0 +1,15 @@
+from frameworks_and_drivers.database.drivers import SQLiteDriver
+
+
+def test_placeholders_inside_string_literals_are_left_alone(tmp_path):
+    conn = SQLiteDriver().connect({'database': str(tmp_path / 'library.db')})
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE notes (body VARCHAR(64))")
+    cursor.executemany("INSERT INTO notes (body) VALUES (%s)", [('100%s',), ('%s off',), ('plain',)])
+
+    cursor.execute("SELECT body FROM notes WHERE body LIKE '%s off' OR body = %s ORDER BY body", ('plain',))
+    assert cursor.fetchall() == [('%s off',), ('plain',)]
+
+    cursor.execute("SELECT 'it''s %s', %s", ('bound',))
+    assert cursor.fetchone() == ("it's %s", 'bound')
+    conn.close()
@@ -0,0 +1,26 @@
+import sqlite3
+
+import pytest
+
+from frameworks_and_drivers.database.drivers import SQLiteCursor
+from helpers import add_book
+from interface_adapters.repositories.book_repository import BookRepository
+
+
+def test_stream_raises_when_reading_fails_part_way(connection_pool, monkeypatch):
+    for _ in range(3):
+        add_book(connection_pool, copies=1, borrowers=0)
+    fetches = []
+
+    def fetchmany(self, size):
+        fetches.append(size)
+        if len(fetches) > 1:
+            raise sqlite3.OperationalError("disk I/O error")
+        return self._cursor.fetchmany(size)
+
+    monkeypatch.setattr(SQLiteCursor, 'fetchmany', fetchmany, raising=False)
+    books = BookRepository(connection_pool).iter_books(chunk_size=2)
+
+    assert [book[0] for book in [next(books), next(books)]] == [1, 2]
+    with pytest.raises(sqlite3.OperationalError):
+        next(books)
@@ -1,15 +1,24 @@
+import csv
+from datetime import date
 import sys
 from tabulate import tabulate
 # Importing database connection and controllers for handling business logic
-from frameworks_and_drivers.database.database_connector import create_db_connection
+from frameworks_and_drivers.database.database_connector import create_connection_pool
+from frameworks_and_drivers.settings import create_entity_cache, load_archive_policy, load_fine_policy
 from interface_adapters.controllers.book_controller import BookController
 from interface_adapters.controllers.user_controller import UserController
 from interface_adapters.controllers.loan_controller import LoanController
 from interface_adapters.repositories.book_repository import BookRepository
 from interface_adapters.repositories.user_repository import UserRepository
 from interface_adapters.repositories.loan_repository import LoanRepository
+from interface_adapters.repositories.copy_repository import CopyRepository
+from interface_adapters.repositories.copy_availability import CopyAvailability
+from interface_adapters.repositories.fuzzy_index import FuzzyIndex
+from interface_adapters.repositories.fine_repository import FineRepository
 # Importing use cases which contain the application's business rules
 from use_cases.add_new_book_use_case import AddNewBookUseCase
+from use_cases.add_book_copies_use_case import AddBookCopiesUseCase
+from use_cases.bulk_import_books_use_case import BulkImportBooksUseCase
 from use_cases.update_book_info_use_case import UpdateBookInfoUseCase
 from use_cases.user_registration_use_case import UserRegistrationUseCase
 from use_cases.update_user_info_use_case import UpdateUserInfoUseCase
@@ -19,29 +28,45 @@ from use_cases.delete_user_use_case import DeleteUserUseCase
 from use_cases.delete_book_use_case import DeleteBookUseCase
 from use_cases.delete_loan_use_case import DeleteLoanUseCase
 from use_cases.search_loan_use_case import SearchLoanUseCase
+from use_cases.list_overdue_loans_use_case import ListOverdueLoansUseCase
+from use_cases.assess_fines_use_case import AssessFinesUseCase
+from use_cases.archive_loans_use_case import ArchiveLoansUseCase
+from use_cases.loan_activity_report_use_case import LoanActivityReportUseCase
 from use_cases.search_book_use_case import SearchBookUseCase
 from use_cases.search_user_use_case import SearchUserUseCase
 from use_cases.show_database_tables_use_case import ShowDatabaseTablesUseCase
 
-# Establishing a connection to the database
-db_connection = create_db_connection()
+# Establishing a pool of connections to the database
+db_connection_pool = create_connection_pool()
 
-# Initializing repositories with the database connection
-book_repository = BookRepository(db_connection)
-user_repository = UserRepository(db_connection)
-loan_repository = LoanRepository(db_connection)
+# Initializing repositories with the connection pool and, if enabled in config.py, a primary-key cache
+book_repository = BookRepository(db_connection_pool, create_entity_cache())
+# The trigram index behind approximate user search is built from the database once, then kept current by writes
+user_repository = UserRepository(db_connection_pool, create_entity_cache(),
+                                 fuzzy=FuzzyIndex(UserRepository.fuzzy_fields))
+user_repository.load_fuzzy_index()
+loan_repository = LoanRepository(db_connection_pool, create_entity_cache())
+# The bitmap of free copies is built from the database once, then kept current by borrows and returns
+copy_repository = CopyRepository(db_connection_pool, CopyAvailability())
+copy_repository.load_availability()
 
 # Initializing use cases with their respective repositories
 add_book_use_case = AddNewBookUseCase(book_repository)
+bulk_import_books_use_case = BulkImportBooksUseCase(book_repository)
+add_book_copies_use_case = AddBookCopiesUseCase(copy_repository)
 update_book_info_use_case = UpdateBookInfoUseCase(book_repository)
 user_registration_use_case = UserRegistrationUseCase(user_repository)
 update_user_info_use_case = UpdateUserInfoUseCase(user_repository)
-borrow_book_use_case = BorrowBookUseCase(book_repository, loan_repository)
-return_book_use_case = ReturnBookUseCase(loan_repository)
+borrow_book_use_case = BorrowBookUseCase(book_repository, loan_repository, copy_repository)
+return_book_use_case = ReturnBookUseCase(loan_repository, book_repository, copy_repository)
 delete_book_use_case = DeleteBookUseCase(book_repository, loan_repository)
 delete_user_use_case = DeleteUserUseCase(user_repository, loan_repository)
-delete_loan_use_case = DeleteLoanUseCase(loan_repository)
+delete_loan_use_case = DeleteLoanUseCase(loan_repository, book_repository, copy_repository)
 search_loan_use_case = SearchLoanUseCase(loan_repository)
+list_overdue_loans_use_case = ListOverdueLoansUseCase(loan_repository)
+assess_fines_use_case = AssessFinesUseCase(FineRepository(db_connection_pool), **load_fine_policy())
+archive_loans_use_case = ArchiveLoansUseCase(loan_repository, **load_archive_policy())
+loan_activity_report_use_case = LoanActivityReportUseCase(loan_repository)
 search_user_use_case = SearchUserUseCase(user_repository)
 search_book_use_case = SearchBookUseCase(book_repository)
 show_books_table_use_case = ShowDatabaseTablesUseCase(book_repository)
@@ -50,11 +75,16 @@ show_loans_table_use_case = ShowDatabaseTablesUseCase(loan_repository)
 
 # Initializing controllers with the respective use cases
 book_controller = BookController(add_book_use_case, update_book_info_use_case, delete_book_use_case,
-                                 search_book_use_case, show_books_table_use_case)
+                                 search_book_use_case, show_books_table_use_case, bulk_import_books_use_case,
+                                 add_book_copies_use_case)
 user_controller = UserController(user_registration_use_case, update_user_info_use_case, delete_user_use_case,
                                  search_user_use_case, show_users_table_use_case)
 loan_controller = LoanController(borrow_book_use_case, return_book_use_case, delete_loan_use_case, search_loan_use_case,
-                                 show_loans_table_use_case)
+                                 show_loans_table_use_case, list_overdue_loans_use_case,
+                                 assess_fines_use_case, archive_loans_use_case, loan_activity_report_use_case)
+
+# Number of rows shown at a time when viewing database tables
+PAGE_SIZE = 20
 
 
 def display_table_data(data, headers):
@@ -63,19 +93,56 @@ def display_table_data(data, headers):
 
 
 def fetch_and_display_table_data(table_name):
-    """Fetch data from a specific table and display it."""
+    """Fetch data from a specific table one page at a time and display it."""
     if table_name == 'books':
-        data = book_controller.get_books(fetchone=False)
+        get_page = book_controller.get_books_page
     elif table_name == 'users':
-        data = user_controller.get_users(fetchone=False)
+        get_page = user_controller.get_users_page
     elif table_name == 'loans':
-        data = loan_controller.get_loans(fetchone=False)
+        get_page = loan_controller.get_loans_page
     else:
         raise Exception("Error: Couldn't retrieve table. 'table_name' not entered correctly.")
-    headers = data['headers']  # This fetches the column headers
-    content = data['content']  # This fetches the content of the table
     print(f"\n{table_name.title()} Data:")
-    display_table_data(content, headers)
+    after = None
+    while True:
+        data = get_page(PAGE_SIZE, after)
+        headers = data['headers']  # This fetches the column headers
+        content = data['content']  # This fetches the content of the page
+        display_table_data(content, headers)
+        after = data['next_cursor']
+        if after is None or input("Press Enter for the next page or 'q' to stop: ").strip().lower() == 'q':
+            break
+
+
+def export_table_to_csv():
+    """
+    Prompt the user for a table and a file name and write the whole table to a CSV file.
+
+    Rows are streamed from the database and written as they arrive, so memory use does not grow with
+    the size of the table.
+    """
+    table_name = input("Enter table to export ('books', 'users' or 'loans'): ").strip().lower()
+    if table_name == 'books':
+        headers = book_controller.get_books_page(0)['headers']
+        rows = book_controller.iter_books()
+    elif table_name == 'users':
+        headers = user_controller.get_users_page(0)['headers']
+        rows = user_controller.iter_users()
+    elif table_name == 'loans':
+        headers = loan_controller.get_loans_page(0)['headers']
+        rows = loan_controller.iter_loans()
+    else:
+        print('Invalid Choice! Please Try again!')
+        return
+    file_path = input("Enter CSV file name: ")
+    count = 0
+    with open(file_path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    print(f"Exported {count} {table_name} to {file_path}.")
 
 
 # Functionality to add, update, register, borrow, and return books along with viewing database tables
@@ -89,6 +156,88 @@ def add_book():
     print(book_controller.add_book(title, author, isbn, publication_year, genre))
 
 
+def bulk_import_books():
+    """
+    Prompt the user for a CSV or JSON Lines file and import the books it lists.
+    """
+    file_path = input("Enter path of the .csv or .jsonl file to import: ")
+    batch_size = int(input("Enter batch size (e.g., 1000): ") or 1000)
+    report = book_controller.bulk_import_books(file_path, batch_size)
+    if isinstance(report, str):
+        print(report)
+        return
+    print(f"Inserted {report['inserted']} books in {report['seconds']:.1f}s "
+          f"({report['rows_per_second']:.0f} rows/s); skipped {report['skipped']} already imported, "
+          f"rejected {len(report['rejected'])}.")
+    if report['rejected']:
+        display_table_data(report['rejected'][:50], headers=['Record', 'Reason'])
+    if 'error' in report:
+        print(f"The import stopped early: {report['error']}. Run it again to resume.")
+
+
+def add_copies():
+    """
+    Prompt the user for a book ID and the barcodes, or number, of the copies to add.
+    """
+    book_id = int(input("Enter book ID: "))
+    barcodes = input("Enter barcodes, comma-separated (leave empty to generate them): ").strip()
+    if barcodes:
+        print(book_controller.add_copies(book_id, barcodes=barcodes.split(',')))
+    else:
+        count = int(input("Enter number of copies to add: "))
+        print(book_controller.add_copies(book_id, count))
+
+
+def overdue_loans_report():
+    """
+    Show the overdue loans, most overdue first, or write all of them to a CSV file.
+
+    The loans are streamed from the database and written as they arrive, so the report can be run
+    unattended, e.g. nightly, however many loans are overdue.
+    """
+    file_path = input("Enter CSV file name (leave empty to show the first page on screen): ").strip()
+    if not file_path:
+        loans = loan_controller.get_overdue_loans(limit=PAGE_SIZE)
+        display_table_data(loans['content'], loans['headers'])
+        return
+    count = 0
+    with open(file_path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(loan_repository.overdue_headers)
+        for row in loan_controller.iter_overdue_loans():
+            writer.writerow(row)
+            count += 1
+    print(f"Exported {count} overdue loans to {file_path}.")
+
+
+def assess_fines():
+    """
+    Charge late fees up to today, then show the users with the highest fines.
+    """
+    report = loan_controller.assess_fines()
+    if isinstance(report, str):
+        print(report)
+        return
+    print(f"{report['loans_assessed']} loans assessed as of {report['as_of']}: {report['entries_written']} "
+          f"fines recorded, {report['amount_cents'] / 100:.2f} charged in total.")
+    fines = loan_controller.get_fines_by_user(limit=PAGE_SIZE)
+    display_table_data(fines['content'], fines['headers'])
+
+
+def loan_activity_report():
+    """
+    Show, month by month, the loans made in a year.
+    """
+    year = input(f"Enter year (leave empty for {date.today().year}): ").strip()
+    start = date(int(year), 1, 1) if year else None
+    activity = loan_controller.get_loan_activity(start)
+    if isinstance(activity, str):
+        print(activity)
+        return
+    print(f"Loans made from {activity['start']} to {activity['end']}:")
+    display_table_data(activity['content'], activity['headers'])
+
+
 def update_book_info():
     book_id = int(input("Enter book ID: "))
     title = input("Enter new book title: ")
@@ -106,26 +255,52 @@ def register_user():
     print(user_controller.register_user(name, email, role))
 
 
+def bulk_register_users():
+    """
+    Prompt the user for a CSV file with name, email and role columns and register its users.
+    """
+    file_path = input("Enter path of the .csv file to import: ")
+    with open(file_path, newline='', encoding='utf-8') as file:
+        outcomes = user_controller.register_users_bulk(csv.DictReader(file))
+    if isinstance(outcomes, str):
+        print(outcomes)
+        return
+    registered = sum(outcome == 'registered' for _, _, outcome in outcomes)
+    print(f"Registered {registered} of {len(outcomes)} users.")
+    not_registered = [row for row in outcomes if row[2] != 'registered']
+    if not_registered:
+        display_table_data(not_registered[:50], headers=['Row', 'Email', 'Outcome'])
+
+
 def borrow_book():
-    book_id = int(input("Enter book ID: "))
+    book_ids = [int(book_id) for book_id in input("Enter book ID(s), comma-separated: ").split(',')]
     user_id = int(input("Enter user ID: "))
     loan_date = input("Enter loan date (YYYY-MM-DD): ")
     due_date = input("Enter due date (YYYY-MM-DD): ")
-    print(loan_controller.borrow_book(book_id, user_id, loan_date, due_date))
+    if len(book_ids) == 1:
+        print(loan_controller.borrow_book(book_ids[0], user_id, loan_date, due_date))
+    else:
+        print(loan_controller.borrow_books(book_ids, user_id, loan_date, due_date))
 
 
 def return_book():
-    loan_id = int(input("Enter loan ID: "))
+    loan_ids = [int(loan_id) for loan_id in input("Enter loan ID(s), comma-separated: ").split(',')]
     return_date = input("Enter return date (YYYY-MM-DD): ")
-    print(loan_controller.return_book(loan_id, return_date))
+    if len(loan_ids) == 1:
+        print(loan_controller.return_book(loan_ids[0], return_date))
+    else:
+        print(loan_controller.return_books(loan_ids, return_date))
 
 
 def delete_user():
     """
-    Prompt the user for the user ID and delete the specified user.
+    Prompt the user for the user ID(s) and delete the specified user(s).
     """
-    user_id = int(input("Enter user ID to delete: "))
-    print(user_controller.delete_user(user_id))
+    user_ids = [int(user_id) for user_id in input("Enter user ID(s) to delete, comma-separated: ").split(',')]
+    if len(user_ids) == 1:
+        print(user_controller.delete_user(user_ids[0]))
+    else:
+        print(user_controller.delete_users(user_ids))
 
 
 def delete_loan():
@@ -138,19 +313,23 @@ def delete_loan():
 
 def delete_book():
     """
-    Prompt the user for the book ID and delete the specified book.
+    Prompt the user for the book ID(s) and delete the specified book(s).
     """
-    book_id = int(input("Enter book ID to delete: "))
-    print(book_controller.delete_book(book_id))
+    book_ids = [int(book_id) for book_id in input("Enter book ID(s) to delete, comma-separated: ").split(',')]
+    if len(book_ids) == 1:
+        print(book_controller.delete_book(book_ids[0]))
+    else:
+        print(book_controller.delete_books(book_ids))
 
 
 def search_book():
     """
-    Prompt the user for the book ID or book Title and search the specified book.
+    Prompt the user for the book ID, book Title or keywords and search the specified book(s).
     """
     print('Search book with: ')
     print('1. Book ID')
     print('2. Book Title')
+    print('3. Keywords from title, author or genre')
     choice = input("Enter your choice: ")
     if choice == '1':
         book_id = int(input("Enter book ID to search: "))
@@ -158,6 +337,9 @@ def search_book():
     elif choice == '2':
         book_title = input("Enter book Title to search: ")
         book = book_controller.search_book('title', book_title, fetchone=False)
+    elif choice == '3':
+        keywords = input("Enter keywords to search: ")
+        book = book_controller.search_books_fulltext(keywords, limit=20)
     else:
         print('Invalid Choice! Please Try again!')
         return
@@ -173,6 +355,7 @@ def search_user():
     print('Search user with: ')
     print('1. User ID')
     print('2. User Name')
+    print('3. Name or email, allowing for typos')
     choice = input("Enter your choice: ")
     if choice == '1':
         user_id = int(input("Enter user ID to search: "))
@@ -180,6 +363,9 @@ def search_user():
     elif choice == '2':
         user_name = input("Enter user Name to search: ")
         user = user_controller.search_user('name', user_name, fetchone=False)
+    elif choice == '3':
+        text = input("Enter name or email to search: ")
+        user = user_controller.search_users_fuzzy(text, limit=10)
     else:
         print('Invalid Choice! Please Try again!')
         return
@@ -197,15 +383,19 @@ def search_loan():
     print('2. User ID')
     print('3. Book ID')
     choice = input("Enter your choice: ")
+    if choice not in ('1', '2', '3'):
+        print('Invalid Choice! Please Try again!')
+        return
+    include_archive = input("Include archived loans? (y/N): ").strip().lower() == 'y'
     if choice == '1':
         loan_id = int(input("Enter loan ID to search: "))
-        loan = loan_controller.search_loan('loan_id', loan_id, fetchone=False)
+        loan = loan_controller.search_loan('loan_id', loan_id, fetchone=False, include_archive=include_archive)
     elif choice == '2':
         user_id = int(input("Enter user ID to search: "))
-        loan = loan_controller.search_loan('user_id', user_id, fetchone=False)
+        loan = loan_controller.search_loan('user_id', user_id, fetchone=False, include_archive=include_archive)
     elif choice == '3':
         book_id = int(input("Enter book ID to search: "))
-        loan = loan_controller.search_loan('book_id', book_id, fetchone=False)
+        loan = loan_controller.search_loan('book_id', book_id, fetchone=False, include_archive=include_archive)
     else:
         print('Invalid Choice! Please Try again!')
         return
@@ -214,6 +404,18 @@ def search_loan():
     display_table_data(content, headers)
 
 
+def show_pool_stats():
+    """
+    Display the connection pool's and the repository caches' usage statistics.
+    """
+    stats = db_connection_pool.stats()
+    display_table_data(list(stats.items()), headers=['Statistic', 'Value'])
+    for name, repository in [('Books', book_repository), ('Users', user_repository), ('Loans', loan_repository)]:
+        if repository.cache is not None:
+            print(f"\n{name} Cache:")
+            display_table_data(list(repository.cache.stats().items()), headers=['Statistic', 'Value'])
+
+
 def main():
     """The main loop of the CLI, presenting the user with different actions to choose from."""
 
@@ -231,6 +433,15 @@ def main():
         print("10. Search User")
         print("11. Search Loan")
         print("12. Search Book")
+        print("13. Connection Pool and Cache Stats")
+        print("14. Export Table to CSV")
+        print("15. Bulk Import Books")
+        print("16. Bulk Register Users")
+        print("17. Add Book Copies")
+        print("18. Overdue Loans Report")
+        print("19. Assess Late Fines")
+        print("20. Archive Old Loans")
+        print("21. Loan Activity Report")
         print("0. Exit")
         choice = input("Enter choice: ")
 
@@ -262,6 +473,24 @@ def main():
                 search_loan()
             elif choice == "12":
                 search_book()
+            elif choice == "13":
+                show_pool_stats()
+            elif choice == "14":
+                export_table_to_csv()
+            elif choice == "15":
+                bulk_import_books()
+            elif choice == "16":
+                bulk_register_users()
+            elif choice == "17":
+                add_copies()
+            elif choice == "18":
+                overdue_loans_report()
+            elif choice == "19":
+                assess_fines()
+            elif choice == "20":
+                print(loan_controller.archive_loans())
+            elif choice == "21":
+                loan_activity_report()
             elif choice == "0":
                 # Exiting the system
                 print("Exiting the system.")
@@ -1,15 +1,27 @@
 import sys
+import threading
+from datetime import date
+import pandas as pd
+import pyarrow as pa
 import streamlit as st
 # Importing database connection and controllers for handling business logic
-from frameworks_and_drivers.database.database_connector import create_db_connection
+from frameworks_and_drivers.database.database_connector import create_connection_pool, run_migrations
+from frameworks_and_drivers.settings import create_entity_cache, load_archive_policy, load_fine_policy
 from interface_adapters.controllers.book_controller import BookController
 from interface_adapters.controllers.user_controller import UserController
 from interface_adapters.controllers.loan_controller import LoanController
 from interface_adapters.repositories.book_repository import BookRepository
 from interface_adapters.repositories.user_repository import UserRepository
 from interface_adapters.repositories.loan_repository import LoanRepository
+from interface_adapters.repositories.copy_repository import CopyRepository
+from interface_adapters.repositories.copy_availability import CopyAvailability
+from interface_adapters.repositories.suggestion_index import SuggestionIndex
+from interface_adapters.repositories.fuzzy_index import FuzzyIndex
+from interface_adapters.repositories.fine_repository import FineRepository
 # Importing use cases which contain the application's business rules
 from use_cases.add_new_book_use_case import AddNewBookUseCase
+from use_cases.add_book_copies_use_case import AddBookCopiesUseCase
+from use_cases.bulk_import_books_use_case import BulkImportBooksUseCase
 from use_cases.update_book_info_use_case import UpdateBookInfoUseCase
 from use_cases.user_registration_use_case import UserRegistrationUseCase
 from use_cases.update_user_info_use_case import UpdateUserInfoUseCase
@@ -19,82 +31,313 @@ from use_cases.delete_user_use_case import DeleteUserUseCase
 from use_cases.delete_book_use_case import DeleteBookUseCase
 from use_cases.delete_loan_use_case import DeleteLoanUseCase
 from use_cases.search_loan_use_case import SearchLoanUseCase
+from use_cases.list_overdue_loans_use_case import ListOverdueLoansUseCase
+from use_cases.assess_fines_use_case import AssessFinesUseCase
+from use_cases.archive_loans_use_case import ArchiveLoansUseCase
+from use_cases.loan_activity_report_use_case import LoanActivityReportUseCase
 from use_cases.search_book_use_case import SearchBookUseCase
 from use_cases.search_user_use_case import SearchUserUseCase
 from use_cases.show_database_tables_use_case import ShowDatabaseTablesUseCase
 
-# Establishing a connection to the database
-db_connection = create_db_connection()
-
-# Initializing repositories with the database connection
-book_repository = BookRepository(db_connection)
-user_repository = UserRepository(db_connection)
-loan_repository = LoanRepository(db_connection)
-
-# Initializing use cases with their respective repositories
-add_book_use_case = AddNewBookUseCase(book_repository)
-update_book_info_use_case = UpdateBookInfoUseCase(book_repository)
-user_registration_use_case = UserRegistrationUseCase(user_repository)
-update_user_info_use_case = UpdateUserInfoUseCase(user_repository)
-borrow_book_use_case = BorrowBookUseCase(book_repository, loan_repository)
-return_book_use_case = ReturnBookUseCase(loan_repository)
-delete_book_use_case = DeleteBookUseCase(book_repository, loan_repository)
-delete_user_use_case = DeleteUserUseCase(user_repository, loan_repository)
-delete_loan_use_case = DeleteLoanUseCase(loan_repository)
-search_loan_use_case = SearchLoanUseCase(loan_repository)
-search_user_use_case = SearchUserUseCase(user_repository)
-search_book_use_case = SearchBookUseCase(book_repository)
-show_books_table_use_case = ShowDatabaseTablesUseCase(book_repository)
-show_users_table_use_case = ShowDatabaseTablesUseCase(user_repository)
-show_loans_table_use_case = ShowDatabaseTablesUseCase(loan_repository)
-
-# Initializing controllers with the respective use cases
-book_controller = BookController(add_book_use_case, update_book_info_use_case, delete_book_use_case,
-                                 search_book_use_case, show_books_table_use_case)
-user_controller = UserController(user_registration_use_case, update_user_info_use_case, delete_user_use_case,
-                                 search_user_use_case, show_users_table_use_case)
-loan_controller = LoanController(borrow_book_use_case, return_book_use_case, delete_loan_use_case, search_loan_use_case,
-                                 show_loans_table_use_case)
-
-
-def tuples_to_dicts(tuples, headers):
-    """
-    Converts a list of tuples into a list of dictionaries based on provided headers.
+@st.cache_resource
+def create_controllers():
+    """
+    Builds the connection pool, repositories, use cases and controllers once per server process.
+
+    Streamlit reruns this script on every interaction; caching the wiring as a resource keeps one
+    connection pool shared by all sessions instead of reconnecting on every rerun.
+
+    Returns:
+        tuple: The book, user and loan controllers.
+    """
+    # The in-memory indexes below are loaded from migrated tables; a no-op when started from main.py, which
+    # has already migrated, but `streamlit run` can also start this script directly
+    run_migrations()
+
+    # Establishing a pool of connections to the database
+    db_connection_pool = create_connection_pool()
+
+    # Initializing repositories with the connection pool, a primary-key cache if enabled in config.py
+    # and in-memory indexes for autocompleting titles, authors and user names and for approximate user search
+    book_repository = BookRepository(db_connection_pool, create_entity_cache(),
+                                     SuggestionIndex(BookRepository.suggestion_fields))
+    user_repository = UserRepository(db_connection_pool, create_entity_cache(),
+                                     SuggestionIndex(UserRepository.suggestion_fields),
+                                     FuzzyIndex(UserRepository.fuzzy_fields))
+    loan_repository = LoanRepository(db_connection_pool, create_entity_cache())
+    book_repository.load_suggestions()
+    user_repository.load_suggestions()
+    user_repository.load_fuzzy_index()
+    # The bitmap of free copies is built from the database once, then kept current by borrows and returns
+    copy_repository = CopyRepository(db_connection_pool, CopyAvailability())
+    copy_repository.load_availability()
+
+    # Initializing use cases with their respective repositories
+    add_book_use_case = AddNewBookUseCase(book_repository)
+    bulk_import_books_use_case = BulkImportBooksUseCase(book_repository)
+    add_book_copies_use_case = AddBookCopiesUseCase(copy_repository)
+    update_book_info_use_case = UpdateBookInfoUseCase(book_repository)
+    user_registration_use_case = UserRegistrationUseCase(user_repository)
+    update_user_info_use_case = UpdateUserInfoUseCase(user_repository)
+    borrow_book_use_case = BorrowBookUseCase(book_repository, loan_repository, copy_repository)
+    return_book_use_case = ReturnBookUseCase(loan_repository, book_repository, copy_repository)
+    delete_book_use_case = DeleteBookUseCase(book_repository, loan_repository)
+    delete_user_use_case = DeleteUserUseCase(user_repository, loan_repository)
+    delete_loan_use_case = DeleteLoanUseCase(loan_repository, book_repository, copy_repository)
+    search_loan_use_case = SearchLoanUseCase(loan_repository)
+    list_overdue_loans_use_case = ListOverdueLoansUseCase(loan_repository)
+    assess_fines_use_case = AssessFinesUseCase(FineRepository(db_connection_pool), **load_fine_policy())
+    archive_loans_use_case = ArchiveLoansUseCase(loan_repository, **load_archive_policy())
+    loan_activity_report_use_case = LoanActivityReportUseCase(loan_repository)
+    search_user_use_case = SearchUserUseCase(user_repository)
+    search_book_use_case = SearchBookUseCase(book_repository)
+    show_books_table_use_case = ShowDatabaseTablesUseCase(book_repository)
+    show_users_table_use_case = ShowDatabaseTablesUseCase(user_repository)
+    show_loans_table_use_case = ShowDatabaseTablesUseCase(loan_repository)
+
+    # Initializing controllers with the respective use cases
+    book_controller = BookController(add_book_use_case, update_book_info_use_case, delete_book_use_case,
+                                     search_book_use_case, show_books_table_use_case, bulk_import_books_use_case,
+                                     add_book_copies_use_case)
+    user_controller = UserController(user_registration_use_case, update_user_info_use_case, delete_user_use_case,
+                                     search_user_use_case, show_users_table_use_case)
+    loan_controller = LoanController(borrow_book_use_case, return_book_use_case, delete_loan_use_case,
+                                     search_loan_use_case, show_loans_table_use_case, list_overdue_loans_use_case,
+                                     assess_fines_use_case, archive_loans_use_case,
+                                     loan_activity_report_use_case)
+
+    return book_controller, user_controller, loan_controller
+
+
+@st.cache_resource
+def get_table_generations():
+    """
+    Holds a write counter per table, shared by all sessions.
+
+    Cached reads take the counter of the table they read as an argument, so bumping it with
+    invalidate() makes every cached result for that table unreachable while other tables keep theirs.
+
+    Returns:
+        dict: Table name mapped to its current generation.
+    """
+    return {'books': 0, 'users': 0, 'loans': 0}
+
+
+@st.cache_resource
+def get_table_generations_lock():
+    """
+    Holds the lock that serializes updates to the table generations, since every session runs in its
+    own thread.
+
+    Returns:
+        Lock: The lock shared by all sessions.
+    """
+    return threading.Lock()
+
+
+def invalidate(*table_names):
+    """
+    Discards the cached reads of the given tables after a form has written to them.
+
+    Parameters:
+        table_names (str): The tables that were written.
+    """
+    generations = get_table_generations()
+    with get_table_generations_lock():
+        for table_name in table_names:
+            generations[table_name] += 1
+
+
+book_controller, user_controller, loan_controller = create_controllers()
+
+# Number of rows shown at a time in the table views
+PAGE_SIZE = 100
+
+# Maximum number of table pages and search results kept in the cache
+CACHE_MAX_ENTRIES = 256
+
+
+def tuples_to_frame(tuples, headers):
+    """
+    Converts a list of tuples into a DataFrame with the provided headers as its columns.
+
+    The rows are handed to pandas as they came from the database, so no dict is built per row.
 
     Parameters:
         tuples (list of tuples): The data returned from the database.
         headers (list of str): The column headers for the data.
 
     Returns:
-        list of dicts: Converted list of dictionaries.
+        DataFrame: One row per tuple.
     """
-    return [dict(zip(headers, row)) for row in tuples]
+    return pd.DataFrame.from_records(tuples, columns=headers)
 
 
-def get_table_data(table_name):
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def get_table_data(table_name, after=None, generation=0):
     """
-    Fetches all data from the specified table.
+    Fetches one page of data from the specified table.
+
+    Results are cached until the table is written through one of the forms.
 
     Parameters:
         table_name (str): Name of the database table to fetch data from.
+        after (int, optional): The cursor returned with the previous page; None for the first page.
+        generation (int): The table's current generation from get_table_generations().
 
     Returns:
-        list: List of dictionaries where each dictionary represents a row of data.
+        tuple: An Arrow table holding the page, which st.dataframe displays without converting it row
+        by row, and the cursor of the next page (None on the last page).
+
+    Raises:
+        Exception: With the controller's error message if the page could not be read.
     """
     if table_name == 'books':
-        data = book_controller.get_books(fetchone=False)
+        data = book_controller.get_books_page(PAGE_SIZE, after, columnar=True)
     elif table_name == 'users':
-        data = user_controller.get_users(fetchone=False)
+        data = user_controller.get_users_page(PAGE_SIZE, after, columnar=True)
     elif table_name == 'loans':
-        data = loan_controller.get_loans(fetchone=False)
+        data = loan_controller.get_loans_page(PAGE_SIZE, after, columnar=True)
     else:
         raise Exception("Error: Couldn't retrieve table. 'table_name' not entered correctly.")
-    headers = data['headers']  # This fetches the column headers
-    content = data['content']  # This fetches the content of the table
-    if content:
-        return tuples_to_dicts(content, headers)
+    if not isinstance(data, dict):
+        # Raised rather than returned, so the error message is not cached in place of the page
+        raise Exception(data)
+    # Wrapping the record batch in a table shares its columns rather than copying them
+    return pa.Table.from_batches([data['content']]), data['next_cursor']
+
+
+def show_table_page(table_name):
+    """
+    Displays one page of a table with buttons to move to the next or previous page.
+
+    The cursors of the pages visited so far are kept in the session state, one stack per table.
+
+    Parameters:
+        table_name (str): Name of the database table to display.
+    """
+    cursors_key = f'{table_name}_page_cursors'
+    if cursors_key not in st.session_state:
+        st.session_state[cursors_key] = [None]
+    cursors = st.session_state[cursors_key]
+
+    try:
+        rows, next_cursor = get_table_data(table_name, cursors[-1], get_table_generations()[table_name])
+    except Exception as e:
+        st.error(str(e))
+        return
+    st.dataframe(rows)
+
+    previous_column, next_column = st.columns(2)
+    if len(cursors) > 1 and previous_column.button("Previous page", key=f'{table_name}_previous_page'):
+        cursors.pop()
+        st.rerun()
+    if next_cursor is not None and next_column.button("Next page", key=f'{table_name}_next_page'):
+        cursors.append(next_cursor)
+        st.rerun()
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def search_table(table_name, id_field_name, id_value, generation=0, include_archive=False):
+    """
+    Searches the specified table for records whose field equals a value.
+
+    Results are cached until the table is written through one of the forms.
+
+    Parameters:
+        table_name (str): Name of the database table to search ('books', 'users' or 'loans').
+        id_field_name (str): The column/field name to match.
+        id_value (str or int): The value to match.
+        generation (int): The table's current generation from get_table_generations().
+        include_archive (bool): Also search the archived loans; only used for the 'loans' table.
+
+    Returns:
+        Record(s) with their headers from the database.
+    """
+    if table_name == 'books':
+        return book_controller.search_book(id_field_name, id_value, fetchone=False)
+    elif table_name == 'users':
+        return user_controller.search_user(id_field_name, id_value, fetchone=False)
+    elif table_name == 'loans':
+        return loan_controller.search_loan(id_field_name, id_value, fetchone=False, include_archive=include_archive)
     else:
-        return [dict(zip(headers, [None] * len(headers)))]
+        raise Exception("Error: Couldn't retrieve table. 'table_name' not entered correctly.")
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def search_books_fulltext(text, limit=20, generation=0):
+    """
+    Searches books by words from their title, author or genre, most relevant first.
+
+    Results are cached until the books table is written through one of the forms.
+
+    Parameters:
+        text (str): The words to search for.
+        limit (int): The maximum number of books to return.
+        generation (int): The books table's current generation from get_table_generations().
+
+    Returns:
+        The best matching book records with their headers.
+    """
+    return book_controller.search_books_fulltext(text, limit)
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=60, show_spinner=False)
+def get_overdue_loans(generation=0):
+    """
+    Lists the overdue loans, most overdue first.
+
+    Results are cached until the loans table is written through one of the forms, and for at most a
+    minute, since loans also become overdue as time passes.
+
+    Parameters:
+        generation (int): The loans table's current generation from get_table_generations().
+
+    Returns:
+        Overdue loan records with the book title and borrower's name, and their headers.
+    """
+    return loan_controller.get_overdue_loans()
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def search_users_fuzzy(text, limit=10, generation=0):
+    """
+    Searches users by a name or email that may contain typos, closest first.
+
+    Results are cached until the users table is written through one of the forms.
+
+    Parameters:
+        text (str): The name or email address to look for.
+        limit (int): The maximum number of users to return.
+        generation (int): The users table's current generation from get_table_generations().
+
+    Returns:
+        The closest user records with their headers and a score column.
+    """
+    return user_controller.search_users_fuzzy(text, limit)
+
+
+def autocomplete(label, suggest, key):
+    """
+    Shows a text box that suggests completions of what has been typed so far.
+
+    The suggestions are refreshed whenever the text box is submitted, i.e. on pressing enter or
+    leaving the box, and come from an in-memory index, so no query is sent to the database.
+
+    Parameters:
+        label (str): The label of the text box.
+        suggest (callable): Takes the typed prefix and returns (value, record id) pairs.
+        key (str): The session state key of the text box.
+
+    Returns:
+        str: The chosen suggestion, or the typed text if there is none.
+    """
+    typed = st.text_input(label, key=key)
+    suggestions = suggest(typed) if typed else []
+    if not suggestions:
+        return typed
+    values = list(dict.fromkeys(value for value, _ in suggestions))
+    return st.selectbox("Suggestions", values, key=f'{key}_suggestion')
 
 
 # Definition of form functions
@@ -110,6 +353,7 @@ def add_book_form():
 
         if submit_button:
             result = book_controller.add_book(title, author, isbn, publication_year, genre)
+            invalidate('books')
             st.success(result)
 
 
@@ -125,6 +369,7 @@ def update_book_form():
 
         if submit_button:
             result = book_controller.update_book_info(book_id, title, author, isbn, publication_year, genre)
+            invalidate('books')
             st.success(result)
 
 
@@ -137,30 +382,75 @@ def register_user_form():
 
         if submit_button:
             result = user_controller.register_user(name, email, role)
+            invalidate('users')
             st.success(result)
 
 
+def parse_ids(text):
+    """
+    Parses a comma-separated list of IDs typed into a form.
+
+    Parameters:
+        text (str): The text entered, e.g. "12, 15, 31".
+
+    Returns:
+        list of int: The IDs, in the order entered.
+    """
+    return [int(part) for part in text.split(',') if part.strip()]
+
+
 def borrow_book_form():
     with st.form("Borrow Book"):
         book_id = st.number_input("Book ID", min_value=1, step=1)
+        more_book_ids = st.text_input("More Book IDs to borrow together, comma-separated (optional)")
         user_id = st.number_input("User ID", min_value=1, step=1)
         loan_date = st.text_input("Loan Date (YYYY-MM-DD)")
         due_date = st.text_input("Due Date (YYYY-MM-DD)")
         submit_button = st.form_submit_button("Borrow Book")
 
         if submit_button:
-            result = loan_controller.borrow_book(book_id, user_id, loan_date, due_date)
+            book_ids = [book_id] + parse_ids(more_book_ids)
+            if len(book_ids) == 1:
+                result = loan_controller.borrow_book(book_id, user_id, loan_date, due_date)
+            else:
+                result = loan_controller.borrow_books(book_ids, user_id, loan_date, due_date)
+            invalidate('loans', 'books')  # Book searches show availability
             st.success(result)
 
 
 def return_book_form():
     with st.form("Return Book"):
         loan_id = st.number_input("Loan ID", min_value=1, step=1)
+        more_loan_ids = st.text_input("More Loan IDs to return together, comma-separated (optional)")
         return_date = st.text_input("Return Date (YYYY-MM-DD)")
         submit_button = st.form_submit_button("Return Book")
 
         if submit_button:
-            result = loan_controller.return_book(loan_id, return_date)
+            loan_ids = [loan_id] + parse_ids(more_loan_ids)
+            if len(loan_ids) == 1:
+                result = loan_controller.return_book(loan_id, return_date)
+            else:
+                result = loan_controller.return_books(loan_ids, return_date)
+            invalidate('loans', 'books')  # Book searches show availability
+            st.success(result)
+
+
+def add_copies_form():
+    """
+    Create a form in Streamlit to add physical copies of a book.
+    """
+    with st.form("Add Book Copies"):
+        book_id = st.number_input("Book ID", min_value=1, step=1)
+        barcodes = st.text_input("Barcodes, comma-separated (leave empty to generate them)")
+        count = st.number_input("Number of copies to add, when no barcodes are given", min_value=1, step=1)
+        submit_button = st.form_submit_button("Add Copies")
+
+        if submit_button:
+            if barcodes.strip():
+                result = book_controller.add_copies(book_id, barcodes=barcodes.split(','))
+            else:
+                result = book_controller.add_copies(book_id, count)
+            invalidate('books')
             st.success(result)
 
 
@@ -174,6 +464,7 @@ def delete_user_form():
 
         if submit_button:
             result = user_controller.delete_user(user_id)
+            invalidate('users')
             st.success(result)
 
 
@@ -187,6 +478,7 @@ def delete_loan_form():
 
         if submit_button:
             result = loan_controller.delete_loan(loan_id)
+            invalidate('loans', 'books')  # Book searches show availability
             st.success(result)
 
 
@@ -200,86 +492,188 @@ def delete_book_form():
 
         if submit_button:
             result = book_controller.delete_book(book_id)
+            invalidate('books')
             st.success(result)
 
 
 def search_book_form():
     """
-    Prompt the user for the book ID or book Title and search the specified book.
+    Prompt the user for the book ID, book Title, author or keywords and search the specified book(s).
     """
     # Ensure the session state key exists
     if 'search_key' not in st.session_state:
         st.session_state['search_key'] = 'book_id'
 
-    search_type = st.radio("Search book by", ["Book ID", "Book Title"])
+    search_type = st.radio("Search book by", ["Book ID", "Book Title", "Author", "Keywords"])
 
     # Update the session state key based on the search type
     if search_type == "Book ID":
         search_key = 'book_id'
-    else:
+    elif search_type == "Book Title":
         search_key = 'title'
+    elif search_type == "Author":
+        search_key = 'author'
+    else:
+        search_key = 'keywords'
 
     # Update the session state
     st.session_state['search_key'] = search_key
 
+    # Titles and authors are autocompleted outside the form, which would otherwise hold back reruns
+    if search_type in ("Book Title", "Author"):
+        book_text = autocomplete(f"Enter {search_type}",
+                                 lambda prefix: book_controller.suggest_books(search_key, prefix), search_key)
+
     with st.form("Search Book"):
         # Conditional input fields based on the radio selection
         if search_type == "Book ID":
             book_id = st.number_input("Enter Book ID", min_value=1, step=1, key=search_key)
-        else:
-            book_title = st.text_input("Enter Book Title", key=search_key)
+        elif search_type == "Keywords":
+            keywords = st.text_input("Enter words from the title, author or genre", key=search_key)
 
         submit_button = st.form_submit_button("Search Book")
 
         if submit_button:
+            generation = get_table_generations()['books']
             if search_type == "Book ID":
-                book = book_controller.search_book(search_key, book_id, fetchone=False)
+                book = search_table('books', search_key, book_id, generation)
+            elif search_type in ("Book Title", "Author"):
+                book = search_table('books', search_key, book_text, generation)
             else:
-                book = book_controller.search_book(search_key, book_title, fetchone=False)
+                book = search_books_fulltext(keywords, generation=generation)
 
             if book['content']:
                 headers = book['headers']  # This fetches the column headers
                 content = book['content']  # This fetches the content of the table
-                st.dataframe(tuples_to_dicts(content, headers))
+                st.dataframe(tuples_to_frame(content, headers))
             else:
                 st.write("No results found.")
 
 
 def search_user_form():
     """
-    Create a form in Streamlit to search for a user by either their ID or name.
+    Create a form in Streamlit to search for a user by their ID, their name, or a name or email with typos.
     """
     # Ensure the session state key exists
     if 'search_user_key' not in st.session_state:
         st.session_state['search_user_key'] = 'user_id'
 
-    search_type = st.radio("Search user by", ["User ID", "User Name"], key='search_user_radio')
+    search_type = st.radio("Search user by", ["User ID", "User Name", "Name or Email (allowing typos)"],
+                           key='search_user_radio')
 
     # Update the session state key based on the search type
-    search_key = 'user_id' if search_type == "User ID" else 'name'
+    if search_type == "User ID":
+        search_key = 'user_id'
+    elif search_type == "User Name":
+        search_key = 'name'
+    else:
+        search_key = 'name_or_email'
 
     # Update the session state
     st.session_state['search_user_key'] = search_key
 
+    # Names are autocompleted outside the form, which would otherwise hold back reruns
+    if search_type == "User Name":
+        user_input = autocomplete("Enter User Name",
+                                  lambda prefix: user_controller.suggest_users(search_key, prefix), search_key)
+
     with st.form("Search User"):
         # Conditional input fields based on the radio selection
-        user_input = st.number_input("Enter User ID", min_value=1, step=1, key=search_key) \
-            if search_type == "User ID" else \
-            st.text_input("Enter User Name", key=search_key)
+        if search_type == "User ID":
+            user_input = st.number_input("Enter User ID", min_value=1, step=1, key=search_key)
+        elif search_type != "User Name":
+            user_input = st.text_input("Enter a name or email address", key=search_key)
 
         submit_button = st.form_submit_button("Search User")
 
         if submit_button:
-            user = user_controller.search_user(search_key, user_input, fetchone=False)
+            generation = get_table_generations()['users']
+            if search_key == 'name_or_email':
+                user = search_users_fuzzy(user_input, generation=generation)
+            else:
+                user = search_table('users', search_key, user_input, generation)
 
             if user['content']:
                 headers = user['headers']  # This fetches the column headers
                 content = user['content']  # This fetches the content of the table
-                st.dataframe(tuples_to_dicts(content, headers))
+                st.dataframe(tuples_to_frame(content, headers))
             else:
                 st.write("No results found.")
 
 
+def overdue_loans_page():
+    """
+    Show the loans that are past their due date and not yet returned.
+    """
+    loans = get_overdue_loans(get_table_generations()['loans'])
+    st.write(f"{len(loans['content'])} loans overdue as of {loans['now']:%Y-%m-%d %H:%M}.")
+    if loans['content']:
+        st.dataframe(tuples_to_frame(loans['content'], loans['headers']))
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def get_loan_activity(start, end, generation=0):
+    """
+    Summarizes, month by month, the loans made from start up to, but not including, end.
+
+    Results are cached until the loans table is written through one of the forms.
+
+    Parameters:
+        start (date): The first day of the period.
+        end (date): The day the period stops before.
+        generation (int): The loans table's current generation from get_table_generations().
+
+    Returns:
+        Monthly loan figures with their headers, or an error message.
+    """
+    return loan_controller.get_loan_activity(start, end)
+
+
+def loan_activity_page():
+    """
+    Show, month by month, the loans made in a chosen year.
+    """
+    year = st.number_input("Year", min_value=1900, max_value=9999, value=date.today().year, step=1)
+    activity = get_loan_activity(date(year, 1, 1), date(year + 1, 1, 1), get_table_generations()['loans'])
+    if isinstance(activity, str):
+        st.error(activity)
+    elif activity['content']:
+        st.dataframe(tuples_to_frame(activity['content'], activity['headers']))
+    else:
+        st.write(f"No loans made in {year}.")
+
+
+def fines_page():
+    """
+    Charge late fees up to today on request, and show the users with the highest fines.
+    """
+    if st.button("Assess fines now"):
+        report = loan_controller.assess_fines()
+        if isinstance(report, str):
+            st.error(report)
+        else:
+            st.success(f"{report['loans_assessed']} loans assessed as of {report['as_of']}: "
+                       f"{report['entries_written']} fines recorded, {report['amount_cents'] / 100:.2f} charged.")
+    fines = loan_controller.get_fines_by_user()
+    if fines['content']:
+        st.dataframe(tuples_to_frame(fines['content'], fines['headers']))
+    else:
+        st.write("No fines recorded.")
+
+
+def archive_loans_page():
+    """
+    Move the loans returned long enough ago out of the loans table on request.
+    """
+    st.write("Returned loans older than the ARCHIVE_CONFIG age are moved to the archive, a batch at a time. "
+             "Archived loans can still be found from Search Loan.")
+    if st.button("Archive old loans"):
+        with st.spinner("Archiving..."):
+            message = loan_controller.archive_loans()
+        invalidate('loans')
+        st.success(message)
+
+
 def search_loan_form():
     """
     Create a form in Streamlit to search for a loan by loan ID, user ID, or book ID.
@@ -304,16 +698,17 @@ def search_loan_form():
             loan_input = st.number_input("Enter User ID", min_value=1, step=1, key=search_key)
         else:
             loan_input = st.number_input("Enter Book ID", min_value=1, step=1, key=search_key)
+        include_archive = st.checkbox("Include archived loans")
 
         submit_button = st.form_submit_button("Search Loan")
 
         if submit_button:
-            loan = loan_controller.search_loan(search_key, loan_input, fetchone=False)
+            loan = search_table('loans', search_key, loan_input, get_table_generations()['loans'], include_archive)
 
             if loan['content']:
                 headers = loan['headers']  # This fetches the column headers
                 content = loan['content']  # This fetches the content of the table
-                st.dataframe(tuples_to_dicts(content, headers))
+                st.dataframe(tuples_to_frame(content, headers))
             else:
                 st.write("No results found.")
 
@@ -327,25 +722,24 @@ def main():
     st.text("Developed by Souradeep Banerjee 💗")
     st.divider()
 
-    menu = ["Home", "Add Book", "Update Book Info", "Register User", "Borrow Book", "Return Book", "Delete User",
-            "Delete Loan", "Delete Book", "Search Book",
-            "Search User", "Search Loan", "Exit"]
+    menu = ["Home", "Add Book", "Add Book Copies", "Update Book Info", "Register User", "Borrow Book", "Return Book",
+            "Delete User", "Delete Loan", "Delete Book", "Search Book",
+            "Search User", "Search Loan", "Overdue Loans", "Fines", "Loan Activity", "Archive Loans", "Exit"]
     choice = st.sidebar.selectbox("Menu", menu)
 
     if choice == "Home":
         st.subheader("Books")
-        books_data = get_table_data('books')
-        st.dataframe(books_data)
+        show_table_page('books')
 
         st.subheader("Users")
-        users_data = get_table_data('users')
-        st.dataframe(users_data)
+        show_table_page('users')
 
         st.subheader("Loans")
-        loans_data = get_table_data('loans')
-        st.dataframe(loans_data)
+        show_table_page('loans')
     elif choice == "Add Book":
         add_book_form()
+    elif choice == "Add Book Copies":
+        add_copies_form()
     elif choice == "Update Book Info":
         update_book_form()
     elif choice == "Register User":
@@ -366,6 +760,14 @@ def main():
         search_user_form()
     elif choice == "Search Loan":
         search_loan_form()
+    elif choice == "Overdue Loans":
+        overdue_loans_page()
+    elif choice == "Fines":
+        fines_page()
+    elif choice == "Loan Activity":
+        loan_activity_page()
+    elif choice == "Archive Loans":
+        archive_loans_page()
     elif choice == "Exit":
         st.write("Exiting the application.")
         sys.exit()
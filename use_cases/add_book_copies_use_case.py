@@ -0,0 +1,41 @@
+from frameworks_and_drivers.database.connection_pool import TransactionRolledBack
+from frameworks_and_drivers.database.drivers import Error
+
+
+class AddBookCopiesUseCase:
+    """
+    Use case for adding physical copies of a book to the library system.
+
+    Attributes:
+        copy_repository (CopyRepository): Repository for copy-related operations.
+    """
+
+    def __init__(self, copy_repository):
+        self.copy_repository = copy_repository
+
+    def execute(self, book_id, count=1, barcodes=None):
+        """
+        Executes the process of adding copies of a book.
+
+        Parameters:
+            book_id (int): The ID of the book the copies belong to.
+            count (int): The number of copies to add when no barcodes are given.
+            barcodes (list of str, optional): The barcodes of the new copies.
+
+        Returns:
+            list: The copy_id of each new copy.
+        """
+        if barcodes is not None:
+            barcodes = [barcode.strip() for barcode in barcodes if barcode.strip()]
+            if len(set(barcodes)) != len(barcodes):
+                raise Exception("The same barcode is listed more than once.")
+        if not barcodes and count < 1:
+            raise Exception("No copies to add.")
+        try:
+            with self.copy_repository.transaction():
+                copy_ids = self.copy_repository.add_copies(book_id, barcodes or None, count)
+            print(f"{len(copy_ids)} copies added successfully.")
+            return copy_ids
+        except Error + (TransactionRolledBack,) as e:
+            print(f"An error occurred while adding copies: {e}")
+            raise Exception(f"An error occurred, no copies were added: {e}")
@@ -1,4 +1,4 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.drivers import Error
 
 
 class AddNewBookUseCase:
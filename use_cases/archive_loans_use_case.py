@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from frameworks_and_drivers.database.drivers import Error
+
+
+class ArchiveLoansUseCase:
+    """
+    Use case for moving old returned loans out of the loans table into the archive.
+
+    Attributes:
+        loan_repository (LoanRepository): Repository for loan-related operations.
+        min_age_days (int): How long ago a loan must have been returned to be archived.
+        batch_size (int): The number of loans moved per transaction.
+        pause_seconds (float): Seconds to wait between batches.
+    """
+
+    def __init__(self, loan_repository, min_age_days=365, batch_size=500, pause_seconds=0.1):
+        self.loan_repository = loan_repository
+        self.min_age_days = min_age_days
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+
+    def execute(self, now=None):
+        """
+        Executes the archival of the loans returned more than min_age_days ago.
+
+        Parameters:
+            now (datetime, optional): The moment the age of loans is measured from; the current time if
+                omitted.
+
+        Returns:
+            int: The number of loans archived.
+        """
+        returned_before = ((now or datetime.now()) - timedelta(days=self.min_age_days)).strftime('%Y-%m-%d')
+        try:
+            archived = self.loan_repository.archive_returned_loans(returned_before, self.batch_size,
+                                                                   self.pause_seconds)
+            print(f"{archived} loans returned before {returned_before} archived.")
+            return archived
+        except Error as e:
+            print(f"An error occurred while archiving loans: {e}")
+            raise Exception(f"An error occurred, archiving stopped: {e}")
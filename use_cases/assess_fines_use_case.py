@@ -0,0 +1,114 @@
+from datetime import date, datetime
+
+import numpy as np
+
+from frameworks_and_drivers.database.connection_pool import TransactionRolledBack
+from frameworks_and_drivers.database.drivers import Error
+
+
+class AssessFinesUseCase:
+    """
+    Use case for charging late fees on loans returned late or still out past their due date.
+
+    A loan is charged daily_rate_cents for every day it is late beyond grace_days, up to max_fine_cents.
+    Each run only assesses the loans whose fine can have changed since the previous run, and records
+    the change in each loan's fine as a ledger entry, so running it twice for the same day charges nothing
+    more.
+
+    Attributes:
+        fine_repository (FineRepository): Repository for fine-related operations.
+        daily_rate_cents (int): The fee for each day a loan is late.
+        max_fine_cents (int): The most a single loan can be charged.
+        grace_days (int): The number of days a loan can be late without a fee.
+    """
+
+    def __init__(self, fine_repository, daily_rate_cents=25, max_fine_cents=2000, grace_days=0):
+        self.fine_repository = fine_repository
+        self.daily_rate_cents = daily_rate_cents
+        self.max_fine_cents = max_fine_cents
+        self.grace_days = grace_days
+
+    def execute(self, as_of=None, batch_size=10000):
+        """
+        Executes a fines run.
+
+        Parameters:
+            as_of (date, optional): The day fines are assessed up to; today if omitted.
+            batch_size (int): The number of loans read, assessed and written at a time.
+
+        Returns:
+            dict: The as_of date, the number of loans assessed, the number of ledger entries written and
+            the net amount charged in cents.
+        """
+        as_of = (as_of or date.today()).isoformat()
+        try:
+            watermark = self.fine_repository.get_watermark()
+            loans_assessed = 0
+            entries_written = 0
+            amount_cents = 0
+            for loans in self.fine_repository.iter_candidate_loans(watermark, as_of, batch_size):
+                entries, totals = self.assess(loans, as_of)
+                with self.fine_repository.transaction():
+                    self.fine_repository.write_assessments(entries, totals)
+                loans_assessed += len(loans)
+                entries_written += len(entries)
+                amount_cents += sum(entry[3] for entry in entries)
+            self.fine_repository.record_run(as_of, loans_assessed, entries_written,
+                                            datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            print(f"{loans_assessed} loans assessed, {entries_written} fines recorded.")
+            return {'as_of': as_of, 'loans_assessed': loans_assessed, 'entries_written': entries_written,
+                    'amount_cents': amount_cents}
+        except Error + (TransactionRolledBack,) as e:
+            print(f"An error occurred while assessing fines: {e}")
+            raise Exception(f"An error occurred, the fines run stopped: {e}")
+
+    def assess(self, loans, as_of):
+        """
+        Computes the fines of a batch of loans with array operations over their dates.
+
+        Parameters:
+            loans (list of tuples): (loan_id, user_id, due_date, return_date, amount_cents already
+                charged) for each loan.
+            as_of (str): The day fines are assessed up to, as 'YYYY-MM-DD'.
+
+        Returns:
+            tuple: The ledger entries for the loans whose fine changed, and the new totals of every loan,
+            as the rows FineRepository.write_assessments() takes.
+        """
+        if not loans:
+            return [], []
+        loan_ids, user_ids, due_dates, return_dates, charged = zip(*loans)
+        # Dates come back as date/datetime objects or 'YYYY-MM-DD[ HH:MM:SS]' strings, depending on the driver
+        due = np.array([str(value)[:10] for value in due_dates], dtype='datetime64[D]')
+        returned = np.array([str(value)[:10] if value is not None else 'NaT' for value in return_dates],
+                            dtype='datetime64[D]')
+        today = np.datetime64(as_of, 'D')
+
+        settled = ~np.isnat(returned) & (returned <= today)
+        end = np.where(settled, returned, today)
+        days_late = np.maximum((end - due).astype(np.int64), 0)
+        amounts = np.minimum(np.maximum(days_late - self.grace_days, 0) * self.daily_rate_cents,
+                             self.max_fine_cents)
+        changes = amounts - np.array(charged, dtype=np.int64)
+
+        changed = np.flatnonzero(changes)
+        entries = list(zip(np.array(loan_ids)[changed].tolist(), np.array(user_ids)[changed].tolist(),
+                           days_late[changed].tolist(), changes[changed].tolist(), [as_of] * len(changed)))
+        totals = list(zip(loan_ids, user_ids, days_late.tolist(), amounts.tolist(), settled.astype(int).tolist()))
+        return entries, totals
+
+    def totals_by_user(self, limit=50):
+        """
+        Lists the users with the highest fines.
+
+        Parameters:
+            limit (int): The maximum number of users to return.
+
+        Returns:
+            dict: Per-user totals with their headers, highest first.
+        """
+        try:
+            return self.fine_repository.get_totals_by_user(limit)
+        except Error as e:
+            print(f"An error occurred: {e}")
+            return f"An error occurred: {e}"
@@ -1,4 +1,5 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.connection_pool import TransactionRolledBack
+from frameworks_and_drivers.database.drivers import Error
 
 
 class BorrowBookUseCase:
@@ -8,16 +9,21 @@ class BorrowBookUseCase:
     Attributes:
         book_repository (BookRepository): Repository for book-related operations.
         loan_repository (LoanRepository): Repository for loan-related operations.
+        copy_repository (CopyRepository): Repository that picks the physical copy to lend.
     """
 
-    def __init__(self, book_repository, loan_repository):
+    def __init__(self, book_repository, loan_repository, copy_repository):
         self.book_repository = book_repository
         self.loan_repository = loan_repository
+        self.copy_repository = copy_repository
 
     def execute(self, book_id, user_id, loan_date, due_date):
         """
         Executes the book borrowing process.
 
+        The book's availability record is locked for the rest of the transaction, so of several
+        concurrent borrowers of its last copy exactly one gets it and the others see it on loan.
+
         Parameters:
             book_id (int): The ID of the book to be borrowed.
             user_id (int): The ID of the user borrowing the book.
@@ -25,11 +31,73 @@ class BorrowBookUseCase:
             due_date (str): The due date for returning the book.
         """
         try:
-            book = self.book_repository.get_books_by_id('book_id', book_id)
-            if not book:
-                raise Exception("Book not found.")
+            with self.book_repository.transaction():
+                availability = self.book_repository.get_availability([book_id], lock=True)
+                if book_id not in availability:
+                    raise Exception("Book not found.")
+                total_copies, copies_out = availability[book_id]
+                if copies_out >= total_copies:
+                    raise Exception("Book is already on loan.")
 
-            self.loan_repository.create_loan(book_id, user_id, loan_date, due_date)
-            print("Book borrowed successfully.")
-        except Error as e:
+                self.book_repository.reserve_copies([book_id])
+                copy_id = self.pick_copy(book_id)
+                self.loan_repository.create_loan(book_id, user_id, loan_date, due_date, copy_id)
+                self.copy_repository.track_checkout(book_id, copy_id)
+        except Error + (TransactionRolledBack,) as e:
             print(f"An error occurred: {e}")
+            raise Exception(f"An error occurred, the book was not borrowed: {e}")
+        print("Book borrowed successfully.")
+
+    def execute_batch(self, book_ids, user_id, loan_date, due_date):
+        """
+        Executes the borrowing of several books by one user as a single checkout.
+
+        All book IDs are validated and locked with one query and all loans are created with one statement
+        and one commit, so either the whole checkout succeeds or nothing is borrowed.
+
+        Parameters:
+            book_ids (list of int): The IDs of the books to be borrowed.
+            user_id (int): The ID of the user borrowing the books.
+            loan_date (str): The date when the books are borrowed.
+            due_date (str): The due date for returning the books.
+        """
+        if not book_ids:
+            raise Exception("No books to borrow.")
+        if len(set(book_ids)) != len(book_ids):
+            raise Exception("The same book is listed more than once.")
+        try:
+            with self.book_repository.transaction():
+                availability = self.book_repository.get_availability(book_ids, lock=True)
+                missing_book_ids = [book_id for book_id in book_ids if book_id not in availability]
+                if missing_book_ids:
+                    raise Exception(f"Books not found: {', '.join(map(str, missing_book_ids))}.")
+                lent_book_ids = [book_id for book_id in book_ids
+                                 if availability[book_id][1] >= availability[book_id][0]]
+                if lent_book_ids:
+                    raise Exception(f"Books already on loan: {', '.join(map(str, lent_book_ids))}.")
+
+                self.book_repository.reserve_copies(book_ids)
+                copy_ids = [self.pick_copy(book_id) for book_id in book_ids]
+                self.loan_repository.create_loans([(book_id, user_id, loan_date, due_date, copy_id)
+                                                   for book_id, copy_id in zip(book_ids, copy_ids)])
+                for book_id, copy_id in zip(book_ids, copy_ids):
+                    self.copy_repository.track_checkout(book_id, copy_id)
+        except Error + (TransactionRolledBack,) as e:
+            print(f"An error occurred: {e}")
+            raise Exception(f"An error occurred, no books were borrowed: {e}")
+        print(f"{len(book_ids)} books borrowed successfully.")
+
+    def pick_copy(self, book_id):
+        """
+        Picks the physical copy of a book to lend; the book's availability record must be locked.
+
+        Parameters:
+            book_id (int): The ID of the book to be borrowed.
+
+        Returns:
+            int: The copy_id of a copy on the shelf.
+        """
+        copy_id = self.copy_repository.find_free_copy(book_id)
+        if copy_id is None:
+            raise Exception(f"No copy of book {book_id} is on the shelf.")
+        return copy_id
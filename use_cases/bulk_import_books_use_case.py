@@ -0,0 +1,133 @@
+import csv
+import json
+import os
+import time
+from frameworks_and_drivers.database.drivers import Error
+
+
+class BulkImportBooksUseCase:
+    """
+    Use case for importing a large book catalog from a CSV or JSON Lines file.
+
+    Attributes:
+        book_repository (BookRepository): Repository for book-related operations.
+    """
+
+    def __init__(self, book_repository):
+        self.book_repository = book_repository
+
+    def execute(self, file_path, batch_size=1000):
+        """
+        Executes the bulk import of books.
+
+        The file is streamed record by record. Valid books are inserted in batches of batch_size, each
+        committed together with a checkpoint, so running the import again on the same file after an
+        interruption continues after the last committed batch instead of starting over.
+
+        Parameters:
+            file_path (str): A .csv file with a header row, or a .jsonl file with one object per line.
+                Both use the fields title, author, isbn, publication_year and genre.
+            batch_size (int): The number of books inserted and committed at a time.
+
+        Returns:
+            dict: The number of books inserted, records skipped as already imported, rejected records
+            as (record number, reason) pairs, the elapsed seconds and the throughput in rows per second.
+        """
+        source = os.path.abspath(file_path)
+        already_committed = self.book_repository.get_import_checkpoint(source)
+        report = {
+            'inserted': 0,
+            'skipped': already_committed,
+            'rejected': [],
+            'seconds': 0.0,
+            'rows_per_second': 0.0,
+        }
+        started = time.monotonic()
+
+        batch = []
+        position = 0
+        try:
+            for position, record in enumerate(self.read_records(file_path), start=1):
+                if position <= already_committed:
+                    continue
+                book, reason = self.validate(record)
+                if reason:
+                    report['rejected'].append((position, reason))
+                    continue
+                batch.append(book)
+                if len(batch) >= batch_size:
+                    report['inserted'] += self.book_repository.add_books(batch, (source, position))
+                    batch = []
+            if batch:
+                report['inserted'] += self.book_repository.add_books(batch, (source, position))
+            self.book_repository.clear_import_checkpoint(source)
+            print("Books imported successfully.")
+        except Error as e:
+            print(f"An error occurred while importing books, the import can be resumed: {e}")
+            report['error'] = str(e)
+
+        report['seconds'] = time.monotonic() - started
+        report['rows_per_second'] = report['inserted'] / report['seconds'] if report['seconds'] else 0.0
+        return report
+
+    @staticmethod
+    def read_records(file_path):
+        """
+        Streams the records of a CSV or JSON Lines file as dictionaries.
+
+        Parameters:
+            file_path (str): The path of a .csv or .jsonl file.
+
+        Yields:
+            dict: One record at a time; an unparsable JSON line yields None so numbering stays aligned.
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        with open(file_path, newline='', encoding='utf-8') as file:
+            if extension == '.csv':
+                yield from csv.DictReader(file)
+            elif extension in ('.jsonl', '.ndjson'):
+                for line in file:
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        yield None
+            else:
+                raise ValueError("Unsupported file type. Use a .csv or .jsonl file.")
+
+    @staticmethod
+    def validate(record):
+        """
+        Checks one record and converts it to the column values of a book.
+
+        Parameters:
+            record (dict or None): A record read from the import file.
+
+        Returns:
+            tuple: (book values, None) for a valid record, or (None, reason) for a rejected one.
+        """
+        if not isinstance(record, dict):
+            return None, "Malformed record."
+        title = str(record.get('title') or '').strip()
+        author = str(record.get('author') or '').strip()
+        isbn = str(record.get('isbn') or '').strip() or None
+        genre = str(record.get('genre') or '').strip() or None
+        publication_year = record.get('publication_year')
+
+        if not title or not author:
+            return None, "Title and author are required."
+        if len(title) > 255 or len(author) > 255:
+            return None, "Title and author must be at most 255 characters."
+        if isbn is not None and len(isbn) > 13:
+            return None, "ISBN must be at most 13 characters."
+        if genre is not None and len(genre) > 100:
+            return None, "Genre must be at most 100 characters."
+        if publication_year in (None, ''):
+            publication_year = None
+        else:
+            try:
+                publication_year = int(publication_year)
+            except (TypeError, ValueError):
+                return None, "Publication year must be a whole number."
+        return (title, author, isbn, publication_year, genre), None
@@ -1,4 +1,5 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.connection_pool import TransactionRolledBack
+from frameworks_and_drivers.database.drivers import Error
 
 
 class DeleteBookUseCase:
@@ -14,9 +15,26 @@ class DeleteBookUseCase:
         self.book_repository = book_repository
 
     def can_delete_book(self, book_id):
-        # Check if there are any loans associated with the book
-        loans = self.loan_repository.get_loans_by_id('book_id', book_id, fetchone=False)
-        return len(loans) == 0
+        return book_id not in self.get_blocked_books([book_id])
+
+    def get_blocked_books(self, book_ids):
+        """
+        Finds which of the given books cannot be deleted because loans still refer to them.
+
+        Copies lent out are read from the availability records, locked so no borrow can slip in before
+        the delete; returned loans refer to a book until they are archived.
+
+        Parameters:
+            book_ids (list of int): The IDs of the books to check.
+
+        Returns:
+            dict: True for a book with active loans, False for one with only returned loans, keyed by book_id.
+        """
+        availability = self.book_repository.get_availability(book_ids, lock=True)
+        references = self.loan_repository.get_loan_references('book_id', book_ids)
+        blocked = {book_id: active for book_id, (active, _) in references.items()}
+        blocked.update((book_id, True) for book_id, (_, copies_out) in availability.items() if copies_out)
+        return blocked
 
     def execute(self, book_id):
         """
@@ -26,13 +44,48 @@ class DeleteBookUseCase:
             book_id (int): The unique identifier of the book to be deleted.
         """
         try:
-            if self.can_delete_book(book_id):
-                self.book_repository.delete_book(book_id)
-                print("Book deleted successfully.")
-                return "Book deleted successfully."
-            else:
-                print("Cannot delete book: There are active loans associated with it.")
-                return "Cannot delete book: There are active loans associated with it."
-        except Error as e:
+            with self.book_repository.transaction():
+                blocked = self.get_blocked_books([book_id])
+                if book_id not in blocked:
+                    self.book_repository.delete_book(book_id)
+                    print("Book deleted successfully.")
+                    return "Book deleted successfully."
+                elif blocked[book_id]:
+                    print("Cannot delete book: There are active loans associated with it.")
+                    return "Cannot delete book: There are active loans associated with it."
+                else:
+                    print("Cannot delete book: Its returned loans are still on record. Archive them first.")
+                    return "Cannot delete book: Its returned loans are still on record. Archive them first."
+        except Error + (TransactionRolledBack,) as e:
             print(f"An error occurred while deleting the book: {e}")
             return f"An error occurred while deleting the book: {e}"
+
+    def execute_bulk(self, book_ids):
+        """
+        Executes the process of deleting many books, checking all of their loans with one query.
+
+        The books without loans are deleted together; the others are kept and reported.
+
+        Parameters:
+            book_ids (list of int): The unique identifiers of the books to be deleted.
+
+        Returns:
+            dict: The IDs of the books deleted, of those kept for their active loans and of those kept for
+            their returned loans.
+        """
+        book_ids = list(dict.fromkeys(book_ids))
+        try:
+            with self.book_repository.transaction():
+                blocked = self.get_blocked_books(book_ids)
+                deleted = [book_id for book_id in book_ids if book_id not in blocked]
+                for book_id in deleted:
+                    self.book_repository.delete_book(book_id)
+            print(f"{len(deleted)} books deleted.")
+            return {
+                'deleted': deleted,
+                'active_loans': [book_id for book_id in book_ids if blocked.get(book_id) is True],
+                'returned_loans': [book_id for book_id in book_ids if blocked.get(book_id) is False],
+            }
+        except Error + (TransactionRolledBack,) as e:
+            print(f"An error occurred while deleting the books: {e}")
+            raise Exception(f"An error occurred, no book was deleted: {e}")
@@ -1,4 +1,5 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.connection_pool import TransactionRolledBack
+from frameworks_and_drivers.database.drivers import Error
 
 
 class DeleteLoanUseCase:
@@ -7,31 +8,46 @@ class DeleteLoanUseCase:
 
     Attributes:
         loan_repository (LoanRepository): Repository for loan-related operations.
+        book_repository (BookRepository): Repository whose availability counters are updated.
+        copy_repository (CopyRepository): Repository that tracks which copies are on the shelf.
     """
 
-    def __init__(self, loan_repository):
+    def __init__(self, loan_repository, book_repository, copy_repository):
         self.loan_repository = loan_repository
+        self.book_repository = book_repository
+        self.copy_repository = copy_repository
 
     def can_delete_loan(self, loan_id):
         # Check if the loan exists
         loan = self.loan_repository.get_loans_by_id('loan_id', loan_id)
-        return loan is not None
+        return loan is not None and loan['content'] is not None
 
     def execute(self, loan_id):
         """
         Executes the process of deleting a loan record.
 
+        An open loan is only deleted if it is still open when the DELETE runs, so its copy is put back
+        on the shelf once however many deletes or returns race for it.
+
         Parameters:
             loan_id (int): The unique identifier of the loan to be deleted.
         """
         try:
-            if self.can_delete_loan(loan_id):
-                self.loan_repository.delete_loan(loan_id)
-                print("Loan record deleted successfully.")
-                return "Loan record deleted successfully."
-            else:
-                print("Cannot delete loan: Loan record not found.")
-                return "Cannot delete loan: Loan record not found."
-        except Error as e:
+            with self.loan_repository.transaction():
+                active_loan_ids = self.loan_repository.get_active_loan_ids([loan_id])
+                if loan_id in active_loan_ids:
+                    # Deleting an open loan puts its copy back on the shelf
+                    book_id, copy_id = active_loan_ids[loan_id]
+                    if not self.loan_repository.delete_loan(loan_id, open_only=True):
+                        raise Exception("The loan was returned or deleted by someone else in the meantime. "
+                                        "Nothing was changed.")
+                    self.book_repository.release_copies([book_id])
+                    self.copy_repository.track_return(book_id, copy_id)
+                elif not self.loan_repository.delete_loan(loan_id):
+                    print("Cannot delete loan: Loan record not found.")
+                    return "Cannot delete loan: Loan record not found."
+        except Error + (TransactionRolledBack,) as e:
             print(f"An error occurred while deleting the loan record: {e}")
-            return f"An error occurred while deleting the loan record: {e}"
+            raise Exception(f"An error occurred while deleting the loan record: {e}")
+        print("Loan record deleted successfully.")
+        return "Loan record deleted successfully."
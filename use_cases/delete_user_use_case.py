@@ -1,4 +1,5 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.connection_pool import TransactionRolledBack
+from frameworks_and_drivers.database.drivers import Error
 
 
 class DeleteUserUseCase:
@@ -14,9 +15,22 @@ class DeleteUserUseCase:
         self.user_repository = user_repository
 
     def can_delete_user(self, user_id):
-        # Check if there are any loans associated with the user
-        loans = self.loan_repository.get_loans_by_id('user_id', user_id, fetchone=False)
-        return len(loans) == 0
+        return user_id not in self.get_blocked_users([user_id])
+
+    def get_blocked_users(self, user_ids):
+        """
+        Finds which of the given users cannot be deleted because loans still refer to them.
+
+        Returned loans refer to a user until they are archived.
+
+        Parameters:
+            user_ids (list of int): The IDs of the users to check.
+
+        Returns:
+            dict: True for a user with active loans, False for one with only returned loans, keyed by user_id.
+        """
+        references = self.loan_repository.get_loan_references('user_id', user_ids)
+        return {user_id: active for user_id, (active, _) in references.items()}
 
     def execute(self, user_id):
         """
@@ -26,13 +40,48 @@ class DeleteUserUseCase:
             user_id (int): The unique identifier of the user to be deleted.
         """
         try:
-            if self.can_delete_user(user_id):
-                self.user_repository.delete_user(user_id)
-                print("User deleted successfully.")
-                return "User deleted successfully."
-            else:
-                print("Cannot delete user: There are active loans associated with this user.")
-                return "Cannot delete user: There are active loans associated with this user."
-        except Error as e:
+            with self.user_repository.transaction():
+                blocked = self.get_blocked_users([user_id])
+                if user_id not in blocked:
+                    self.user_repository.delete_user(user_id)
+                    print("User deleted successfully.")
+                    return "User deleted successfully."
+                elif blocked[user_id]:
+                    print("Cannot delete user: There are active loans associated with this user.")
+                    return "Cannot delete user: There are active loans associated with this user."
+                else:
+                    print("Cannot delete user: Their returned loans are still on record. Archive them first.")
+                    return "Cannot delete user: Their returned loans are still on record. Archive them first."
+        except Error + (TransactionRolledBack,) as e:
             print(f"An error occurred while deleting the user: {e}")
             return f"An error occurred while deleting the user: {e}"
+
+    def execute_bulk(self, user_ids):
+        """
+        Executes the process of deleting many users, checking all of their loans with one query.
+
+        The users without loans are deleted together; the others are kept and reported.
+
+        Parameters:
+            user_ids (list of int): The unique identifiers of the users to be deleted.
+
+        Returns:
+            dict: The IDs of the users deleted, of those kept for their active loans and of those kept for
+            their returned loans.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        try:
+            with self.user_repository.transaction():
+                blocked = self.get_blocked_users(user_ids)
+                deleted = [user_id for user_id in user_ids if user_id not in blocked]
+                for user_id in deleted:
+                    self.user_repository.delete_user(user_id)
+            print(f"{len(deleted)} users deleted.")
+            return {
+                'deleted': deleted,
+                'active_loans': [user_id for user_id in user_ids if blocked.get(user_id) is True],
+                'returned_loans': [user_id for user_id in user_ids if blocked.get(user_id) is False],
+            }
+        except Error + (TransactionRolledBack,) as e:
+            print(f"An error occurred while deleting the users: {e}")
+            raise Exception(f"An error occurred, no user was deleted: {e}")
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from frameworks_and_drivers.database.drivers import Error
+
+
+class ListOverdueLoansUseCase:
+    """
+    Use case for listing the loans whose books have not been returned by their due date.
+
+    Attributes:
+        loan_repository (LoanRepository): Repository for loan-related operations.
+    """
+
+    def __init__(self, loan_repository):
+        self.loan_repository = loan_repository
+
+    def execute(self, now=None, limit=None):
+        """
+        Executes the process of listing overdue loans, most overdue first.
+
+        Parameters:
+            now (datetime, optional): The moment loans are overdue at; the current time if omitted.
+            limit (int, optional): The maximum number of loans to return; all of them if omitted.
+
+        Returns:
+            dict: The overdue loans with their headers, and the moment they were evaluated at.
+        """
+        now = now or datetime.now()
+        try:
+            loans = []
+            for loan in self.iterate(now):
+                if limit is not None and len(loans) >= limit:
+                    break
+                loans.append(loan)
+            print(f"{len(loans)} overdue loans found.")
+            return {'content': loans, 'headers': list(self.loan_repository.overdue_headers), 'now': now}
+        except Error as e:
+            print(f"An error occurred: {e}")
+            return f"An error occurred: {e}"
+
+    def iterate(self, now=None, chunk_size=1000):
+        """
+        Executes the process of streaming every overdue loan, most overdue first.
+
+        The current time is read once, so every loan is judged against the same moment however long
+        the run takes.
+
+        Parameters:
+            now (datetime, optional): The moment loans are overdue at; the current time if omitted.
+            chunk_size (int): The number of rows fetched from the database at a time.
+
+        Returns:
+            generator: Yields one overdue loan at a time, with the book title and borrower's name.
+        """
+        now = now or datetime.now()
+        return self.loan_repository.iter_overdue_loans(now.strftime('%Y-%m-%d %H:%M:%S'), chunk_size)
@@ -0,0 +1,40 @@
+from datetime import date
+
+from frameworks_and_drivers.database.drivers import Error
+
+
+class LoanActivityReportUseCase:
+    """
+    Use case for summarizing, month by month, the loans made over a period such as a year.
+
+    Attributes:
+        loan_repository (LoanRepository): Repository for loan-related operations.
+    """
+
+    def __init__(self, loan_repository):
+        self.loan_repository = loan_repository
+
+    def execute(self, start=None, end=None):
+        """
+        Executes the process of summarizing the loans made from start up to, but not including, end.
+
+        Parameters:
+            start (date, optional): The first day of the period; January 1 of the current year if omitted.
+            end (date, optional): The day the period stops before; a year after start if omitted.
+
+        Returns:
+            dict: The monthly figures with their headers, and the period they cover.
+        """
+        start = start or date(date.today().year, 1, 1)
+        end = end or start.replace(year=start.year + 1)
+        if end <= start:
+            raise Exception("The end of the period must be after its start.")
+        try:
+            activity = self.loan_repository.get_loan_activity(start.isoformat(), end.isoformat())
+            if activity is None:
+                raise Exception("The loan activity could not be read.")
+            print(f"Loan activity summarized for {len(activity['content'])} months.")
+            return dict(activity, start=start, end=end)
+        except Error as e:
+            print(f"An error occurred: {e}")
+            return f"An error occurred: {e}"
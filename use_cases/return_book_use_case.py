@@ -1,4 +1,5 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.connection_pool import TransactionRolledBack
+from frameworks_and_drivers.database.drivers import Error
 
 
 class ReturnBookUseCase:
@@ -7,27 +8,74 @@ class ReturnBookUseCase:
 
     Attributes:
         loan_repository (LoanRepository): Repository for loan-related operations.
+        book_repository (BookRepository): Repository whose availability counters are updated.
+        copy_repository (CopyRepository): Repository that tracks which copies are on the shelf.
     """
 
-    def __init__(self, loan_repository):
+    def __init__(self, loan_repository, book_repository, copy_repository):
         self.loan_repository = loan_repository
+        self.book_repository = book_repository
+        self.copy_repository = copy_repository
 
     def execute(self, loan_id, return_date):
         """
         Executes the book returning process.
 
+        The loan is only closed if it is still open when the UPDATE runs, so of two concurrent returns
+        exactly one puts the copy back on the shelf.
+
         Parameters:
             loan_id (int): The ID of the loan record.
             return_date (str): The date when the book is returned.
         """
         try:
-            loan = self.loan_repository.get_loans_by_id('loan_id', loan_id)
-            if not loan:
-                raise Exception("Loan record not found.")
-
-            self.loan_repository.update_loan(
-                loan_id, loan[1], loan[2], loan[3], loan[4], return_date
-            )
-            print("Book returned successfully.")
-        except Error as e:
+            with self.loan_repository.transaction():
+                active_loan_ids = self.loan_repository.get_active_loan_ids([loan_id])
+                if loan_id in active_loan_ids:
+                    # Only an open loan holds a copy; return_loans() fails if it was closed in the meantime
+                    book_id, copy_id = active_loan_ids[loan_id]
+                    self.loan_repository.return_loans([loan_id], return_date)
+                    self.book_repository.release_copies([book_id])
+                    self.copy_repository.track_return(book_id, copy_id)
+                else:
+                    # Re-dating a returned loan changes no counter
+                    loan = self.loan_repository.get_loans_by_id('loan_id', loan_id)
+                    if not loan or loan['content'] is None:
+                        raise Exception("Loan record not found.")
+                    loan = loan['content']
+                    self.loan_repository.update_loan(
+                        loan_id, loan[1], loan[2], loan[3], loan[4], return_date
+                    )
+        except Error + (TransactionRolledBack,) as e:
+            print(f"An error occurred: {e}")
+            raise Exception(f"An error occurred, the book was not returned: {e}")
+        print("Book returned successfully.")
+
+    def execute_batch(self, loan_ids, return_date):
+        """
+        Executes the return of several loans at once.
+
+        The loans are checked with one query and marked returned with one statement and one commit, so
+        either all of them are returned or none is.
+
+        Parameters:
+            loan_ids (list of int): The IDs of the loan records.
+            return_date (str): The date when the books are returned.
+        """
+        if not loan_ids:
+            raise Exception("No loans to return.")
+        try:
+            with self.loan_repository.transaction():
+                active_loan_ids = self.loan_repository.get_active_loan_ids(loan_ids)
+                closed_loan_ids = [loan_id for loan_id in loan_ids if loan_id not in active_loan_ids]
+                if closed_loan_ids:
+                    raise Exception(f"Loans not found or already returned: {', '.join(map(str, closed_loan_ids))}.")
+
+                self.book_repository.release_copies([book_id for book_id, _ in active_loan_ids.values()])
+                for book_id, copy_id in active_loan_ids.values():
+                    self.copy_repository.track_return(book_id, copy_id)
+                self.loan_repository.return_loans(loan_ids, return_date)
+        except Error + (TransactionRolledBack,) as e:
             print(f"An error occurred: {e}")
+            raise Exception(f"An error occurred, no books were returned: {e}")
+        print(f"{len(loan_ids)} books returned successfully.")
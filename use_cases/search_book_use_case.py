@@ -1,4 +1,4 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.drivers import Error
 
 
 class SearchBookUseCase:
@@ -16,6 +16,9 @@ class SearchBookUseCase:
         """
         Executes the book searching process.
 
+        Each book found is returned with two extra columns, total_copies and copies_available, read
+        from its availability record.
+
         Parameters:
             id_field_name (str): The column/field name of the id.
             id_value (str or int): The unique identifier of the column/field.
@@ -27,7 +30,69 @@ class SearchBookUseCase:
                 raise Exception("Book not found.")
             else:
                 print("Book found successfully.")
-                return book
+                return self.with_availability(book, fetchone)
         except Error as e:
             print(f"An error occurred: {e}")
             return f"An error occurred: {e}"
+
+    def execute_fulltext(self, text, limit=10):
+        """
+        Executes a ranked full-text search over the title, author and genre of books.
+
+        Parameters:
+            text (str): The words to search for, e.g. part of a title or an author's surname.
+            limit (int): The maximum number of books to return.
+
+        Returns:
+            dict: The best matching books, most relevant first, with their availability.
+        """
+        try:
+            books = self.book_repository.search_books(text, limit)
+            if books is None:
+                raise Exception("The search failed.")
+            print(f"{len(books['content'])} books found.")
+            return self.with_availability(books, False)
+        except Error as e:
+            print(f"An error occurred: {e}")
+            return f"An error occurred: {e}"
+
+    def with_availability(self, book, fetchone):
+        """
+        Appends the availability columns to a search result.
+
+        Parameters:
+            book (dict): The search result, with 'content' and 'headers'.
+            fetchone (bool): Whether 'content' is a single record rather than a list of records.
+
+        Returns:
+            dict: A new result with total_copies and copies_available appended to every record.
+        """
+        rows = [book['content']] if fetchone else book['content']
+        rows = [row for row in rows if row is not None]
+        availability = self.book_repository.get_availability([row[0] for row in rows])
+
+        def extend(row):
+            total_copies, copies_out = availability.get(row[0], (0, 0))
+            return tuple(row) + (total_copies, total_copies - copies_out)
+
+        content = [extend(row) for row in rows]
+        return {
+            'content': (content[0] if content else None) if fetchone else content,
+            'headers': list(book['headers']) + ['total_copies', 'copies_available'],
+        }
+
+    def suggest(self, field, prefix, limit=10):
+        """
+        Autocompletes a book field from what has been typed so far.
+
+        Parameters:
+            field (str): The field to complete, 'title' or 'author'.
+            prefix (str): What has been typed so far.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list: Up to limit (value, book_id) pairs, in alphabetical order of value.
+        """
+        if not prefix.strip():
+            return []
+        return self.book_repository.suggest(field, prefix.strip(), limit)
@@ -1,4 +1,4 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.drivers import Error
 
 
 class SearchLoanUseCase:
@@ -12,7 +12,7 @@ class SearchLoanUseCase:
     def __init__(self, loan_repository):
         self.loan_repository = loan_repository
 
-    def execute(self, id_field_name, id_value, fetchone):
+    def execute(self, id_field_name, id_value, fetchone, include_archive=False):
         """
         Executes the loan searching process.
 
@@ -20,9 +20,11 @@ class SearchLoanUseCase:
             id_field_name (str): The column/field name of the id.
             id_value (str or int): The unique identifier of the column/field.
             fetchone (bool): Check if the user needs only one loan.
+            include_archive (bool): Also search the archived loans, e.g. for a user's full history.
         """
         try:
-            loan = self.loan_repository.get_loans_by_id(id_field_name, id_value, fetchone)
+            loan = self.loan_repository.get_loans_by_id(id_field_name, id_value, fetchone,
+                                                        include_archive=include_archive)
             if not loan:
                 raise Exception("Loan not found.")
             else:
@@ -1,4 +1,4 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.drivers import Error
 
 
 class SearchUserUseCase:
@@ -31,3 +31,45 @@ class SearchUserUseCase:
         except Error as e:
             print(f"An error occurred: {e}")
             return f"An error occurred: {e}"
+
+    def execute_fuzzy(self, text, limit=5):
+        """
+        Executes an approximate search over the names and emails of users, tolerating typos.
+
+        Parameters:
+            text (str): The name or email address to look for, e.g. "Jon Smth".
+            limit (int): The maximum number of users to return.
+
+        Returns:
+            dict: The closest users, best first, with a score column from 0.0 to 1.0.
+        """
+        if not text.strip():
+            raise Exception("Enter a name or email address to search for.")
+        try:
+            matches = self.user_repository.find_similar(text, limit)
+            users = self.user_repository.get_users_by_ids([user_id for _, user_id in matches])
+            if users is None:
+                raise Exception("The search failed.")
+            rows = {row[0]: row for row in users['content']}
+            content = [tuple(rows[user_id]) + (score,) for score, user_id in matches if user_id in rows]
+            print(f"{len(content)} users found.")
+            return {'content': content, 'headers': list(users['headers']) + ['score']}
+        except Error as e:
+            print(f"An error occurred: {e}")
+            return f"An error occurred: {e}"
+
+    def suggest(self, field, prefix, limit=10):
+        """
+        Autocompletes a user field from what has been typed so far.
+
+        Parameters:
+            field (str): The field to complete, 'name'.
+            prefix (str): What has been typed so far.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            list: Up to limit (value, user_id) pairs, in alphabetical order of value.
+        """
+        if not prefix.strip():
+            return []
+        return self.user_repository.suggest(field, prefix.strip(), limit)
@@ -1,4 +1,4 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.drivers import Error
 
 
 class ShowDatabaseTablesUseCase:
@@ -34,3 +34,51 @@ class ShowDatabaseTablesUseCase:
         except Error as e:
             print(f"An error occurred: {e}")
             return f"An error occurred: {e}"
+
+    def execute_page(self, table_name, page_size=50, after=None, columnar=False):
+        """
+        Executes the process of fetching one page of a table, ordered by its primary key.
+
+        Parameters: table_name (str): The table name of the database. The table_name must be either of these (
+        'books', 'users', 'loans')
+
+        page_size (int): The maximum number of records to return.
+
+        after (int, optional): The next_cursor of the previous page; None for the first page.
+
+        columnar (bool): Return the page as one Arrow record batch instead of a list of rows.
+        """
+        try:
+            if table_name == 'books':
+                data = self.repository.get_books_page(page_size, after, columnar=columnar)
+            elif table_name == 'users':
+                data = self.repository.get_users_page(page_size, after, columnar=columnar)
+            elif table_name == 'loans':
+                data = self.repository.get_loans_page(page_size, after, columnar=columnar)
+            else:
+                raise Exception("Error: Couldn't retrieve table. 'table_name' not entered correctly.")
+            return data
+        except Error as e:
+            print(f"An error occurred: {e}")
+            return f"An error occurred: {e}"
+
+    def iterate(self, table_name, chunk_size=1000):
+        """
+        Executes the process of streaming every record of a table, ordered by its primary key.
+
+        Parameters: table_name (str): The table name of the database. The table_name must be either of these (
+        'books', 'users', 'loans')
+
+        chunk_size (int): The number of rows fetched from the database at a time.
+
+        Returns:
+            generator: Yields one record at a time.
+        """
+        if table_name == 'books':
+            return self.repository.iter_books(chunk_size)
+        elif table_name == 'users':
+            return self.repository.iter_users(chunk_size)
+        elif table_name == 'loans':
+            return self.repository.iter_loans(chunk_size)
+        else:
+            raise Exception("Error: Couldn't retrieve table. 'table_name' not entered correctly.")
@@ -1,4 +1,4 @@
-from mysql.connector import Error
+from frameworks_and_drivers.database.drivers import Error
 
 
 class UserRegistrationUseCase:
@@ -26,3 +26,71 @@ class UserRegistrationUseCase:
             print("User registered successfully.")
         except Error as e:
             print(f"An error occurred during registration: {e}")
+
+    def execute_bulk(self, users, batch_size=1000):
+        """
+        Executes the registration of many users at once.
+
+        The email addresses already registered are loaded into an in-memory set first, so duplicates,
+        whether of existing users or earlier rows of the same input, are dropped before anything is
+        sent to the database. The remaining users are inserted in batches of batch_size.
+
+        Parameters:
+            users (iterable of dict): Records with 'name', 'email' and 'role' keys.
+            batch_size (int): The number of users inserted and committed at a time.
+
+        Returns:
+            list of tuples: (row number, email, outcome) for every input row, where outcome is
+            'registered', 'duplicate', 'invalid: <reason>' or 'failed: <error>'.
+        """
+        # Emails compare case-insensitively, as the users.email unique key does on MySQL
+        known_emails = {email.lower() for email in self.user_repository.iter_emails()}
+        outcomes = []
+        batch = []
+        batch_rows = []
+
+        for row_number, user in enumerate(users, start=1):
+            name = str(user.get('name') or '').strip()
+            email = str(user.get('email') or '').strip()
+            role = str(user.get('role') or '').strip()
+            if not name or not email or not role:
+                outcomes.append((row_number, email, 'invalid: name, email and role are required'))
+                continue
+            if '@' not in email:
+                outcomes.append((row_number, email, 'invalid: malformed email address'))
+                continue
+            if email.lower() in known_emails:
+                outcomes.append((row_number, email, 'duplicate'))
+                continue
+            known_emails.add(email.lower())
+            batch.append((name, email, role))
+            batch_rows.append(row_number)
+            if len(batch) >= batch_size:
+                outcomes.extend(self._insert_batch(batch, batch_rows))
+                batch, batch_rows = [], []
+        if batch:
+            outcomes.extend(self._insert_batch(batch, batch_rows))
+
+        outcomes.sort()
+        print(f"{sum(outcome == 'registered' for _, _, outcome in outcomes)} users registered successfully.")
+        return outcomes
+
+    def _insert_batch(self, batch, batch_rows):
+        """
+        Inserts one batch of users, retrying row by row if the batch as a whole is rejected.
+
+        A batch only fails when the database refuses a row, e.g. an email registered by another desk
+        since the known emails were loaded; inserting the rows one at a time isolates that row.
+        """
+        try:
+            self.user_repository.add_users(batch)
+            return [(row_number, user[1], 'registered') for row_number, user in zip(batch_rows, batch)]
+        except Error:
+            outcomes = []
+            for row_number, user in zip(batch_rows, batch):
+                try:
+                    self.user_repository.add_users([user])
+                    outcomes.append((row_number, user[1], 'registered'))
+                except Error as e:
+                    outcomes.append((row_number, user[1], f'failed: {e}'))
+            return outcomes